@@ -11,16 +11,165 @@ ai.py - 2025-2 수강신청 AI 도우미 최종 안정+버그픽스 버전
 ✔ 검색 조건이 전혀 없을 때는 빈 결과 반환
 """
 
+import os
 import pymysql
-import boto3
 import json
 import re
-from dotenv import load_dotenv
-load_dotenv()
-from db import get_connection
+import time
+import threading
 
-# Bedrock LLM 클라이언트
-llm = boto3.client("bedrock-runtime", region_name="us-east-1")
+
+def load_env():
+    """
+    .env 가 있을 때만 python-dotenv 를 import 해서 읽는다.
+    db.py 등 다른 모듈이 import 시점에 환경변수를 읽으므로 그보다 먼저 호출해야 한다.
+    운영처럼 환경변수를 직접 주는 경우에는 파일 확인만 하고 끝난다.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    candidates = [os.path.join(os.getcwd(), ".env")]
+    while True:  # load_dotenv() 기본 동작처럼 이 파일 위치부터 상위 폴더로 올라가며 찾는다
+        candidates.append(os.path.join(directory, ".env"))
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+
+    for path in candidates:
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+
+
+load_env()
+from db import get_connection, pool_stats, SCHEDULE_MINUTE_COLUMNS, COURSE_SEARCH_TEXT_COLUMN
+from course_parser import DAY_INDEX, MINUTES_PER_DAY
+import catalog_engine
+import intent_cache
+import rule_parser
+import search_text
+import fuzzy
+import catalog_meta
+import result_cache
+import kb_cache
+import metrics
+import async_bedrock
+from metrics import span
+
+# 재적재로 catalog 버전이 바뀌면 프로세스 안의 사전/인덱스를 다시 만든다
+catalog_meta.on_version_change(catalog_engine.invalidate_catalog)
+catalog_meta.on_version_change(rule_parser.reload_vocabulary)
+catalog_meta.on_version_change(fuzzy.reload_index)
+
+# /metrics 에 캐시 / 커넥션 풀 지표를 함께 노출
+metrics.register_collector("db_pool", pool_stats)
+metrics.register_collector("intent_cache", intent_cache.cache.stats)
+metrics.register_collector("result_cache", result_cache.cache.stats)
+metrics.register_collector("kb_cache", kb_cache.cache.stats)
+metrics.register_collector("bedrock", async_bedrock.gateway.stats)
+
+# ============================================================
+# Bedrock 클라이언트 (처음 사용할 때 생성, 프로세스 안에서 공유)
+# - boto3 import + 클라이언트 생성에 수백 ms 가 걸리므로 import 시점에는 만들지 않는다
+# - boto3 클라이언트는 스레드 간 공유 가능. 생성만 lock 으로 한 번만 하게 한다
+# - 테스트 / benchmark.py 에서 ai.llm, ai.kb 에 가짜 객체를 넣으면 그것을 사용
+# ============================================================
+BEDROCK_REGION = os.getenv("BEDROCK_REGION", "us-east-1")
+BEDROCK_MAX_POOL = int(os.getenv("BEDROCK_MAX_POOL", "32"))   # 클라이언트당 HTTP 연결 수
+BEDROCK_CONNECT_TIMEOUT = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "5"))
+BEDROCK_READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "60"))
+
+llm = None  # bedrock-runtime
+kb = None   # bedrock-agent-runtime
+_client_lock = threading.Lock()
+
+
+def _create_client(service: str):
+    import boto3
+    from botocore.config import Config
+
+    with span(f"client_create:{service}"):
+        return boto3.client(
+            service,
+            region_name=BEDROCK_REGION,
+            config=Config(
+                max_pool_connections=BEDROCK_MAX_POOL,
+                connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+                read_timeout=BEDROCK_READ_TIMEOUT,
+            ),
+        )
+
+
+def get_llm():
+    global llm
+    if llm is None:
+        with _client_lock:
+            if llm is None:
+                llm = _create_client("bedrock-runtime")
+    return llm
+
+
+def get_kb():
+    global kb
+    if kb is None:
+        with _client_lock:
+            if kb is None:
+                kb = _create_client("bedrock-agent-runtime")
+    return kb
+
+
+def reset_clients():
+    """fork 이후 부모 프로세스의 클라이언트(HTTP 연결)를 버리고 다시 만들게 한다"""
+    global llm, kb
+    with _client_lock:
+        llm = kb = None
+
+
+def call_bedrock(kind: str, question: str, fn, *args):
+    """
+    Bedrock 호출. ASYNC_BEDROCK_ENABLED 이면 async_bedrock gateway 를 거쳐서
+    같은(정규화 기준) 질문이 동시에 들어오면 upstream 은 한 번만 호출하고 결과를 나눠 쓴다.
+    """
+    if async_bedrock.ASYNC_BEDROCK_ENABLED:
+        key = (kind, intent_cache.normalize_question(question))
+        return async_bedrock.gateway.call(key, fn, *args)
+    return fn(*args)
+
+
+def call_bedrock_stream(kind: str, question: str, fn, *args):
+    """
+    스트리밍 Bedrock 호출 (fn 은 조각 iterator 를 반환). 같은 질문의 스트림이 진행 중이면
+    upstream 을 새로 열지 않고 그 스트림의 조각을 처음부터 같이 받는다.
+    """
+    if async_bedrock.ASYNC_BEDROCK_ENABLED:
+        key = (kind, intent_cache.normalize_question(question))
+        return async_bedrock.gateway.stream(key, fn, *args)
+    return fn(*args)
+
+
+def warm_up(indexes: bool = True):
+    """
+    서버 시작 / worker fork 직후에 호출.
+    Bedrock 클라이언트를 미리 만들고, indexes=True 면 규칙 파서 사전과 오타 사전도 미리 만든다
+    → 첫 질문이 초기화 비용을 떠안지 않게 한다. 실패해도 서버는 계속 뜬다 (처음 사용할 때 다시 시도)
+    """
+    t0 = time.perf_counter()
+    try:
+        get_llm()
+        get_kb()
+    except Exception as e:
+        print("Bedrock 클라이언트 준비 오류:", e)
+
+    if indexes:
+        try:
+            catalog_meta.current_version()
+            if rule_parser.RULE_PARSER_ENABLED:
+                rule_parser.get_vocabulary()
+            if fuzzy.FUZZY_ENABLED:
+                fuzzy.get_index()
+        except Exception as e:
+            print("사전 준비 오류:", e)
+    print(f"warm-up 완료 {time.perf_counter() - t0:.2f}s")
 
 # 요일 매핑
 DAY_MAP = {
@@ -54,6 +203,9 @@ DEFAULT_FILTERS = {
     "online_hours": ""
 }
 
+# 검색 엔진 선택: "mysql"(기본) 또는 "memory"(catalog_engine 메모리 인덱스)
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "mysql").strip().lower()
+
 VALID_INTENTS = {
     "course_to_professor",
     "professor_to_course",
@@ -65,12 +217,43 @@ VALID_INTENTS = {
 # ============================================================
 # 1) LLM → intent + filters JSON
 # ============================================================
+def invoke_intent_llm(prompt: str) -> dict:
+    """Nova Lite 호출 → 응답 JSON (call_bedrock 으로 감싸서 사용)"""
+    res = get_llm().invoke_model(
+        modelId="amazon.nova-lite-v1:0",
+        body=json.dumps({
+            "inferenceConfig": {"max_new_tokens": 250},
+            "messages": [{"role": "user", "content": [{"text": prompt}]}]
+        })
+    )
+    return json.loads(res["body"].read())
+
+
 def analyze_question_with_ai(question: str):
     """
     사용자의 자연어 질문을 LLM에 보내서
     intent + filters 형태의 JSON 구조로 변환한다.
+    같은(정규화 기준) 질문은 intent 캐시에서 바로 반환한다.
+    규칙 파서가 충분히 확신하는 질문은 LLM 호출 없이 바로 반환한다.
     """
 
+    if rule_parser.RULE_PARSER_ENABLED:
+        try:
+            with span("rule_parser"):
+                parsed, confidence = rule_parser.parse_question(question)
+            if confidence >= rule_parser.RULE_PARSER_MIN_CONFIDENCE:
+                print(f"규칙 파서 사용 (confidence={confidence})")
+                metrics.inc("intent_source", source="rule_parser")
+                return parsed
+        except Exception as e:
+            print("규칙 파서 오류:", e)
+
+    with span("intent_cache"):
+        cached = intent_cache.cache.get(question)
+    if cached is not None:
+        metrics.inc("intent_source", source="intent_cache")
+        return cached
+
     prompt = f"""
 당신은 수강신청 도우미이며,
 자연어 질문에서 'DB 검색에 필요한 조건만' JSON으로 추출해야 합니다.
@@ -125,21 +308,17 @@ JSON ONLY:
 """
 
     try:
-        res = llm.invoke_model(
-            modelId="amazon.nova-lite-v1:0",
-            body=json.dumps({
-                "inferenceConfig": {"max_new_tokens": 250},
-                "messages": [{"role": "user", "content": [{"text": prompt}]}]
-            })
-        )
-        out = json.loads(res["body"].read())
-        text = out["output"]["message"]["content"][0]["text"].strip()
+        with span("llm_intent"):
+            out = call_bedrock("llm", question, invoke_intent_llm, prompt)
+        metrics.inc("intent_source", source="llm")
 
-        
-        if text.startswith("```"):
-            text = text.replace("```json", "").replace("```", "").strip()
+        with span("json_cleanup"):
+            text = out["output"]["message"]["content"][0]["text"].strip()
+
+            if text.startswith("```"):
+                text = text.replace("```json", "").replace("```", "").strip()
 
-        parsed = json.loads(text)
+            parsed = json.loads(text)
 
         # ---------- 안전망: intent / filters 구조 정리 ----------
         intent = parsed.get("intent", "") or "unknown"
@@ -156,11 +335,15 @@ JSON ONLY:
         parsed["intent"] = intent
         parsed["filters"] = cleaned_filters
 
+        # LLM 이 정상적으로 분석한 결과만 캐시 (오류 fallback 은 저장하지 않음)
+        intent_cache.cache.put(question, parsed)
+
         return parsed
 
     except Exception as e:
         print("LLM 분석 오류:", e)
-        
+        metrics.inc("errors", stage="llm_intent")
+
         return {
             "intent": "unknown",
             "filters": {
@@ -206,7 +389,63 @@ def fix_intent(intent, filters):
 
 
 
-def search_courses(intent, filters):
+def schedule_time_conditions(day, time_start, time_end):
+    """
+    시간 조건(time_start / time_end) SQL 을 만든다.
+
+    SCHEDULE_MINUTE_COLUMNS 이면 'HH:MM' 을 minute-of-week 정수 구간으로 바꿔
+    (day, start_minute, end_minute) 인덱스를 범위 탐색하게 한다.
+    요일이 없으면 7개 요일 구간의 OR 로 표현한다. 시간 미정(TBD)은 NULL 이라 제외된다.
+    """
+    cond, param = [], []
+    start_min = catalog_engine.to_minutes(time_start) if time_start else None
+    end_min = catalog_engine.to_minutes(time_end) if time_end else None
+
+    if (not SCHEDULE_MINUTE_COLUMNS
+            or (time_start and start_min is None)
+            or (time_end and end_min is None)):
+        # 기존 방식: 'HH:MM:SS' 문자열/TIME 비교
+        if time_start:
+            cond.append("s.start_time >= %s")
+            param.append(time_start)
+        if time_end:
+            cond.append("s.end_time <= %s")
+            param.append(time_end)
+        return cond, param
+
+    if not time_start and not time_end:
+        return cond, param
+
+    if day:
+        days = [DAY_INDEX[day]] if day in DAY_INDEX else []
+    else:
+        days = sorted(DAY_INDEX.values())
+    if not days:
+        return ["FALSE"], []
+
+    for column, value in (("start_minute", start_min), ("end_minute", end_min)):
+        if value is None:
+            continue
+        ranges = []
+        for d in days:
+            base = d * MINUTES_PER_DAY
+            lo, hi = (base + value, base + MINUTES_PER_DAY - 1) if column == "start_minute" else (base, base + value)
+            ranges.append(f"s.{column} BETWEEN %s AND %s")
+            param.extend([lo, hi])
+        cond.append("(" + " OR ".join(ranges) + ")")
+
+    return cond, param
+
+
+SEARCH_LIMIT = catalog_engine.RESULT_LIMIT
+SEARCH_ERROR_MESSAGE = "강의 정보를 조회하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+
+class SearchError(RuntimeError):
+    """DB 검색 실패 (결과 0건과 구분하기 위해 사용)"""
+
+
+def search_courses(intent, filters, limit=SEARCH_LIMIT, offset=0):
     """
     intent + filters 정보를 바탕으로
     courses / schedules 테이블에서 과목을 검색한다.
@@ -214,9 +453,27 @@ def search_courses(intent, filters):
     - 교수 / 트랙 / main_category / 학년 / 요일 / 시간 등은
       값이 있으면 모두 AND 조건으로 건다.
     - keyword는 intent에 따라 사용 방식만 달라진다.
+    - SEARCH_ENGINE=memory 이면 같은 조건을 메모리 카탈로그에서 평가한다.
+    - limit / offset 으로 페이지 단위 조회 (정렬 마지막에 c.id, s.id 를 둬서 순서 고정)
+    - DB 오류는 빈 결과가 아니라 SearchError 로 알린다
     """
 
-    conn = get_connection()
+    if SEARCH_ENGINE == "memory":
+        try:
+            # 재적재되었으면 메모리 카탈로그를 다시 읽게 한다 (CATALOG_VERSION_TTL 안에서는 DB 조회 없음)
+            catalog_meta.current_version()
+            with span("memory_search"):
+                return catalog_engine.search_courses(intent, filters, limit, offset)
+        except Exception as e:
+            print("메모리 카탈로그 검색 오류 (MySQL 로 대체):", e)
+
+    with span("db_connect"):
+        try:
+            conn = get_connection()
+        except Exception as e:
+            print("DB 연결 오류:", e)
+            metrics.inc("errors", stage="db_connect")
+            raise SearchError(str(e)) from e
     try:
         with conn.cursor(pymysql.cursors.DictCursor) as cur:
 
@@ -283,13 +540,9 @@ def search_courses(intent, filters):
                 cond.append("s.day = %s")
                 param.append(day)
 
-            if time_start:
-                cond.append("s.start_time >= %s")
-                param.append(time_start)
-
-            if time_end:
-                cond.append("s.end_time <= %s")
-                param.append(time_end)
+            time_cond, time_param = schedule_time_conditions(day, time_start, time_end)
+            cond.extend(time_cond)
+            param.extend(time_param)
 
             # --- 신규 필터 ----
             if room:
@@ -318,6 +571,12 @@ def search_courses(intent, filters):
 
             
             if kw:
+                # search_text 의 ngram FULLTEXT 인덱스로 후보를 먼저 좁힌다 (아래 LIKE 조건은 그대로)
+                ft_query = search_text.fulltext_query(kw) if COURSE_SEARCH_TEXT_COLUMN else None
+                if ft_query:
+                    cond.append("MATCH(c.search_text) AGAINST (%s IN BOOLEAN MODE)")
+                    param.append(ft_query)
+
                 if intent == "course_to_professor":
                     # 과목명 위주
                     cond.append("REPLACE(c.name, ' ', '') LIKE REPLACE(%s, ' ', '')")
@@ -351,27 +610,31 @@ def search_courses(intent, filters):
                 return []
 
             sql += " WHERE " + " AND ".join(cond)
-            sql += " ORDER BY c.code, c.section, s.day, s.start_time"
-            sql += " LIMIT 100"
+            sql += " ORDER BY c.code, c.section, s.day, s.start_time, c.id, s.id"
+            sql += " LIMIT %s OFFSET %s"
+            param.extend([int(limit), int(offset)])
 
-            cur.execute(sql, tuple(param))
-            rows = cur.fetchall()
+            with span("sql_execute"):
+                cur.execute(sql, tuple(param))
+                rows = cur.fetchall()
 
             # 시간 문자열 조립 (NULL 안전 처리)
-            for r in rows:
-                d  = r.get("day") or ""
-                st = r.get("start_time") or ""
-                et = r.get("end_time") or ""
-                if d and st and et:
-                    r["time_str"] = f"{d} {st}~{et}"
-                else:
-                    r["time_str"] = ""
+            with span("row_postprocess"):
+                for r in rows:
+                    d  = r.get("day") or ""
+                    st = r.get("start_time") or ""
+                    et = r.get("end_time") or ""
+                    if d and st and et:
+                        r["time_str"] = f"{d} {st}~{et}"
+                    else:
+                        r["time_str"] = ""
 
             return rows
 
     except Exception as e:
         print("DB 검색 오류:", e)
-        return []
+        metrics.inc("errors", stage="sql_execute")
+        raise SearchError(str(e)) from e
 
     finally:
         conn.close()
@@ -381,6 +644,7 @@ def search_courses(intent, filters):
 # ============================================================
 # 4) 자연어 답변 생성
 # ============================================================
+@metrics.timed("generate_answer")
 def generate_answer(rows):
     """
     DB에서 가져온 row 리스트를
@@ -405,14 +669,16 @@ def generate_answer(rows):
 # ============================================================
 # 5) main 처리
 # ============================================================
+@metrics.timed("answer_question")
 def answer_question(question: str):
     """
     전체 파이프라인:
     1) LLM으로 intent/filters 분석
     2) intent 보정
     3) 요일 한글 → 요일 코드 변환
-    4) DB 검색
+    4) DB 검색 (결과가 없으면 오타/초성/줄임말 보정 후 한 번 더)
     5) 자연어 답변 생성
+    (intent, filters) + catalog 버전이 같은 답변은 result_cache 에서 바로 반환
     """
     analysis = analyze_question_with_ai(question)
     print("LLM 분석 결과:", analysis)
@@ -425,43 +691,156 @@ def answer_question(question: str):
     if day_val in DAY_MAP:
         analysis["filters"]["day"] = DAY_MAP[day_val]
 
-    rows = search_courses(analysis["intent"], analysis["filters"])
+    version = catalog_meta.current_version() if result_cache.RESULT_CACHE_ENABLED else None
+    with span("result_cache"):
+        cached = result_cache.cache.get(analysis["intent"], analysis["filters"], version)
+    if cached is not None:
+        return cached
+
+    try:
+        answer = search_and_answer(analysis["intent"], analysis["filters"])
+    except SearchError:
+        return SEARCH_ERROR_MESSAGE
+    if answer is not None:
+        result_cache.cache.put(analysis["intent"], analysis["filters"], version, answer)
+        return answer
+    return generate_answer([])
+
 
-    return generate_answer(rows)
+def search_and_answer(intent, filters):
+    """
+    검색 + 답변 생성. 결과가 없으면 None, DB 오류면 SearchError
+    ('찾지 못함' 답변은 캐시하지 않는다)
+    """
+    rows = search_courses(intent, filters)
+    if rows:
+        return generate_answer(rows)
+
+    if fuzzy.FUZZY_ENABLED:
+        try:
+            corrected, changes = fuzzy.correct_filters(filters)
+        except Exception as e:
+            print("오타 보정 오류:", e)
+            changes = []
+        if changes:
+            print("오타 보정:", changes)
+            rows = search_courses(fix_intent(intent, corrected), corrected)
+            if rows:
+                note = ", ".join(f"'{old}' → '{new}'" for old, new in changes)
+                return f"({note} (으)로 검색한 결과입니다)\n" + generate_answer(rows)
+
+    return None
 
 # ============================================================
 # 6) Knowledge Base 기반 답변
 # ============================================================
 
-kb = boto3.client("bedrock-agent-runtime", region_name="us-east-1")
-
 KB_ID = os.getenv("KB_ID")
 AGENT_ID = os.getenv("AGENT_ID")
 AGENT_ALIAS_ID = os.getenv("AGENT_ALIAS_ID")
 
+KB_MODEL_ARN = "arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-3-haiku-20240307-v1:0"
+KB_ERROR_MESSAGE = "지식기반에서 답변을 가져오는 중 오류가 발생했습니다."
+
+
+def kb_request(question: str) -> dict:
+    """retrieve_and_generate / retrieve_and_generate_stream 공통 요청 인자"""
+    return {
+        "input": {"text": question},
+        "retrieveAndGenerateConfiguration": {
+            "knowledgeBaseConfiguration": {
+                "knowledgeBaseId": KB_ID,
+                "modelArn": KB_MODEL_ARN
+            },
+            "type": "KNOWLEDGE_BASE"
+        }
+    }
+
+
+def retrieve_kb(question: str) -> dict:
+    return get_kb().retrieve_and_generate(**kb_request(question))
+
+
+@metrics.timed("answer_kb")
 def answer_kb(question: str) -> str:
     """
     AWS Bedrock Knowledge Base에서 답변을 가져오는 함수
+    같은/비슷한 질문의 답변이 kb_cache 에 있으면 Bedrock 을 호출하지 않는다.
     """
+    if kb_cache.KB_CACHE_ENABLED:
+        with span("kb_cache"):
+            cached = kb_cache.cache.get(question)
+        if cached is not None:
+            return cached
+
     try:
-        response = kb.retrieve_and_generate(
-            input={"text": question},
-            retrieveAndGenerateConfiguration={
-                "knowledgeBaseConfiguration": {
-                    "knowledgeBaseId": KB_ID,
-                    "modelArn": "arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-3-haiku-20240307-v1:0"
-                },
-                "type": "KNOWLEDGE_BASE"
-            }
-        )
+        with span("kb_retrieve_and_generate"):
+            response = call_bedrock("kb", question, retrieve_kb, question)
 
-        output = response["output"]["text"]
-        return output.strip()
+        output = response["output"]["text"].strip()
+        if kb_cache.KB_CACHE_ENABLED and output:
+            kb_cache.cache.put(question, output)
+        return output
 
     except Exception as e:
         print("KB 오류:", e)
-        return "지식기반에서 답변을 가져오는 중 오류가 발생했습니다."
+        metrics.inc("errors", stage="kb_retrieve_and_generate")
+        return KB_ERROR_MESSAGE
+
+
+def stream_kb(question: str):
+    """retrieve_and_generate_stream 의 텍스트 조각. 중간에 닫히면(close) Bedrock 응답 스트림도 닫는다"""
+    stream = get_kb().retrieve_and_generate_stream(**kb_request(question))["stream"]
+    try:
+        for event in stream:
+            text = event.get("output", {}).get("text")
+            if text:
+                yield text
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def answer_kb_stream(question: str):
+    """
+    answer_kb 의 스트리밍 버전 (retrieve_and_generate_stream).
+    생성되는 텍스트 조각을 도착하는 대로 yield 한다.
+    이어 붙이면 answer_kb 와 같은 답변이 된다 (앞뒤 공백 제외).
+    캐시에 있으면 한 번에 보내고, 끝까지 받은 답변은 캐시에 저장한다.
+    받는 쪽이 중간에 그만두면 close() 해서 Bedrock 스트림도 닫을 것.
+    """
+    if kb_cache.KB_CACHE_ENABLED:
+        with span("kb_cache"):
+            cached = kb_cache.cache.get(question)
+        if cached is not None:
+            yield cached
+            return
+
+    # 스트리밍은 첫 조각까지의 시간(kb_stream_first_chunk)과 전체 시간을 따로 기록
+    start = time.perf_counter()
+    chunks = []
+    upstream = call_bedrock_stream("kb_stream", question, stream_kb, question)
+    try:
+        for text in upstream:
+            if not chunks:
+                metrics.observe("kb_stream_first_chunk", time.perf_counter() - start)
+            chunks.append(text)
+            yield text
+        metrics.observe("kb_retrieve_and_generate_stream", time.perf_counter() - start)
+
+    except Exception as e:
+        print("KB 스트리밍 오류:", e)
+        metrics.inc("errors", stage="kb_retrieve_and_generate_stream")
+        if not chunks:
+            yield KB_ERROR_MESSAGE
+        return
+    finally:
+        upstream.close()
 
+    output = "".join(chunks).strip()
+    if kb_cache.KB_CACHE_ENABLED and output:
+        kb_cache.cache.put(question, output)
 
 
 # ============================================================
@@ -1,9 +1,127 @@
-from flask import Flask, request, render_template
-from ai import answer_question, answer_kb
+import os
+import json
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import Blueprint, Flask, Response, request, render_template, jsonify, stream_with_context, g
+import ai
+import db
+import intent_cache
+import result_cache
+import kb_cache
+import async_bedrock
+from ai import answer_question, answer_kb, answer_kb_stream, warm_up
+from ai import search_courses, SearchError, SEARCH_ERROR_MESSAGE, KB_ERROR_MESSAGE, DEFAULT_FILTERS, VALID_INTENTS, DAY_MAP
+from catalog_engine import to_minutes
+import fuzzy
+import metrics
+from conflict import check_candidate_sets
+from timetable import generate_timetables, DEFAULT_MAX_RESULTS, DEFAULT_TIME_BUDGET_MS
 
-app = Flask(__name__)
+# 라우트는 blueprint 에 등록하고 create_app() 에서 Flask 앱을 만든다
+# - 개발: python app.py (Flask 개발 서버)
+# - 운영: gunicorn -c gunicorn.conf.py "app:create_app()"
+bp = Blueprint("assistant", __name__)
 
-@app.route("/", methods=["GET", "POST"])
+
+# ============================================================
+# 요청 추적 / 지표
+# - 요청마다 ID 를 정해서(X-Request-ID 가 오면 그대로) 응답 헤더로 돌려준다
+# - 요청 전체 시간은 http:<endpoint> 단계로 기록
+# - GET /metrics → Prometheus text format (gunicorn 에서는 요청을 받은 worker 의 값)
+# ============================================================
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.request_id = metrics.start_request(request.headers.get("X-Request-ID", "")[:64] or None)
+
+
+def finish_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        response.headers["X-Request-ID"] = g.request_id
+        endpoint = (request.endpoint or "unknown").rsplit(".", 1)[-1]
+        metrics.end_request(endpoint, time.perf_counter() - started)
+    return response
+
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+# ============================================================
+# 동시 실행 모드 설정
+# - DB 답변(answer_question)과 KB 답변(answer_kb)을 병렬로 실행
+# - 각 파이프라인은 자기 타임아웃을 가진다 (초 단위)
+# ============================================================
+CONCURRENT_ANSWERS = os.getenv("CONCURRENT_ANSWERS", "1") == "1"
+ANSWER_WORKERS = int(os.getenv("ANSWER_WORKERS", "8"))
+DB_ANSWER_TIMEOUT = float(os.getenv("DB_ANSWER_TIMEOUT", "10"))
+KB_ANSWER_TIMEOUT = float(os.getenv("KB_ANSWER_TIMEOUT", "20"))
+
+DB_TIMEOUT_MESSAGE = "DB 검색이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+
+# 스트리밍 모드: 화면이 /stream (server-sent events) 으로 DB 답변을 먼저, KB 답변은 토큰 단위로 받는다
+# 0 이면 기존처럼 폼 POST 후 두 답변이 모두 끝나야 화면을 그린다
+STREAM_ANSWERS = os.getenv("STREAM_ANSWERS", "1") == "1"
+
+# 요청마다 스레드를 만들지 않도록 프로세스 공용의 제한된 스레드 풀 사용
+# (fork 전에 만든 스레드는 worker 로 넘어가지 않으므로 처음 사용할 때 만든다)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ANSWER_WORKERS, thread_name_prefix="answer")
+    return _executor
+
+
+def wait_answer(future, deadline: float, fallback: str, error_fallback: str, label: str) -> str:
+    """
+    future 결과를 deadline(time.monotonic 기준)까지 기다린다.
+    시간 초과 시 fallback 문자열을 반환하고, 아직 시작 전이면 취소한다.
+    작업이 예외로 끝나면 error_fallback 을 반환한다 (시간 초과 안내와 구분).
+    """
+    remaining = max(0.0, deadline - time.monotonic())
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeoutError:
+        future.cancel()
+        print(f"{label} 답변 시간 초과 ({remaining:.1f}s 남음)")
+        return fallback
+    except Exception as e:
+        print(f"{label} 답변 오류:", e)
+        return error_fallback
+
+
+def answer_both(question: str):
+    """
+    DB 답변과 KB 답변을 함께 만든다.
+    CONCURRENT_ANSWERS=1 이면 두 파이프라인을 병렬로 실행하고,
+    KB가 늦으면 DB 답변만 먼저 반환한다.
+    """
+    if not CONCURRENT_ANSWERS:
+        return answer_question(question), answer_kb(question)
+
+    started = time.monotonic()
+    # bind: 요청 ID / trace 를 작업 스레드로 넘긴다
+    db_future = get_executor().submit(metrics.bind(answer_question), question)
+    kb_future = get_executor().submit(metrics.bind(answer_kb), question)
+
+    db_answer = wait_answer(db_future, started + DB_ANSWER_TIMEOUT,
+                            DB_TIMEOUT_MESSAGE, SEARCH_ERROR_MESSAGE, "DB")
+    # KB가 지연되면 빈 문자열 → 화면에는 DB 답변만 표시
+    kb_answer = wait_answer(kb_future, started + KB_ANSWER_TIMEOUT, "", KB_ERROR_MESSAGE, "KB")
+
+    return db_answer, kb_answer
+
+
+@bp.route("/", methods=["GET", "POST"])
 def index():
     db_answer = ""
     kb_answer = ""
@@ -11,13 +129,351 @@ def index():
 
     if request.method == "POST":
         question = request.form["question"]
-        db_answer = answer_question(question)
-        kb_answer = answer_kb(question)
+        db_answer, kb_answer = answer_both(question)
 
     return render_template("index.html",
                            question=question,
                            db_answer=db_answer,
-                           kb_answer=kb_answer)
+                           kb_answer=kb_answer,
+                           stream=STREAM_ANSWERS)
+
+
+# ============================================================
+# 스트리밍 답변 (server-sent events)
+# GET /stream?question=...
+#   event: db   → DB 답변 전체 (answer_question 이 끝나는 즉시)
+#   event: kb   → KB 답변 조각 (retrieve_and_generate_stream 토큰)
+#   event: done → 끝
+# ============================================================
+def sse(event: str, text: str = "") -> str:
+    return f"event: {event}\ndata: {json.dumps({'text': text}, ensure_ascii=False)}\n\n"
+
+
+def stream_answers(question: str):
+    """
+    DB 답변과 KB 스트림을 스레드 풀에서 동시에 돌리고,
+    먼저 도착하는 것부터 SSE 이벤트로 내보낸다.
+    각 파이프라인의 타임아웃은 answer_both 와 같다.
+    클라이언트가 끊거나 KB 가 시간 초과되면 cancelled 를 세워서
+    run_kb 가 다음 조각에서 멈추고 Bedrock 스트림을 닫게 한다 (스레드 풀을 계속 잡고 있지 않게).
+    """
+    started = time.monotonic()
+    events = queue.Queue()
+    cancelled = threading.Event()
+
+    def run_kb():
+        chunks = answer_kb_stream(question)
+        try:
+            for chunk in chunks:
+                if cancelled.is_set():
+                    break
+                events.put(("kb", chunk))
+        finally:
+            chunks.close()
+            events.put(("kb_done", None))
+
+    db_future = get_executor().submit(metrics.bind(answer_question), question)
+    db_future.add_done_callback(lambda f: events.put(("db", f)))
+    get_executor().submit(metrics.bind(run_kb))
+
+    db_done = kb_done = False
+    try:
+        while not (db_done and kb_done):
+            if not db_done:
+                deadline = started + DB_ANSWER_TIMEOUT
+            else:
+                deadline = started + KB_ANSWER_TIMEOUT
+            try:
+                kind, value = events.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                if not db_done:
+                    print("DB 답변 시간 초과 (스트리밍)")
+                    db_done = True
+                    yield sse("db", DB_TIMEOUT_MESSAGE)
+                    continue
+                print("KB 답변 시간 초과 (스트리밍)")
+                break
+
+            if kind == "db":
+                if db_done:
+                    continue  # 이미 시간 초과 메시지를 보냄
+                db_done = True
+                yield sse("db", wait_answer(value, time.monotonic(),
+                                            DB_TIMEOUT_MESSAGE, SEARCH_ERROR_MESSAGE, "DB"))
+            elif kind == "kb":
+                yield sse("kb", value)
+            else:
+                kb_done = True
+    finally:
+        # 정상 종료 / 시간 초과 / 클라이언트 연결 끊김(GeneratorExit) 모두
+        cancelled.set()
+
+    # 응답 헤더는 스트림 시작 시 이미 나갔으므로 전체 시간은 따로 기록
+    metrics.observe("stream_answers", time.monotonic() - started)
+    yield sse("done")
+
+
+@bp.route("/stream")
+def stream():
+    question = (request.args.get("question") or "").strip()
+    if not question:
+        return jsonify({"error": "question 을 입력해주세요."}), 400
+
+    return Response(
+        stream_with_context(stream_answers(question)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ============================================================
+# 과목 검색 JSON API (LLM 호출 없음)
+# GET  /api/courses?intent=search_by_filters&track_major=웹공학&grade=4&limit=20&offset=0&fields=code,name
+# POST /api/courses {"intent": ..., "filters": {DEFAULT_FILTERS 형태}, "limit": 20, "offset": 0, "fields": [...]}
+# - 응답에 ETag, If-None-Match 가 같으면 304 (GET)
+# ============================================================
+COURSE_FIELDS = [
+    "id", "code", "name", "professor", "main_category", "track_major",
+    "department", "university", "grade", "room", "credit", "section",
+    "lecture_hours", "online_hours", "day", "start_time", "end_time", "time_str",
+]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def format_time(value) -> str:
+    """TIME(timedelta) / 'HH:MM:SS' → 'HH:MM' (JSON 직렬화용)"""
+    minutes = to_minutes(value)
+    return "" if minutes is None else f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_course_query(args: dict, filters: dict):
+    """요청 값 → (intent, filters, limit, offset, fields). 잘못된 값이면 BadRequest"""
+    intent = (args.get("intent") or "search_by_filters").strip()
+    if intent not in VALID_INTENTS:
+        raise BadRequest(f"intent 는 {sorted(VALID_INTENTS)} 중 하나여야 합니다.")
+
+    unknown = set(filters) - set(DEFAULT_FILTERS)
+    if unknown:
+        raise BadRequest(f"알 수 없는 필터: {sorted(unknown)}")
+    cleaned = {k: "" if filters.get(k) is None else str(filters.get(k)) for k in DEFAULT_FILTERS}
+    if cleaned["day"] in DAY_MAP:
+        cleaned["day"] = DAY_MAP[cleaned["day"]]
+
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        offset = int(args.get("offset", 0))
+    except (TypeError, ValueError):
+        raise BadRequest("limit / offset 은 정수여야 합니다.")
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise BadRequest(f"limit 은 1~{MAX_PAGE_SIZE}, offset 은 0 이상이어야 합니다.")
+
+    fields = args.get("fields") or COURSE_FIELDS
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    if not isinstance(fields, list) or set(fields) - set(COURSE_FIELDS):
+        raise BadRequest(f"fields 는 {COURSE_FIELDS} 중에서 골라야 합니다.")
+
+    return intent, cleaned, limit, offset, fields
+
+
+@bp.route("/api/courses", methods=["GET", "POST"])
+def api_courses():
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({"error": "요청 본문은 JSON 객체여야 합니다."}), 400
+        filters = body.get("filters") or {}
+        args = body
+    else:
+        args = request.args.to_dict()
+        filters = {k: v for k, v in args.items() if k in DEFAULT_FILTERS}
+        args = {k: v for k, v in args.items() if k not in DEFAULT_FILTERS}
+        unknown = set(args) - {"intent", "limit", "offset", "fields"}
+        if unknown:
+            return jsonify({"error": f"알 수 없는 파라미터: {sorted(unknown)}"}), 400
+
+    try:
+        if not isinstance(filters, dict):
+            raise BadRequest("filters 는 객체여야 합니다.")
+        intent, filters, limit, offset, fields = parse_course_query(args, filters)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+
+    # 한 건 더 읽어서 다음 페이지 유무를 판단
+    try:
+        rows = search_courses(intent, filters, limit=limit + 1, offset=offset)
+    except SearchError:
+        # 빈 결과(200 + ETag)로 응답하면 클라이언트 / 부하 테스트가 정상 응답으로 착각한다
+        return jsonify({"error": "강의 정보를 조회할 수 없습니다. 잠시 후 다시 시도해주세요."}), 503
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for r in rows:
+        item = {}
+        for f in fields:
+            value = r.get(f)
+            if f in ("start_time", "end_time"):
+                value = format_time(value)
+            item[f] = value
+        items.append(item)
+
+    resp = jsonify({
+        "intent": intent,
+        "filters": filters,
+        "items": items,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if has_more else None,
+    })
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+# ============================================================
+# 오타 / 초성 / 줄임말 자동완성 (LLM 호출 없음)
+# GET /api/suggest?q=ㅋㄹㅇㄷ&fields=name,professor&limit=10
+# ============================================================
+MAX_SUGGESTIONS = 50
+
+
+@bp.route("/api/suggest")
+def api_suggest():
+    query = (request.args.get("q") or "").strip()
+    fields = [f for f in (request.args.get("fields") or "").split(",") if f] or list(fuzzy.FIELDS)
+    if set(fields) - set(fuzzy.FIELDS):
+        return jsonify({"error": f"fields 는 {list(fuzzy.FIELDS)} 중에서 골라야 합니다."}), 400
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"error": "limit 은 정수여야 합니다."}), 400
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        return jsonify({"error": f"limit 은 1~{MAX_SUGGESTIONS} 이어야 합니다."}), 400
+
+    started = time.perf_counter()
+    results = fuzzy.suggest(query, fields, limit) if query else []
+    return jsonify({
+        "query": query,
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+# ============================================================
+# 시간표 중복 체크 API (LLM 호출 없음)
+# POST {"candidates": [["GEN1000-A", "V022006-N"], [...]]}  또는  {"courses": [...]}
+# ============================================================
+MAX_CANDIDATE_SETS = 100
+
+
+@bp.route("/api/conflicts", methods=["POST"])
+def api_conflicts():
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "요청 본문은 JSON 객체여야 합니다."}), 400
+    candidates = body.get("candidates")
+    if candidates is None and "courses" in body:
+        candidates = [body["courses"]]
+
+    if not isinstance(candidates, list) or not all(isinstance(c, list) for c in candidates):
+        return jsonify({"error": "candidates 는 과목 목록(리스트)의 리스트여야 합니다."}), 400
+    if len(candidates) > MAX_CANDIDATE_SETS:
+        return jsonify({"error": f"한 번에 최대 {MAX_CANDIDATE_SETS}개 조합까지 검사할 수 있습니다."}), 400
+
+    started = time.perf_counter()
+    results = check_candidate_sets(candidates)
+    return jsonify({
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+# ============================================================
+# 시간표 추천 API (LLM 호출 없음)
+# POST {"required": ["GEN1000"], "optional": ["V022006"], "target_credits": 18,
+#       "blocked_days": ["FRI"], "earliest": "09:00", "latest": "18:00"}
+# ============================================================
+MAX_TIMETABLE_COURSES = 15
+MAX_TIMETABLE_RESULTS = 50
+MAX_TIMETABLE_BUDGET_MS = 1000
+
+
+@bp.route("/api/timetable", methods=["POST"])
+def api_timetable():
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "요청 본문은 JSON 객체여야 합니다."}), 400
+    required = body.get("required") or []
+    optional = body.get("optional") or []
+    blocked_days = body.get("blocked_days") or []
+
+    if not isinstance(required, list) or not isinstance(optional, list):
+        return jsonify({"error": "required / optional 은 과목 목록(리스트)이어야 합니다."}), 400
+    # "FRI" 처럼 문자열을 주면 글자 단위로 풀려서 조용히 무시되므로 막는다
+    if not isinstance(blocked_days, list) or not all(isinstance(d, str) for d in blocked_days):
+        return jsonify({"error": "blocked_days 는 요일 문자열의 리스트여야 합니다. (예: [\"FRI\"])"}), 400
+    if not required and not optional:
+        return jsonify({"error": "과목을 하나 이상 입력해주세요."}), 400
+    if len(required) + len(optional) > MAX_TIMETABLE_COURSES:
+        return jsonify({"error": f"최대 {MAX_TIMETABLE_COURSES}과목까지 조합할 수 있습니다."}), 400
+
+    try:
+        target = body.get("target_credits")
+        target = float(target) if target not in (None, "") else None
+        max_results = min(int(body.get("max_results", DEFAULT_MAX_RESULTS)), MAX_TIMETABLE_RESULTS)
+        budget = min(float(body.get("time_budget_ms", DEFAULT_TIME_BUDGET_MS)), MAX_TIMETABLE_BUDGET_MS)
+    except (TypeError, ValueError):
+        return jsonify({"error": "target_credits / max_results / time_budget_ms 는 숫자여야 합니다."}), 400
+    if max_results < 1 or not budget > 0:  # NaN 도 여기서 걸러진다
+        return jsonify({"error": "max_results 는 1 이상, time_budget_ms 는 0 보다 커야 합니다."}), 400
+
+    result = generate_timetables(
+        required, optional,
+        target_credits=target,
+        blocked_days=blocked_days,
+        earliest=body.get("earliest") or "",
+        latest=body.get("latest") or "",
+        max_results=max_results,
+        time_budget_ms=budget,
+    )
+    return jsonify(result)
+
+
+# ============================================================
+# 앱 생성 / worker 초기화
+# ============================================================
+def create_app() -> Flask:
+    flask_app = Flask(__name__)
+    flask_app.before_request(start_request_metrics)
+    flask_app.after_request(finish_request_metrics)
+    flask_app.register_blueprint(bp)
+    return flask_app
+
+
+def reset_worker_state():
+    """
+    gunicorn post_fork 에서 호출 (preload_app 로 부모가 미리 import 한 경우).
+    부모 프로세스에서 복사된 DB 연결 / sqlite / Redis / Bedrock 클라이언트 / 스레드 풀 / asyncio loop 를
+    버리고 worker 가 처음 사용할 때 새로 만들게 한다. 메모리 캐시 내용은 그대로 쓴다.
+    """
+    global _executor, _executor_lock
+    _executor, _executor_lock = None, threading.Lock()
+    db.reset_pool()
+    ai.reset_clients()
+    intent_cache.cache.reset_after_fork()
+    result_cache.cache.reset_after_fork()
+    kb_cache.cache.reset_after_fork()
+    async_bedrock.gateway.reset_after_fork()
+    metrics.reset()
+
+
+app = create_app()
+
 
 if __name__ == "__main__":
+    warm_up()
     app.run(host="0.0.0.0", port=80)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+async_bedrock.py - Bedrock 호출 single-flight (동시에 들어온 같은 질문은 upstream 1회)
+
+✔ 백그라운드 asyncio loop (전용 스레드) 에서 호출을 관리
+✔ 같은 key 의 호출이 진행 중이면 새로 호출하지 않고 그 결과를 같이 기다림 (coalesced)
+✔ upstream 동시 호출 수는 semaphore 로 제한 (BEDROCK_MAX_CONCURRENCY)
+✔ boto3 는 동기 클라이언트라 전용 스레드 풀에서 실행
+✔ 호출한 쪽이 시간 초과로 포기해도 upstream 호출은 계속 → 같이 기다리던 요청은 결과를 받음
+✔ Flask(동기) 에서는 gateway.call(), asyncio 코드에서는 await gateway.acall()
+✔ 스트리밍은 gateway.stream(): 같은 key 의 스트림이 진행 중이면 upstream 을 새로 열지 않고
+   그 스트림의 조각을 처음부터 같이 받는다 (fan-out). 받는 쪽이 모두 떠나면 upstream 도 닫는다
+
+    gateway.call(("kb", normalize_question(q)), retrieve_kb, q)
+    for text in gateway.stream(("kb_stream", normalize_question(q)), stream_kb, q): ...
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable, Iterator, List, Optional
+
+# ============================== 설정 ==============================
+ASYNC_BEDROCK_ENABLED = os.getenv("ASYNC_BEDROCK_ENABLED", "1") == "1"
+BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "16"))  # 프로세스당 upstream 동시 호출 수
+BEDROCK_CALL_TIMEOUT = float(os.getenv("BEDROCK_CALL_TIMEOUT", "60"))      # 호출한 쪽이 기다리는 최대 시간(초)
+
+
+class _Broadcast:
+    """upstream 스트림 하나의 조각을 모아 두고 구독자들에게 나눠준다"""
+
+    def __init__(self):
+        self.chunks: List = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._init_state()
+
+    def _init_state(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Hashable, asyncio.Task] = {}  # loop 스레드에서만 접근
+        self._streams: Dict[Hashable, _Broadcast] = {}     # self._lock 으로 보호
+        self._stats = {
+            "calls": 0,
+            "upstream_calls": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "timeouts": 0,
+        }
+
+    # ---------- loop ----------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        # fork 이후에 만들어지도록 처음 사용할 때 시작
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                        thread_name_prefix="bedrock")
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    threading.Thread(target=loop.run_forever, name="bedrock-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    async def _upstream(self, fn: Callable, args: tuple):
+        async with self._semaphore:
+            self._stats["upstream_calls"] += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 기다리던 쪽이 모두 포기했어도 경고가 남지 않게 확인 처리
+
+    async def run(self, key: Hashable, fn: Callable, *args):
+        """gateway loop 안에서 실행되는 coroutine. 같은 key 가 진행 중이면 그 결과를 공유"""
+        self._stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._upstream(fn, args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self._stats["coalesced"] += 1
+        # shield: 이 호출자가 취소돼도 upstream 은 다른 호출자를 위해 계속
+        return await asyncio.shield(task)
+
+    # ---------- 호출 ----------
+    def call(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None):
+        """동기 코드(Flask 요청 스레드)용. 시간 초과 시 concurrent.futures.TimeoutError"""
+        future = asyncio.run_coroutine_threadsafe(self.run(key, fn, *args), self._ensure_loop())
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            future.cancel()  # 이 호출자의 대기만 취소 (upstream 은 shield 로 계속)
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise
+
+    async def acall(self, key: Hashable, fn: Callable, *args):
+        """다른 asyncio loop 에서 사용"""
+        future = asyncio.run_coroutine_threadsafe(self.run(key, fn, *args), self._ensure_loop())
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+    # ---------- 스트리밍 ----------
+    def _pump(self, key: Hashable, b: _Broadcast, fn: Callable, args: tuple):
+        """스레드 풀에서 upstream 스트림을 읽어 b 에 쌓는다. 구독자가 없으면 중단"""
+        upstream = None
+        try:
+            upstream = fn(*args)
+            for chunk in upstream:
+                with self._lock, b.cond:
+                    if b.subscribers == 0:
+                        # 새 구독자가 끊긴 스트림에 붙지 않도록 먼저 뺀다
+                        if self._streams.get(key) is b:
+                            del self._streams[key]
+                        break
+                    b.chunks.append(chunk)
+                    b.cond.notify_all()
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            b.error = e
+        finally:
+            close = getattr(upstream, "close", None)
+            if close is not None:
+                close()
+            with self._lock, b.cond:
+                if self._streams.get(key) is b:
+                    del self._streams[key]
+                b.done = True
+                b.cond.notify_all()
+
+    def stream(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None) -> Iterator:
+        """
+        fn(*args) 는 조각 iterator 를 반환. 같은 key 가 진행 중이면 그 스트림을 처음 조각부터 같이 받는다.
+        조각 사이 대기가 timeout 을 넘으면 concurrent.futures.TimeoutError, upstream 오류는 그대로 raise.
+        중간에 그만둘 때는 close() → 마지막 구독자가 떠나면 upstream 도 다음 조각에서 닫힌다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._stats["calls"] += 1
+            b = self._streams.get(key)
+            leader = b is None
+            if leader:
+                b = self._streams[key] = _Broadcast()
+                self._stats["upstream_calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+            with b.cond:
+                b.subscribers += 1
+        if leader:
+            self._ensure_loop()
+            self._executor.submit(self._pump, key, b, fn, args)
+
+        pos = 0
+        try:
+            while True:
+                with b.cond:
+                    ready = b.cond.wait_for(lambda: pos < len(b.chunks) or b.done, timeout)
+                    new = b.chunks[pos:]
+                    finished = b.done and pos + len(new) == len(b.chunks)
+                if not ready:
+                    # self._lock 은 b.cond 밖에서 잡는다 (_pump 와 잠금 순서를 맞춤)
+                    with self._lock:
+                        self._stats["timeouts"] += 1
+                    raise FutureTimeoutError()
+                pos += len(new)
+                yield from new
+                if finished:
+                    if b.error is not None:
+                        raise b.error
+                    return
+        finally:
+            with b.cond:
+                b.subscribers -= 1
+
+    # ---------- 관리 ----------
+    def reset_after_fork(self):
+        """fork 직후 worker 에서 호출: 부모의 loop 스레드 / 스레드 풀은 넘어오지 않으므로 새로 만들게 한다"""
+        self._lock = threading.Lock()
+        self._init_state()
+
+    def stats(self) -> Dict:
+        data = dict(self._stats)
+        data["in_flight"] = len(self._inflight) + len(self._streams)
+        data["max_concurrency"] = self.max_concurrency
+        return data
+
+
+# 프로세스 공용 gateway
+gateway = SingleFlight(BEDROCK_MAX_CONCURRENCY, BEDROCK_CALL_TIMEOUT)
@@ -0,0 +1,602 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark.py - 배포 전 성능 비교용 오프라인 벤치마크
+
+✔ parse  : course_parser.parse_course_time (책자의 모든 시간 문자열, 캐시 비운 상태 / 캐시된 상태)
+✔ pdf    : ingest_data.extract_course_info_from_pdf (course.pdf)
+✔ ingest : ingest_data.insert_course_data (SQLite 파일 또는 --db mysql 이면 DB_* 환경변수의 MySQL)
+✔ startup: 새 프로세스에서 import ai / import app / Bedrock 클라이언트 생성까지의 시간 (worker 기동 비용)
+✔ e2e    : ai.answer_question / ai.answer_kb (Bedrock 대신 기록된 응답을 재생하는 가짜 llm / kb)
+✔ 결과는 JSON 으로 저장, --baseline 으로 이전 결과와 비교해서 느려진 항목 표시 (있으면 종료 코드 1)
+
+사용 예)
+    python benchmark.py --output bench/before.json
+    python benchmark.py --output bench/after.json --baseline bench/before.json
+    python benchmark.py --only e2e --llm-latency-ms 600 --kb-latency-ms 1500
+    python benchmark.py --only e2e --record          # 실제 Bedrock 응답을 --replay 파일에 기록
+
+⚠️ --db mysql 은 courses / schedules 를 TRUNCATE 하므로 반드시 벤치마크 전용 DB 를 지정할 것
+"""
+
+import os
+import io
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# 벤치마크는 디스크 캐시를 남기지 않는다 (ai 를 import 하기 전에 설정)
+os.environ.setdefault("KB_CACHE_PATH", "")
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import db
+import metrics
+
+BENCHMARKS = ["startup", "parse", "pdf", "ingest", "e2e"]
+DEFAULT_PDF_PATH = "course.pdf"
+DEFAULT_SQLITE_PATH = ".bench/bench.sqlite"
+DEFAULT_REPLAY_PATH = "bench_replay.json"
+
+# e2e 에서 사용하는 질문 (규칙 파서로 끝나는 질문 + LLM 까지 가는 질문 + KB 질문)
+QUESTIONS = [
+    "4학년 웹공학 전공선택 과목 알려줘",
+    "월요일 오전 수업 있는 전공필수 과목",
+    "마케팅원론 담당 교수님이 누구야?",
+    "선택필수교양 중 온라인강의 3시간인 수업이 있나요?",
+    "화요일 12시 이후에 들을 수 있는 3학점 교양",
+    "데이터베이스 수업 강의실 어디야",
+    "금요일 수업 없는 컴퓨터공학과 2학년 과목",
+    "수강신청 정정 기간 언제야",
+]
+
+
+# ============================== 측정 유틸 ==============================
+def summarize(seconds: List[float], items: int = 1) -> Dict:
+    ms = sorted(s * 1000 for s in seconds)
+    median = statistics.median(ms)
+    return {
+        "runs": len(ms),
+        "items": items,
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(median, 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 3),
+        "max_ms": round(ms[-1], 3),
+        "items_per_sec": round(items / (median / 1000), 1) if median > 0 else None,
+    }
+
+
+def measure(fn: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> List[float]:
+    """setup → fn 을 repeat 번. setup 시간은 포함하지 않는다"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+@contextlib.contextmanager
+def quiet():
+    """측정 대상 코드의 print 를 숨긴다"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def stage_summary() -> Dict:
+    """metrics 에 기록된 단계별 p50 / p95 (ms)"""
+    out = {}
+    for stage, snap in metrics.stage_snapshot().items():
+        out[stage] = {
+            "count": snap["count"],
+            "p50_ms": round(snap["quantiles"][0.5] * 1000, 3),
+            "p95_ms": round(snap["quantiles"][0.95] * 1000, 3),
+        }
+    return out
+
+
+# ============================== SQLite 대역 ==============================
+class SqliteCursor:
+    """ingest_data / ai / catalog_meta 가 쓰는 pymysql cursor 기능만 SQLite 로 옮긴다"""
+
+    MATCH_RE = re.compile(r"MATCH\((\S+)\) AGAINST \(\? IN BOOLEAN MODE\)")
+
+    def __init__(self, conn: sqlite3.Connection, as_dict: bool):
+        self._cur = conn.cursor()
+        self._as_dict = as_dict
+
+    @classmethod
+    def translate(cls, sql: str) -> Optional[str]:
+        sql = sql.replace("%s", "?")
+        sql = cls.MATCH_RE.sub(r"fulltext_match(\1, ?)", sql)
+        stripped = sql.strip().upper()
+        if stripped.startswith("SET "):
+            return None  # SET FOREIGN_KEY_CHECKS / SET SESSION ...
+        m = re.match(r"\s*TRUNCATE TABLE (\w+)", sql, re.IGNORECASE)
+        if m:
+            return f"DELETE FROM {m.group(1)}"
+        return sql
+
+    def execute(self, sql: str, params=()):
+        sql = self.translate(sql)
+        if sql is not None:
+            self._cur.execute(sql, tuple(params or ()))
+
+    def executemany(self, sql: str, seq):
+        sql = self.translate(sql)
+        if sql is not None:
+            self._cur.executemany(sql, list(seq))
+
+    def fetchall(self):
+        rows = self._cur.fetchall()
+        if self._as_dict:
+            names = [d[0] for d in self._cur.description]
+            return [dict(zip(names, r)) for r in rows]
+        return rows
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is not None and self._as_dict:
+            row = dict(zip([d[0] for d in self._cur.description], row))
+        return row
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+
+class SqliteConnection:
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.create_function("fulltext_match", 2, self._fulltext_match)
+
+    @staticmethod
+    def _fulltext_match(text, query) -> int:
+        # ngram FULLTEXT 의 "+토큰" 검색 근사: 모든 토큰이 부분 문자열로 포함되면 1
+        text = text or ""
+        tokens = [t.strip('+"') for t in (query or "").split()]
+        return int(all(t in text for t in tokens if t))
+
+    def cursor(self, cursor_class=None):
+        return SqliteCursor(self._conn, cursor_class is not None)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+def create_sqlite_schema(path: str):
+    """ingest_data 의 현재 적재 컬럼(플래그 반영) 그대로 빈 테이블을 만든다"""
+    from ingest_data import COURSE_COLUMNS, SCHEDULE_COLUMNS
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    column_types = {"page": "INTEGER", "occupancy": "BLOB", "course_id": "INTEGER",
+                    "start_minute": "INTEGER", "end_minute": "INTEGER"}
+    courses = ", ".join(f"{c} {column_types.get(c, 'TEXT')}" for c in COURSE_COLUMNS)
+    schedules = ", ".join(f"{c} {column_types.get(c, 'TEXT')}" for c in SCHEDULE_COLUMNS)
+
+    conn = sqlite3.connect(path)
+    conn.executescript(f"""
+        CREATE TABLE courses (id INTEGER PRIMARY KEY, {courses});
+        CREATE TABLE schedules (id INTEGER PRIMARY KEY, {schedules});
+        CREATE INDEX idx_schedules_course ON schedules (course_id);
+        CREATE TABLE catalog_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT INTO catalog_meta (name, value) VALUES ('catalog_version', 1);
+    """)
+    conn.commit()
+    conn.close()
+
+
+def use_sqlite(path: str):
+    """db.get_connection() 이 SQLite 대역을 돌려주게 한다 (풀을 써도 _connect 를 통해 생성)"""
+    create_sqlite_schema(path)
+    db._connect = lambda: SqliteConnection(path)
+
+
+# ============================== 가짜 Bedrock (재생) ==============================
+QUESTION_RE = re.compile(r'질문: "(.*)"')
+
+
+def llm_body(text: str) -> Dict:
+    payload = {"output": {"message": {"content": [{"text": text}]}}}
+    return {"body": io.BytesIO(json.dumps(payload, ensure_ascii=False).encode("utf-8"))}
+
+
+def synthesize_intent(question: str) -> str:
+    """기록이 없는 질문은 규칙 파서 결과를 LLM 응답처럼 만든다 (형식은 실제 응답과 같음)"""
+    import rule_parser
+    parsed, _ = rule_parser.parse_question(question)
+    return json.dumps(parsed, ensure_ascii=False)
+
+
+class ReplayLLM:
+    """bedrock-runtime invoke_model 대역: 기록된 응답을 latency 만큼 기다린 뒤 돌려준다"""
+
+    def __init__(self, recorded: Dict[str, str], latency: float):
+        self.recorded = recorded
+        self.latency = latency
+        self.calls = 0
+
+    def invoke_model(self, modelId, body):
+        self.calls += 1
+        prompt = json.loads(body)["messages"][0]["content"][0]["text"]
+        m = QUESTION_RE.search(prompt)
+        question = m.group(1) if m else ""
+        text = self.recorded.get(question) or synthesize_intent(question)
+        time.sleep(self.latency)
+        return llm_body(text)
+
+
+class ReplayKB:
+    """bedrock-agent-runtime retrieve_and_generate(_stream) 대역"""
+
+    def __init__(self, recorded: Dict[str, str], latency: float):
+        self.recorded = recorded
+        self.latency = latency
+        self.calls = 0
+
+    def _text(self, request: Dict) -> str:
+        question = request["input"]["text"]
+        return self.recorded.get(question) or f"[재생] {question} 에 대한 안내입니다."
+
+    def retrieve_and_generate(self, **request):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"output": {"text": self._text(request)}}
+
+    def retrieve_and_generate_stream(self, **request):
+        self.calls += 1
+        text = self._text(request)
+        time.sleep(self.latency)
+        pieces = [text[i:i + 20] for i in range(0, len(text), 20)]
+        return {"stream": [{"output": {"text": p}} for p in pieces]}
+
+
+class RecordingLLM:
+    """실제 클라이언트 호출 결과를 기록한다 (--record)"""
+
+    def __init__(self, client, recorded: Dict[str, str]):
+        self.client = client
+        self.recorded = recorded
+
+    def invoke_model(self, modelId, body):
+        res = self.client.invoke_model(modelId=modelId, body=body)
+        out = json.loads(res["body"].read())
+        prompt = json.loads(body)["messages"][0]["content"][0]["text"]
+        m = QUESTION_RE.search(prompt)
+        if m:
+            self.recorded[m.group(1)] = out["output"]["message"]["content"][0]["text"]
+        return {"body": io.BytesIO(json.dumps(out).encode("utf-8"))}
+
+
+class RecordingKB:
+    def __init__(self, client, recorded: Dict[str, str]):
+        self.client = client
+        self.recorded = recorded
+
+    def retrieve_and_generate(self, **request):
+        res = self.client.retrieve_and_generate(**request)
+        self.recorded[request["input"]["text"]] = res["output"]["text"]
+        return res
+
+
+def load_replay(path: str) -> Dict[str, Dict[str, str]]:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {"llm": data.get("llm", {}), "kb": data.get("kb", {})}
+    return {"llm": {}, "kb": {}}
+
+
+# ============================== 벤치마크 ==============================
+def load_pdf(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def bench_pdf(ctx: Dict, args) -> Dict:
+    from ingest_data import extract_course_info_from_pdf
+
+    pdf_bytes = load_pdf(args.pdf)
+    courses = []
+
+    def run():
+        nonlocal courses
+        with quiet():
+            courses = extract_course_info_from_pdf(pdf_bytes, workers=args.pdf_workers)
+
+    times = measure(run, args.pdf_repeat)
+    ctx["courses"] = courses
+    result = summarize(times, len(courses))
+    result["pages_per_sec"] = None
+    try:
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            result["pages_per_sec"] = round(len(pdf.pages) / (result["median_ms"] / 1000), 1)
+    except Exception:
+        pass
+    return {"pdf_extract": result}
+
+
+def course_list(ctx: Dict, args) -> List[Dict]:
+    """pdf 벤치마크를 건너뛰었으면 한 번만 추출 (측정하지 않음)"""
+    if "courses" not in ctx:
+        from ingest_data import extract_course_info_from_pdf
+        with quiet():
+            ctx["courses"] = extract_course_info_from_pdf(load_pdf(args.pdf), workers=args.pdf_workers)
+    return ctx["courses"]
+
+
+def bench_parse(ctx: Dict, args) -> Dict:
+    import course_parser
+
+    time_strs = [c.get("time_str", "") for c in course_list(ctx, args)]
+
+    def run():
+        with quiet():  # 파싱 실패 경고 출력
+            for s in time_strs:
+                course_parser.parse_course_time(s)
+
+    clear = course_parser._parse_course_time_cached.cache_clear
+    cold = measure(run, args.repeat, setup=clear)
+    clear()
+    run()
+    warm = measure(run, args.repeat)
+    return {
+        "parse_course_time_cold": summarize(cold, len(time_strs)),
+        "parse_course_time_warm": summarize(warm, len(time_strs)),
+    }
+
+
+def bench_ingest(ctx: Dict, args) -> Dict:
+    import ingest_data
+
+    courses = course_list(ctx, args)
+    results = {}
+    for mode in args.ingest_modes:
+        def run():
+            with quiet():
+                ingest_data.insert_course_data(courses, mode=mode)
+        results[f"insert_course_data_{mode}"] = summarize(measure(run, args.ingest_repeat), len(courses))
+    ctx["ingested"] = True
+    return results
+
+
+def bench_e2e(ctx: Dict, args) -> Dict:
+    if not ctx.get("ingested"):
+        import ingest_data
+        with quiet():
+            ingest_data.insert_course_data(course_list(ctx, args))
+
+    import ai
+    import intent_cache
+    import result_cache
+    import kb_cache
+
+    replay = load_replay(args.replay)
+    questions = args.questions or QUESTIONS
+
+    if args.record:
+        import rule_parser
+        rule_parser.RULE_PARSER_ENABLED = False  # 모든 질문의 LLM 응답을 기록
+        ai.llm, ai.kb = RecordingLLM(ai.get_llm(), replay["llm"]), RecordingKB(ai.get_kb(), replay["kb"])
+        for q in questions:
+            ai.analyze_question_with_ai(q)
+            ai.answer_kb(q)
+        with open(args.replay, "w", encoding="utf-8") as f:
+            json.dump(replay, f, ensure_ascii=False, indent=2)
+        print(f"기록 완료: {args.replay} (llm {len(replay['llm'])}건 / kb {len(replay['kb'])}건)")
+        return {}
+
+    llm = ai.llm = ReplayLLM(replay["llm"], args.llm_latency_ms / 1000)
+    kb = ai.kb = ReplayKB(replay["kb"], args.kb_latency_ms / 1000)
+
+    def clear_caches():
+        intent_cache.cache.clear()
+        result_cache.cache.clear()
+        kb_cache.cache.clear()
+
+    def run_db():
+        with quiet():
+            for q in questions:
+                ai.answer_question(q)
+
+    def run_kb():
+        with quiet():
+            for q in questions:
+                ai.answer_kb(q)
+
+    results = {}
+    metrics.reset()
+    results["answer_question_cold"] = summarize(measure(run_db, args.repeat, setup=clear_caches), len(questions))
+    results["answer_question_cold"]["stages"] = stage_summary()
+    results["answer_question_cold"]["llm_calls"] = llm.calls
+
+    run_db()
+    metrics.reset()
+    results["answer_question_warm"] = summarize(measure(run_db, args.repeat), len(questions))
+    results["answer_question_warm"]["stages"] = stage_summary()
+
+    metrics.reset()
+    results["answer_kb_cold"] = summarize(measure(run_kb, args.repeat, setup=clear_caches), len(questions))
+    results["answer_kb_cold"]["kb_calls"] = kb.calls
+
+    run_kb()
+    results["answer_kb_warm"] = summarize(measure(run_kb, args.repeat), len(questions))
+    return results
+
+
+STARTUP_SCRIPTS = {
+    "startup_import_ai": "import ai",
+    "startup_import_app": "import app",
+    "startup_bedrock_clients": "import ai; ai.get_llm(); ai.get_kb()",
+}
+
+
+def bench_startup(ctx: Dict, args) -> Dict:
+    """매번 새 인터프리터로 실행 (import 캐시가 없는 worker 기동 상황)"""
+    results = {}
+    for name, script in STARTUP_SCRIPTS.items():
+        def run():
+            subprocess.run([sys.executable, "-c", script], check=True, capture_output=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+        results[name] = summarize(measure(run, args.repeat))
+    return results
+
+
+RUNNERS = {"startup": bench_startup, "parse": bench_parse, "pdf": bench_pdf, "ingest": bench_ingest, "e2e": bench_e2e}
+
+
+# ============================== 결과 저장 / 비교 ==============================
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """median_ms 가 baseline 보다 threshold 비율 이상 (그리고 min_delta_ms 이상) 느려진 항목"""
+    regressions = []
+    for key in ("db", "cpu_count", "llm_latency_ms", "kb_latency_ms", "env"):
+        if current["meta"].get(key) != baseline.get("meta", {}).get(key):
+            print(f"⚠️ 실행 조건이 다릅니다: {key} = {baseline.get('meta', {}).get(key)} → {current['meta'].get(key)}")
+    print(f"\n{'benchmark':34} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "median_ms" not in base:
+            continue
+        old, new = base["median_ms"], result["median_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold and new - old > min_delta_ms:
+            flag = "  ⚠️ 느려짐"
+            regressions.append(name)
+        elif change < -threshold and old - new > min_delta_ms:
+            flag = "  빨라짐"
+        print(f"{name:34} {old:10.2f}ms {new:10.2f}ms {change:+8.1%}{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="수강신청 도우미 오프라인 벤치마크")
+    p.add_argument("--only", default=",".join(BENCHMARKS), help="실행할 벤치마크 (쉼표 구분): " + ",".join(BENCHMARKS))
+    p.add_argument("--output", default="", help="결과 JSON 경로 (없으면 화면에만 출력)")
+    p.add_argument("--baseline", default="", help="비교할 이전 결과 JSON")
+    p.add_argument("--threshold", type=float, default=0.10, help="느려짐 판정 비율 (기본 10%%)")
+    p.add_argument("--min-delta-ms", type=float, default=0.5, help="이보다 작은 차이는 잡음으로 보고 무시")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--pdf", default=DEFAULT_PDF_PATH)
+    p.add_argument("--pdf-repeat", type=int, default=1)
+    p.add_argument("--pdf-workers", type=int, default=None)
+    p.add_argument("--ingest-repeat", type=int, default=3)
+    p.add_argument("--ingest-modes", default="bulk,row")
+    p.add_argument("--db", choices=["sqlite", "mysql"], default="sqlite")
+    p.add_argument("--sqlite-path", default=DEFAULT_SQLITE_PATH)
+    p.add_argument("--replay", default=DEFAULT_REPLAY_PATH, help="기록된 llm / kb 응답 JSON")
+    p.add_argument("--record", action="store_true", help="실제 Bedrock 을 호출해서 --replay 파일에 기록")
+    p.add_argument("--llm-latency-ms", type=float, default=0.0)
+    p.add_argument("--kb-latency-ms", type=float, default=0.0)
+    p.add_argument("--question", dest="questions", action="append", help="e2e 질문 (여러 번 지정 가능)")
+    args = p.parse_args(argv)
+    args.only = [b.strip() for b in args.only.split(",") if b.strip()]
+    args.ingest_modes = [m.strip() for m in args.ingest_modes.split(",") if m.strip()]
+    unknown = set(args.only) - set(BENCHMARKS)
+    if unknown:
+        p.error(f"알 수 없는 벤치마크: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.db == "sqlite":
+        use_sqlite(args.sqlite_path)
+    else:
+        print(f"⚠️ MySQL {os.getenv('DB_HOST')}/{os.getenv('DB_NAME')} 의 courses / schedules 를 다시 적재합니다.")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "db": args.db,
+            "llm_latency_ms": args.llm_latency_ms,
+            "kb_latency_ms": args.kb_latency_ms,
+            "env": {k: os.getenv(k) for k in (
+                "INGEST_MODE", "INGEST_BATCH_SIZE", "SEARCH_ENGINE", "DB_POOL_SIZE",
+                "SCHEDULE_MINUTE_COLUMNS", "COURSE_OCCUPANCY_COLUMN", "COURSE_SEARCH_TEXT_COLUMN",
+            ) if os.getenv(k) is not None},
+        },
+        "results": {},
+    }
+
+    ctx: Dict = {}
+    # pdf 결과를 다른 벤치마크가 재사용하므로 pdf 를 먼저 실행
+    for name in sorted(args.only, key=lambda b: (b != "pdf", BENCHMARKS.index(b))):
+        print(f"[bench] {name} ...")
+        t0 = time.perf_counter()
+        results = RUNNERS[name](ctx, args)
+        for key, result in results.items():
+            print(f"  {key:32} median {result['median_ms']:10.2f}ms  p95 {result['p95_ms']:10.2f}ms"
+                  f"  ({result['items']}건)")
+        report["results"].update(results)
+        print(f"[bench] {name} 완료 {time.perf_counter() - t0:.1f}s")
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n느려진 항목 {len(regressions)}개: {', '.join(regressions)}")
+            return 1
+        print("\n느려진 항목 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
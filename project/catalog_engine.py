@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+catalog_engine.py - 메모리 기반 과목 검색 엔진 (읽기 전용)
+
+✔ courses + schedules 를 한 번만 읽어서 메모리에 보관
+✔ ai.search_courses 와 같은 filters dict 를 그대로 평가
+✔ 컬럼별 인덱스를 미리 계산
+   - 해시 인덱스 : main_category / grade / section / credit / day
+   - 구간 인덱스 : start_time / end_time (분 단위 정렬 배열 + bisect)
+   - n-gram 인덱스: LIKE '%..%' 로 검색하던 문자열 컬럼
+✔ SQL 경로와 같은 행, 같은 순서(code, section, day, start_time, id), LIMIT/OFFSET
+"""
+
+import threading
+import datetime
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import List, Dict, Optional, Set
+
+import pymysql
+from db import get_connection, SCHEDULE_MINUTE_COLUMNS
+from course_parser import DAY_INDEX
+
+RESULT_LIMIT = 100
+
+COURSE_COLUMNS = [
+    "id", "code", "name", "professor",
+    "main_category", "track_major",
+    "department", "university",
+    "grade", "room", "credit", "section", "lecture_hours", "online_hours",
+]
+SCHEDULE_COLUMNS = ["day", "start_time", "end_time"]
+
+
+# ============================================================
+# 값 정규화
+# ============================================================
+def to_minutes(value) -> Optional[int]:
+    """
+    TIME(timedelta) / time / 'HH:MM[:SS]' 문자열을 '자정 기준 분' 으로 변환.
+    MySQL 이 TIME 컬럼을 비교하는 방식과 같게 맞춘다.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, datetime.time):
+        return value.hour * 60 + value.minute
+    parts = str(value).strip().split(":")
+    try:
+        hour = int(parts[0])
+        minute = int(parts[1]) if len(parts) > 1 else 0
+    except ValueError:
+        return None
+    return hour * 60 + minute
+
+
+def like_text(value, strip_spaces: bool) -> Optional[str]:
+    """LIKE 비교용 문자열 (대소문자 무시, 필요하면 공백 제거). NULL 은 None."""
+    if value is None:
+        return None
+    text = str(value).casefold()
+    if strip_spaces:
+        text = text.replace(" ", "")
+    return text
+
+
+def _sort_key(value):
+    # MySQL ORDER BY 에서 NULL 은 가장 앞에 온다
+    if value is None:
+        return (0, "")
+    if isinstance(value, (datetime.timedelta, datetime.time)):
+        return (1, to_minutes(value))
+    return (1, value)
+
+
+# ============================================================
+# 인덱스 구조
+# ============================================================
+class NgramIndex:
+    """
+    LIKE '%q%' 용 n-gram 역색인.
+    1글자/2글자 gram 을 모두 저장하고, 질의 문자열의 gram posting 을 교집합한 뒤
+    실제 부분 문자열 포함 여부로 최종 확인한다.
+    """
+
+    def __init__(self, values: Dict[int, Optional[str]], strip_spaces: bool):
+        self.strip_spaces = strip_spaces
+        self.texts: Dict[int, str] = {}
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+
+        for key, value in values.items():
+            text = like_text(value, strip_spaces)
+            if text is None:
+                continue
+            self.texts[key] = text
+            for gram in self._grams(text):
+                self.postings[gram].add(key)
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    def search(self, query: str) -> Set[int]:
+        q = like_text(query, self.strip_spaces)
+        if not q:
+            # LIKE '%%' → NULL 이 아닌 모든 값
+            return set(self.texts)
+
+        if len(q) == 1:
+            grams = [q]
+        else:
+            grams = [q[i:i + 2] for i in range(len(q) - 1)]
+
+        candidates = None
+        for gram in sorted(set(grams), key=lambda g: len(self.postings.get(g, ()))):
+            posting = self.postings.get(gram)
+            if not posting:
+                return set()
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+
+        return {k for k in candidates if q in self.texts[k]}
+
+
+class HashIndex:
+    """값 → id 집합 (= 비교용)"""
+
+    def __init__(self, values: Dict[int, object]):
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        for key, value in values.items():
+            if value is None:
+                continue
+            self.postings[str(value).strip().casefold()].add(key)
+
+    def search(self, query: str) -> Set[int]:
+        return set(self.postings.get(str(query).strip().casefold(), ()))
+
+
+class IntervalIndex:
+    """
+    스케줄 행의 (분 단위) 시작/종료 시각을 정렬해 둔 구조.
+    start >= X, end <= Y 질의를 bisect 로 구간 탐색한다.
+    """
+
+    def __init__(self, values: Dict[int, Optional[int]]):
+        pairs = sorted((v, k) for k, v in values.items() if v is not None)
+        self.keys = [v for v, _ in pairs]
+        self.ids = [k for _, k in pairs]
+
+    def at_least(self, minutes: int) -> Set[int]:
+        return set(self.ids[bisect_left(self.keys, minutes):])
+
+    def at_most(self, minutes: int) -> Set[int]:
+        return set(self.ids[:bisect_right(self.keys, minutes)])
+
+
+# ============================================================
+# 카탈로그
+# ============================================================
+class CourseCatalog:
+    """
+    courses LEFT JOIN schedules 결과 행을 그대로 들고 있는 읽기 전용 카탈로그.
+    - course 단위 인덱스 → course id 집합
+    - schedule 단위 인덱스 → 행 번호 집합
+    """
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.rows_by_course: Dict[int, List[int]] = defaultdict(list)
+        courses: Dict[int, Dict] = {}
+
+        for i, r in enumerate(rows):
+            self.rows_by_course[r["id"]].append(i)
+            courses.setdefault(r["id"], r)
+
+        self.course_ids = set(courses)
+
+        def col(name):
+            return {cid: c.get(name) for cid, c in courses.items()}
+
+        # 해시 인덱스
+        self.main_category = HashIndex(col("main_category"))
+        self.grade = HashIndex(col("grade"))
+        self.section = HashIndex(col("section"))
+        self.credit = HashIndex(col("credit"))
+
+        # n-gram 인덱스 (REPLACE(col,' ','') 로 비교하던 컬럼은 공백 제거)
+        self.professor = NgramIndex(col("professor"), strip_spaces=False)
+        self.room = NgramIndex(col("room"), strip_spaces=False)
+        self.code_like = NgramIndex(col("code"), strip_spaces=False)
+        self.section_like = NgramIndex(col("section"), strip_spaces=False)
+        self.lecture_hours = NgramIndex(col("lecture_hours"), strip_spaces=False)
+        self.online_hours = NgramIndex(col("online_hours"), strip_spaces=False)
+        self.name_ns = NgramIndex(col("name"), strip_spaces=True)
+        self.code_ns = NgramIndex(col("code"), strip_spaces=True)
+        self.track_ns = NgramIndex(col("track_major"), strip_spaces=True)
+        self.department_ns = NgramIndex(col("department"), strip_spaces=True)
+        self.university_ns = NgramIndex(col("university"), strip_spaces=True)
+
+        # 스케줄 행 인덱스
+        # (SCHEDULE_MINUTE_COLUMNS 이면 SQL 경로와 같게 시간 미정(TBD) 행은 시간 조건에서 제외)
+        def minutes(r, key):
+            if SCHEDULE_MINUTE_COLUMNS and r.get("day") not in DAY_INDEX:
+                return None
+            return to_minutes(r.get(key))
+
+        self.day = HashIndex({i: r.get("day") for i, r in enumerate(rows)})
+        self.start_time = IntervalIndex({i: minutes(r, "start_time") for i, r in enumerate(rows)})
+        self.end_time = IntervalIndex({i: minutes(r, "end_time") for i, r in enumerate(rows)})
+
+    def __len__(self):
+        return len(self.course_ids)
+
+    # ---------- 검색 ----------
+    def search(self, intent: str, filters: Dict, limit: int = RESULT_LIMIT, offset: int = 0) -> List[Dict]:
+        """ai.search_courses 와 같은 조건으로 행을 찾는다."""
+
+        def val(key):
+            return (filters.get(key) or "").strip()
+
+        kw            = val("keyword")
+        prof          = val("professor")
+        track         = val("track_major")
+        dept          = val("department")
+        univ          = val("university")
+        main_cat      = val("main_category")
+        grade         = val("grade")
+        day           = val("day")
+        time_start    = val("time_start")
+        time_end      = val("time_end")
+        room          = val("room")
+        section       = val("section")
+        code          = val("code")
+        credit        = val("credit")
+        lecture_hours = val("lecture_hours")
+        online_hours  = val("online_hours")
+
+        course_sets: List[Set[int]] = []
+        row_sets: List[Set[int]] = []
+
+        # ====== course 단위 조건 ======
+        if prof:
+            course_sets.append(self.professor.search(prof))
+        if track:
+            course_sets.append(self.track_ns.search(track))
+        if dept:
+            course_sets.append(self.department_ns.search(dept))
+        if univ:
+            course_sets.append(self.university_ns.search(univ))
+        if main_cat:
+            course_sets.append(self.main_category.search(main_cat))
+        if grade.isdigit():
+            course_sets.append(self.grade.search(grade))
+        if room:
+            course_sets.append(self.room.search(room))
+        if section:
+            course_sets.append(self.section.search(section))
+        if code:
+            course_sets.append(self.code_like.search(code))
+        if credit.isdigit():
+            course_sets.append(self.credit.search(credit))
+        if lecture_hours:
+            course_sets.append(self.lecture_hours.search(lecture_hours))
+        if online_hours:
+            course_sets.append(self.online_hours.search(online_hours))
+
+        if kw:
+            if intent == "course_to_professor":
+                course_sets.append(self.name_ns.search(kw))
+            elif intent == "professor_to_course" and not prof:
+                course_sets.append(self.professor.search(kw))
+            else:
+                course_sets.append(
+                    self.name_ns.search(kw)
+                    | self.code_ns.search(kw)
+                    | self.room.search(kw)
+                    | self.section_like.search(kw)
+                    | self.online_hours.search(kw)
+                    | self.lecture_hours.search(kw)
+                    | self.track_ns.search(kw)
+                    | self.department_ns.search(kw)
+                )
+
+        # ====== schedule 단위 조건 ======
+        if day:
+            row_sets.append(self.day.search(day))
+        if time_start:
+            minutes = to_minutes(time_start)
+            row_sets.append(self.start_time.at_least(minutes) if minutes is not None else set())
+        if time_end:
+            minutes = to_minutes(time_end)
+            row_sets.append(self.end_time.at_most(minutes) if minutes is not None else set())
+
+        # ====== 완전 노필터 방지 ======
+        if not course_sets and not row_sets:
+            return []
+
+        if course_sets:
+            course_sets.sort(key=len)
+            cids = set.intersection(*course_sets)
+        else:
+            cids = self.course_ids
+
+        row_ids = [i for cid in cids for i in self.rows_by_course[cid]]
+        if row_sets:
+            row_sets.sort(key=len)
+            allowed = set.intersection(*row_sets)
+            row_ids = [i for i in row_ids if i in allowed]
+
+        row_ids.sort(key=lambda i: (
+            _sort_key(self.rows[i]["code"]),
+            _sort_key(self.rows[i]["section"]),
+            _sort_key(self.rows[i]["day"]),
+            _sort_key(self.rows[i]["start_time"]),
+            self.rows[i]["id"],
+            i,
+        ))
+
+        out = []
+        for i in row_ids[offset:offset + limit]:
+            r = dict(self.rows[i])
+            d  = r.get("day") or ""
+            st = r.get("start_time") or ""
+            et = r.get("end_time") or ""
+            r["time_str"] = f"{d} {st}~{et}" if d and st and et else ""
+            out.append(r)
+        return out
+
+
+# ============================================================
+# 로딩 (프로세스당 한 번)
+# ============================================================
+_catalog: Optional[CourseCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def load_catalog() -> CourseCatalog:
+    """DB 에서 courses + schedules 를 읽어 새 카탈로그를 만든다."""
+    conn = get_connection()
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cur:
+            cur.execute(
+                "SELECT "
+                + ", ".join(f"c.{c}" for c in COURSE_COLUMNS) + ", "
+                + ", ".join(f"s.{c}" for c in SCHEDULE_COLUMNS)
+                + " FROM courses c LEFT JOIN schedules s ON c.id = s.course_id"
+                + " ORDER BY c.id, s.id"
+            )
+            rows = list(cur.fetchall())
+    finally:
+        conn.close()
+
+    catalog = CourseCatalog(rows)
+    print(f"메모리 카탈로그 로드 완료: 과목 {len(catalog)}개 / 행 {len(rows)}개")
+    return catalog
+
+
+def get_catalog() -> CourseCatalog:
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+    return _catalog
+
+
+def reload_catalog() -> CourseCatalog:
+    """재적재(ingest) 이후 호출하면 새 카탈로그로 교체한다."""
+    global _catalog
+    catalog = load_catalog()
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+
+def invalidate_catalog():
+    """catalog 버전이 바뀌면 호출 → 다음 검색에서 새로 읽는다."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+def search_courses(intent: str, filters: Dict, limit: int = RESULT_LIMIT, offset: int = 0) -> List[Dict]:
+    return get_catalog().search(intent, filters, limit, offset)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+catalog_meta.py - catalog 버전 번호
+
+✔ catalog_meta 테이블의 catalog_version 을 적재(ingest)할 때마다 1 올림
+✔ 캐시 key 에 버전을 넣어서, 재적재 후에는 예전 결과를 절대 쓰지 않게 한다
+✔ 버전이 바뀐 것을 처음 본 프로세스는 등록된 콜백을 호출
+   (메모리 카탈로그 / 규칙 파서 사전 / 오타 사전 무효화)
+✔ 테이블이 없으면(migration 미적용) 버전은 None → 캐시를 쓰지 않는다
+✔ 조회는 CATALOG_VERSION_TTL 초에 한 번. 조회가 실패하면 마지막으로 본 버전을 그대로 쓴다
+   (DB 가 잠깐 끊겼다고 메모리 카탈로그 / 사전 / 결과 캐시를 버리지 않게)
+"""
+
+import os
+import time
+import threading
+from typing import Callable, List, Optional
+
+from db import get_connection
+
+# 버전 조회 간격(초). 0 이면 매번 조회 (PK 한 건 SELECT) → 재적재 후 최대 이 시간 동안은 예전 버전
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "5"))
+
+VERSION_KEY = "catalog_version"
+
+_lock = threading.Lock()
+_state = {"version": None, "checked": 0.0, "loaded": False}
+_listeners: List[Callable[[], None]] = []
+
+
+def bump_catalog_version(cur):
+    """
+    적재 트랜잭션 안에서 호출 (cursor 를 받아서 같은 트랜잭션으로 커밋되게 한다).
+    catalog_meta 테이블이 없어도 적재는 계속한다 (캐시는 버전이 None 이라 꺼져 있음)
+    """
+    try:
+        cur.execute("UPDATE catalog_meta SET value = value + 1 WHERE name = %s", (VERSION_KEY,))
+        if cur.rowcount == 0:
+            cur.execute("INSERT INTO catalog_meta (name, value) VALUES (%s, 1)", (VERSION_KEY,))
+    except Exception as e:
+        print("catalog 버전 갱신 오류:", e)
+
+
+def bump_catalog_version_now():
+    """별도 연결로 버전을 올리고 바로 커밋 (TRUNCATE 처럼 트랜잭션으로 묶을 수 없는 적재용)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            bump_catalog_version(cur)
+        conn.commit()
+    finally:
+        conn.close()
+    _state["checked"] = 0.0  # 같은 프로세스에서는 TTL 을 기다리지 않고 바로 새 버전을 보게 한다
+
+
+def load_catalog_version() -> Optional[int]:
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT value FROM catalog_meta WHERE name = %s", (VERSION_KEY,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    return int(row[0]) if row else None
+
+
+def on_version_change(callback: Callable[[], None]):
+    _listeners.append(callback)
+
+
+def current_version() -> Optional[int]:
+    """
+    현재 catalog 버전. 한 번도 조회하지 못했으면 None.
+    조회에 실패하면 마지막으로 본 버전을 반환하고 콜백은 호출하지 않는다 (다음 조회는 TTL 뒤).
+    이전에 본 버전과 다르면 등록된 콜백을 호출한다.
+    """
+    now = time.monotonic()
+    if CATALOG_VERSION_TTL > 0 and now - _state["checked"] < CATALOG_VERSION_TTL:
+        return _state["version"]
+
+    try:
+        version = load_catalog_version()
+    except Exception as e:
+        print("catalog 버전 조회 오류:", e)
+        with _lock:
+            _state["checked"] = now
+        return _state["version"]
+
+    with _lock:
+        changed = _state["loaded"] and version != _state["version"]
+        _state["version"] = version
+        _state["checked"] = now
+        _state["loaded"] = True
+
+    if changed:
+        print(f"catalog 버전 변경 → {version}")
+        for callback in _listeners:
+            try:
+                callback()
+            except Exception as e:
+                print("catalog 버전 변경 처리 오류:", e)
+    return version
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+conflict.py - 시간표 중복(충돌) 체크
+
+✔ schedules 행(parse_course_time 결과)을 minute-of-week 구간으로 변환
+✔ 구간을 시작 시각 순으로 훑는 sweep-line 으로 겹치는 쌍을 찾음
+   (minute-of-week 구간은 요일을 넘지 않으므로 한 번의 sweep 이 요일별 검사와 같다)
+✔ 분반마다 주간 점유 비트마스크(occupancy.py)를 두고, 조합 전체가 AND 로 겹치지 않으면 sweep 생략
+✔ 여러 후보 조합을 한 요청으로 처리 (DB 조회는 한 번)
+✔ LLM 호출 없음
+"""
+
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple, Iterable
+
+import pymysql
+from db import get_connection, COURSE_OCCUPANCY_COLUMN
+from catalog_engine import to_minutes
+from course_parser import DAY_INDEX, MINUTES_PER_DAY
+from occupancy import interval_mask, from_bytes
+
+DAY_NAMES = {v: k for k, v in DAY_INDEX.items()}
+
+# (code, section) → 강의 정보 + 구간 목록
+Section = Dict
+Interval = Tuple[int, int]
+
+
+# ============================== 입력 정리 ==============================
+def parse_course_key(item) -> Tuple[str, Optional[str]]:
+    """
+    "GEN1000-A" / "GEN1000" / {"code": "GEN1000", "section": "A"} → (code, section)
+    분반이 없으면 section=None (해당 과목의 모든 분반)
+    """
+    if isinstance(item, dict):
+        code = str(item.get("code") or "").strip()
+        section = str(item.get("section") or "").strip() or None
+    else:
+        code, _, section = str(item).strip().partition("-")
+        code, section = code.strip(), section.strip() or None
+    return code.upper(), section
+
+
+def format_minute(minute_of_week: int) -> str:
+    m = minute_of_week % MINUTES_PER_DAY
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+# ============================== DB 조회 ==============================
+def load_sections(codes: Iterable[str]) -> Dict[Tuple[str, str], Section]:
+    """
+    과목 코드 목록의 모든 분반과 수업 구간을 한 번에 읽는다.
+    같은 (code, section) 이 여러 행으로 저장된 경우 구간을 합친다.
+    시간 미정(TBD) 행은 구간에서 제외한다.
+    mask 는 courses.occupancy 가 있으면 그 값을, 없으면 구간으로 계산한 값을 쓴다.
+    """
+    codes = sorted(set(c for c in codes if c))
+    sections: Dict[Tuple[str, str], Section] = {}
+    if not codes:
+        return sections
+
+    conn = get_connection()
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cur:
+            marks = ",".join(["%s"] * len(codes))
+            cur.execute(
+                "SELECT c.code, c.section, c.name, c.professor, c.credit, "
+                + ("c.occupancy, " if COURSE_OCCUPANCY_COLUMN else "")
+                + "       s.day, s.start_time, s.end_time "
+                "FROM courses c LEFT JOIN schedules s ON c.id = s.course_id "
+                f"WHERE c.code IN ({marks})",
+                codes,
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    for r in rows:
+        key = (str(r["code"]).upper(), str(r["section"]))
+        sec = sections.setdefault(key, {
+            "code": r["code"],
+            "section": r["section"],
+            "name": r["name"],
+            "professor": r["professor"],
+            "credit": r["credit"],
+            "intervals": set(),
+            "stored_masks": [],
+        })
+        if r.get("occupancy") is not None:
+            sec["stored_masks"].append(from_bytes(r["occupancy"]))
+        day = r.get("day")
+        start, end = to_minutes(r.get("start_time")), to_minutes(r.get("end_time"))
+        if day in DAY_INDEX and start is not None and end is not None and end > start:
+            base = DAY_INDEX[day] * MINUTES_PER_DAY
+            sec["intervals"].add((base + start, base + end))
+
+    for sec in sections.values():
+        sec["intervals"] = sorted(sec["intervals"])
+        stored = sec.pop("stored_masks")
+        if stored:
+            mask = 0
+            for m in stored:
+                mask |= m
+        else:
+            mask = interval_mask(sec["intervals"])
+        sec["mask"] = mask
+    return sections
+
+
+# ============================== sweep-line ==============================
+def find_overlaps(labeled: List[Tuple[str, Interval]],
+                  same_group=None) -> List[Tuple[str, str, int, int]]:
+    """
+    (label, (start, end)) 목록에서 겹치는 쌍을 찾는다.
+    시작 시각 순으로 훑으면서, 아직 끝나지 않은 구간(active)과만 비교한다.
+    same_group(a, b) 가 True 인 쌍은 건너뛴다 (같은 과목의 다른 분반 등).
+    반환: (label_a, label_b, 겹침 시작, 겹침 끝)
+    """
+    overlaps = []
+    active: List[Tuple[int, int, str]] = []
+
+    for label, (start, end) in sorted(labeled, key=lambda x: x[1]):
+        active = [a for a in active if a[1] > start]
+        for a_start, a_end, a_label in active:
+            if a_label == label or (same_group and same_group(a_label, label)):
+                continue
+            overlaps.append((a_label, label, max(a_start, start), min(a_end, end)))
+        active.append((start, end, label))
+
+    return overlaps
+
+
+def check_sections(selected: List[Section]) -> List[Dict]:
+    """분반 목록의 충돌 목록 (같은 과목 코드의 분반끼리는 비교하지 않음)"""
+    # 빠른 경로: 과목 코드별 마스크가 서로 전혀 겹치지 않으면 충돌 없음
+    code_masks = defaultdict(int)
+    for sec in selected:
+        code_masks[sec["code"]] |= sec["mask"]
+    occupied = 0
+    for mask in code_masks.values():
+        if occupied & mask:
+            break
+        occupied |= mask
+    else:
+        return []
+
+    labeled = []
+    code_of = {}
+    for sec in selected:
+        label = f"{sec['code']}-{sec['section']}"
+        code_of[label] = sec["code"]
+        labeled.extend((label, iv) for iv in sec["intervals"])
+
+    seen = set()
+    conflicts = []
+    for a, b, start, end in find_overlaps(labeled, lambda x, y: code_of[x] == code_of[y]):
+        pair = tuple(sorted((a, b)))
+        if (pair, start) in seen:
+            continue
+        seen.add((pair, start))
+        conflicts.append({
+            "a": pair[0],
+            "b": pair[1],
+            "day": DAY_NAMES[start // MINUTES_PER_DAY],
+            "start": format_minute(start),
+            "end": format_minute(end),
+        })
+    return conflicts
+
+
+# ============================== API ==============================
+def check_candidate_sets(candidate_sets: List[List]) -> List[Dict]:
+    """
+    후보 조합 여러 개를 한 번에 검사한다.
+    각 조합: ["GEN1000-A", "V022006", {"code": ..., "section": ...}, ...]
+    분반을 생략한 과목은 모든 분반을 포함하고 ambiguous 에 표시한다.
+    """
+    parsed_sets = [[parse_course_key(item) for item in cands] for cands in candidate_sets]
+    sections = load_sections(code for keys in parsed_sets for code, _ in keys)
+
+    by_code = defaultdict(list)
+    for (code, _), sec in sections.items():
+        by_code[code].append(sec)
+
+    results = []
+    for keys in parsed_sets:
+        selected, missing, ambiguous = [], [], []
+        for code, section in keys:
+            if section is None:
+                secs = by_code.get(code, [])
+                if len(secs) > 1:
+                    ambiguous.append(code)
+            else:
+                sec = sections.get((code, section))
+                secs = [sec] if sec else []
+            if not secs:
+                missing.append(code if section is None else f"{code}-{section}")
+            selected.extend(secs)
+
+        conflicts = check_sections(selected)
+        results.append({
+            "courses": [f"{s['code']}-{s['section']}" for s in selected],
+            "has_conflict": bool(conflicts),
+            "conflicts": conflicts,
+            "missing": missing,
+            "ambiguous": ambiguous,
+        })
+    return results
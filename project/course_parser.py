@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import re
-from typing import List, Dict, Optional, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
 
 # --- 강의 교시 및 시간표 매핑 (사용자 제공 데이터를 기반으로 최종 확정) ---
 # Format: { '교시': ['시작_HH:MM:SS', '종료_HH:MM:SS'] }
@@ -99,6 +100,26 @@ DAY_MAP: Dict[str, str] = {
     '금': 'FRI', '토': 'SAT', '일': 'SUN'
 }
 
+# 요일 코드 → 주 단위 순서 (minute-of-week = 순서 * 1440 + 자정 기준 분)
+DAY_INDEX: Dict[str, int] = {
+    'MON': 0, 'TUE': 1, 'WED': 2, 'THU': 3, 'FRI': 4, 'SAT': 5, 'SUN': 6
+}
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(hhmmss: str) -> int:
+    """'HH:MM[:SS]' → 자정 기준 분"""
+    parts = hhmmss.split(':')
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def minute_of_week(day: str, hhmmss: str) -> Optional[int]:
+    """요일 코드 + 시각 → 월요일 00:00 기준 분. 요일이 없으면(TBD 등) None."""
+    if day not in DAY_INDEX:
+        return None
+    return DAY_INDEX[day] * MINUTES_PER_DAY + time_to_minutes(hhmmss)
+
+
 def get_time_map_for_day(day_char: str) -> Dict[str, List[str]]:
     """요일 문자에 따라 적절한 시간표 맵을 반환합니다."""
     if day_char in ['월', '수', '목']:
@@ -109,6 +130,22 @@ def get_time_map_for_day(day_char: str) -> Dict[str, List[str]]:
     return TUE_FRI_TIME_MAP
 
 
+# --- 미리 컴파일한 정규식 ---
+# 구분자: 쉼표(,) / 슬래시(/)
+SEGMENT_SPLIT_RE = re.compile(r'[,/]')
+# 요일 + 교시 조각 (예: '수7-8', '목8M-9M')
+DAY_PIECE_RE = re.compile(r'[월화수목금토일][0-9M\-~]+')
+# 요일 한 글자 + 나머지
+DAY_PERIOD_RE = re.compile(r'([월화수목금토일])(.+)')
+# 정규식 패턴: [시작교시][M?](~[종료교시][M?])?
+PERIOD_RE = re.compile(r'(\d+)(M?)(?:~|-)?(\d+)?(M?)$')
+
+DAY_CHARS = frozenset("월화수목금토일")
+
+# 전체 시간 문자열 단위 메모이제이션 크기 (책자 전체의 서로 다른 문자열은 수백 개 수준)
+PARSE_CACHE_SIZE = 4096
+
+
 def parse_time_segment(day_char: str, period_str: str) -> Optional[Dict[str, str]]:
     """
     단일 요일과 교시 문자열(예: '월', '3-4')을 파싱하여 시작/종료 시각을 반환합니다.
@@ -119,10 +156,9 @@ def parse_time_segment(day_char: str, period_str: str) -> Optional[Dict[str, str
     day = DAY_MAP[day_char]
     time_map = get_time_map_for_day(day_char) # 요일별 맵 선택
     
-    # 정규식 패턴: [시작교시][M?](~[종료교시][M?])?
     # 이 정규식은 '2', '2M', '3', '3M' 등 교시 코드를 분리합니다.
     # '금2-3M'와 같은 형태도 시작 교시='2', 종료 교시='3M'으로 정확히 분리합니다.
-    match = re.match(r'(\d+)(M?)(?:~|-)?(\d+)?(M?)$', period_str)
+    match = PERIOD_RE.match(period_str)
     if not match:
         return None
         
@@ -149,73 +185,91 @@ def parse_time_segment(day_char: str, period_str: str) -> Optional[Dict[str, str
         return None
 
     # 강의 시작 시각은 시작 교시의 시작 시각, 종료 시각은 종료 교시의 종료 시각을 사용합니다.
+    # start_minute / end_minute 는 주 단위 정수 시각 (minute-of-week)
     return {
         'day': day,
         'start_time': start_time_data[0], 
-        'end_time': end_time_data[1]      
+        'end_time': end_time_data[1],
+        'start_minute': minute_of_week(day, start_time_data[0]),
+        'end_minute': minute_of_week(day, end_time_data[1]),
     }
 
-def parse_course_time(time_str: str) -> List[Dict[str, str]]:
+
+def split_day_segments(seg: str) -> List[str]:
     """
-    강의 시간표 문자열을 파싱해 요일 및 교시를 모두 처리.
-    - 쉼표(,), 슬래시(/) 모두 구분자로 사용
-    - 요일이 연속된 형태(수7-8목8M-9M)도 자동 분리
+    segment 하나를 '요일+교시' 조각으로 나눈다.
+    요일이 연속된 경우(예: '화목3')에는 마지막 연속 요일 쌍 이후부터 사용한다.
+    (한 번의 순회로 마지막 쌍 위치를 찾는다)
     """
-    if not time_str or time_str in ['미정', '-']:
-        return []
+    cut = 0
+    prev_is_day = False
+    for i, ch in enumerate(seg):
+        is_day = ch in DAY_CHARS
+        if is_day and prev_is_day:
+            cut = i
+        prev_is_day = is_day
+    if cut:
+        seg = seg[cut:]
 
-    # 1) , 또는 / 를 모두 분리자로 처리
-    raw_segments = re.split(r'[,/]', time_str)
+    # 예: "수7-8목8M-9M" → ['수7-8', '목8M-9M']
+    pieces = DAY_PIECE_RE.findall(seg)
+    return pieces if pieces else [seg]
 
-    # 2) 각 segment 내부에서 '요일이 두 개 이상 연속 등장'하는 경우 자동 분리
-    cleaned_segments = []
-    DAY = "월화수목금토일"
 
-    for seg in raw_segments:
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_course_time_cached(time_str: str) -> Tuple[Tuple[str, str, str, int, int], ...]:
+    # 1) , 또는 / 를 모두 분리자로 처리
+    # 2) 각 segment 내부에서 '요일이 두 개 이상 연속 등장'하는 경우 자동 분리
+    cleaned_segments: List[str] = []
+    for seg in SEGMENT_SPLIT_RE.split(time_str):
         seg = seg.strip()
-        if not seg:
-            continue
-
-        # 예: "수7-8목8M-9M" → ['수7-8', '목8M-9M']
-        temp = []
-        i = 0
-        while i < len(seg):
-            if i + 1 < len(seg) and seg[i] in DAY and seg[i+1] in DAY:
-                # 두 요일이 연속되어 있으면 split
-                temp.append(seg[i])
-                seg = seg[i+1:]
-                i = 0
-                continue
-            i += 1
-
-        # 다시 정규식으로 완전 분리
-        pieces = re.findall(r'[월화수목금토일][0-9M\-~]+', seg)
-        if pieces:
-            cleaned_segments.extend(pieces)
-        else:
-            cleaned_segments.append(seg)
-
-    results: List[Dict[str, str]] = []
-    time_pattern = re.compile(r'([월화수목금토일])(.+)')
+        if seg:
+            cleaned_segments.extend(split_day_segments(seg))
 
+    results = []
     for segment in cleaned_segments:
-        match = time_pattern.match(segment)
+        match = DAY_PERIOD_RE.match(segment)
         if not match:
             continue
 
         day_char = match.group(1)
-        period_raw = match.group(2)
-
-        
-        period_str = period_raw.replace('상반기', '').replace('하반기', '').strip()
+        period_str = match.group(2).replace('상반기', '').replace('하반기', '').strip()
 
         parsed_segment = parse_time_segment(day_char, period_str)
         if parsed_segment:
-            results.append(parsed_segment)
+            results.append((
+                parsed_segment['day'], parsed_segment['start_time'], parsed_segment['end_time'],
+                parsed_segment['start_minute'], parsed_segment['end_minute'],
+            ))
 
-    if not results and time_str not in ['미정', '-']:
+    if not results:
         print(f"경고: 최종 강의 시간 문자열 파싱 실패: {time_str}")
 
-    return results
+    return tuple(results)
 
 
+def parse_course_time(time_str: str) -> List[Dict[str, Any]]:
+    """
+    강의 시간표 문자열을 파싱해 요일 및 교시를 모두 처리.
+    - 쉼표(,), 슬래시(/) 모두 구분자로 사용
+    - 요일이 연속된 형태(수7-8목8M-9M)도 자동 분리
+    - 같은 문자열은 LRU 캐시에서 꺼내고, 매번 새 dict 리스트를 반환
+    - 각 항목: day / start_time / end_time ('HH:MM:SS') + start_minute / end_minute (minute-of-week)
+    """
+    if not time_str or time_str in ['미정', '-']:
+        return []
+
+    return [
+        {'day': day, 'start_time': start, 'end_time': end,
+         'start_minute': start_minute, 'end_minute': end_minute}
+        for day, start, end, start_minute, end_minute in _parse_course_time_cached(time_str)
+    ]
+
+
+def parse_course_times(time_strs: List[str]) -> List[List[Dict[str, Any]]]:
+    """
+    여러 시간 문자열을 한 번에 파싱한다 (입력 순서대로 parse_course_time 결과).
+    서로 다른 문자열은 한 번씩만 파싱한다.
+    """
+    unique = {s: parse_course_time(s) for s in dict.fromkeys(time_strs)}
+    return [[dict(t) for t in unique[s]] for s in time_strs]
@@ -1,9 +1,40 @@
-
 import pymysql
 import os 
+import time
+import threading
+from collections import deque
 from typing import List, Dict
 
-def get_connection():
+# ============================================================
+# 커넥션 풀 설정 (환경 변수)
+# - DB_POOL_SIZE      : 프로세스당 최대 연결 수 (0이면 풀 없이 매번 새로 연결)
+# - DB_POOL_TIMEOUT   : 풀이 가득 찼을 때 대기할 최대 시간(초)
+# - DB_POOL_RECYCLE   : 이 시간(초)보다 오래된 연결은 닫고 새로 연결
+# - DB_POOL_PING_IDLE : 이 시간(초) 이상 쉬었던 연결은 꺼내기 전에 ping 으로 확인
+# ============================================================
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+
+# migrations.py 의 0001_schedule_minute_of_week 적용 후 1 로 설정
+# → schedules.start_minute / end_minute (minute-of-week 정수) 를 적재/검색에 사용
+SCHEDULE_MINUTE_COLUMNS = os.getenv("SCHEDULE_MINUTE_COLUMNS", "0") == "1"
+
+# migrations.py 의 0002_course_occupancy 적용 후 1 로 설정
+# → courses.occupancy (주간 점유 비트마스크, occupancy.py) 를 적재/충돌 검사에 사용
+COURSE_OCCUPANCY_COLUMN = os.getenv("COURSE_OCCUPANCY_COLUMN", "0") == "1"
+
+# migrations.py 의 0003_course_search_text 적용 후 1 로 설정
+# → courses.search_text (공백 제거 검색용 텍스트, ngram FULLTEXT 인덱스) 를 적재/키워드 검색에 사용
+COURSE_SEARCH_TEXT_COLUMN = os.getenv("COURSE_SEARCH_TEXT_COLUMN", "0") == "1"
+
+
+class PoolTimeoutError(Exception):
+    """풀에서 DB_POOL_TIMEOUT 안에 연결을 얻지 못했을 때 발생"""
+
+
+def _connect():
     """
     RDS MySQL 데이터베이스 연결을 설정합니다.
     보안상 민감한 정보는 환경 변수 또는 AWS Secrets Manager를 사용해야 합니다.
@@ -17,6 +48,211 @@ def get_connection():
         charset="utf8"
     )
 
+
+class PooledConnection:
+    """
+    풀에서 빌려온 pymysql 연결을 감싼다.
+    기존 코드처럼 conn.close() 를 호출하면 실제로 닫지 않고 풀에 반납한다.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise pymysql.err.InterfaceError("이미 반납된 연결입니다.")
+        return getattr(self._entry["conn"], name)
+
+    def close(self):
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool.release(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    프로세스 공용 pymysql 커넥션 풀.
+    - 최대 size 개까지 연결을 만들고, 반납된 연결은 재사용
+    - 오래 쉰 연결은 ping 으로 상태 확인, 오래된 연결은 재생성(recycle)
+    - checkout / wait / timeout 등 지표를 stats() 로 제공
+    """
+
+    def __init__(self, size: int, timeout: float, recycle: float, ping_idle: float):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+
+        self._idle = deque()
+        self._opened = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "ping_failures": 0,
+            "wait_seconds": 0.0,
+        }
+
+    # ---------- 내부 유틸 ----------
+    def _new_entry(self):
+        conn = _connect()
+        now = time.monotonic()
+        with self._cond:
+            self._metrics["created"] += 1
+        return {"conn": conn, "created": now, "last_used": now}
+
+    def _discard(self, entry):
+        try:
+            entry["conn"].close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, entry) -> bool:
+        now = time.monotonic()
+        if now - entry["created"] > self.recycle:
+            with self._cond:
+                self._metrics["recycled"] += 1
+            return False
+        if now - entry["last_used"] > self.ping_idle:
+            try:
+                entry["conn"].ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._metrics["ping_failures"] += 1
+                return False
+        return True
+
+    # ---------- 대여 / 반납 ----------
+    def acquire(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            entry = None
+            with self._cond:
+                while not self._idle and self._opened >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"DB 커넥션 풀 대기 시간 초과 ({self.timeout}s, size={self.size})"
+                        )
+                    if not waited:
+                        waited = True
+                        self._metrics["waits"] += 1
+                    wait_start = time.monotonic()
+                    self._cond.wait(remaining)
+                    self._metrics["wait_seconds"] += time.monotonic() - wait_start
+
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    # 새 연결 자리를 먼저 예약하고 락 밖에서 연결
+                    self._opened += 1
+
+            if entry is None:
+                try:
+                    entry = self._new_entry()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+
+            with self._cond:
+                self._metrics["checkouts"] += 1
+            return PooledConnection(self, entry)
+
+    def release(self, entry):
+        # 커밋되지 않은 트랜잭션은 되돌려서 다음 사용자에게 넘기지 않는다
+        try:
+            entry["conn"].rollback()
+        except Exception:
+            self._discard(entry)
+            return
+
+        entry["last_used"] = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def close_all(self):
+        """유휴 연결을 모두 닫는다 (사용 중인 연결은 반납 시 다시 풀로 들어감)"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            data = dict(self._metrics)
+            data["size"] = self.size
+            data["opened"] = self._opened
+            data["idle"] = len(self._idle)
+            data["in_use"] = self._opened - len(self._idle)
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """프로세스 공용 풀을 (처음 호출 시) 만들어 반환"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    recycle=DB_POOL_RECYCLE,
+                    ping_idle=DB_POOL_PING_IDLE,
+                )
+    return _pool
+
+
+def reset_pool():
+    """
+    fork 직후 worker 에서 호출. 부모에게서 복사된 연결은 소켓을 부모와 공유하므로
+    닫지 않고(닫으면 부모 연결이 끊김) 버리기만 한다. 다음 get_connection() 에서 새 풀 생성
+    """
+    global _pool, _pool_lock
+    _pool, _pool_lock = None, threading.Lock()
+
+
+def pool_stats() -> Dict:
+    """풀 지표 (checkouts / waits / timeouts / in_use / idle 등)"""
+    if DB_POOL_SIZE <= 0:
+        return {"size": 0}
+    return get_pool().stats()
+
+
+def get_connection():
+    """
+    DB 연결을 반환합니다.
+    DB_POOL_SIZE > 0 이면 커넥션 풀에서 빌려오며, close() 시 풀로 반납됩니다.
+    """
+    if DB_POOL_SIZE <= 0:
+        return _connect()
+    return get_pool().acquire()
+
 def search_courses(question: str) -> List[Dict]:
     """
     사용자 질문에서 키워드를 추출하여 과목을 검색하고, 결과를 AI에 전달합니다.
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+fuzzy.py - 과목명 / 교수명 / 트랙 오타·초성·줄임말 검색
+
+✔ 사전은 rule_parser.get_vocabulary() (courses 테이블 DISTINCT 값) 를 그대로 사용
+✔ 한글은 자모 단위로 분해해서 비교 ("컴퓨텅" ↔ "컴퓨팅" = 거리 1)
+✔ 매칭 단계 (위에서부터 점수가 높음)
+   1) 부분 문자열       : "클라우드" → 클라우드컴퓨팅
+   2) 줄임말 사전       : "컴공" → 컴퓨터공학
+   3) 초성             : "ㅋㄹㅇㄷ" → 클라우드컴퓨팅
+   4) 음절 머리글자     : "클컴" → 클라우드컴퓨팅 (각 글자가 순서대로 등장, 첫 글자 일치)
+   5) 편집 거리         : 자모 기준 거리 1~3 이내
+      (자모 bigram 역색인으로 후보를 먼저 거른 뒤 거리 계산 — q-gram 하한)
+✔ 인덱스는 프로세스당 한 번 만들고, 조회는 수 ms
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from rule_parser import compact, get_vocabulary, vocabulary_loaded
+
+# ============================== 설정 ==============================
+FUZZY_ENABLED = os.getenv("FUZZY_ENABLED", "1") == "1"
+
+# 편집 거리 허용치: 자모 길이 4 당 1, 최대 3
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "3"))
+
+# 자주 쓰는 줄임말 (공백 제거 형태) → 검색어
+ABBREVIATIONS = {
+    "컴공": "컴퓨터공학",
+    "컴과": "컴퓨터공학",
+    "소공": "소프트웨어공학",
+    "정통": "정보통신",
+    "전전": "전자전기",
+    "산공": "산업공학",
+    "기공": "기계공학",
+    "웹공": "웹공학",
+    "클컴": "클라우드컴퓨팅",
+    "데베": "데이터베이스",
+    "자구": "자료구조",
+    "운체": "운영체제",
+    "컴구": "컴퓨터구조",
+    "선대": "선형대수",
+    "미적": "미적분",
+    "일물": "일반물리",
+    "일화": "일반화학",
+    "경원": "경영학원론",
+    "마원": "마케팅원론",
+    "한발토": "한국어발표와토론",
+}
+
+FIELDS = ("name", "professor", "track_major", "department")
+
+# ============================== 한글 자모 ==============================
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSUNG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+            "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+
+
+def _split_syllable(ch: str) -> Optional[Tuple[int, int, int]]:
+    code = ord(ch)
+    if not HANGUL_BASE <= code <= HANGUL_LAST:
+        return None
+    code -= HANGUL_BASE
+    return code // 588, (code % 588) // 28, code % 28
+
+
+def decompose(text: str) -> str:
+    """"컴퓨팅" → "ㅋㅓㅁㅍㅠㅌㅣㅇ" (한글 외 문자는 소문자로 그대로)"""
+    out = []
+    for ch in text:
+        parts = _split_syllable(ch)
+        if parts is None:
+            out.append(ch.lower())
+        else:
+            cho, jung, jong = parts
+            out.append(CHOSUNG[cho] + JUNGSUNG[jung] + JONGSUNG[jong])
+    return "".join(out)
+
+
+def chosung(text: str) -> str:
+    """"클라우드" → "ㅋㄹㅇㄷ" (한글 외 문자는 소문자로 그대로)"""
+    out = []
+    for ch in text:
+        parts = _split_syllable(ch)
+        out.append(ch.lower() if parts is None else CHOSUNG[parts[0]])
+    return "".join(out)
+
+
+def is_chosung_query(text: str) -> bool:
+    return bool(text) and all(ch in CHOSUNG for ch in text)
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """편집 거리 (limit 를 넘으면 limit + 1 을 반환하고 중단)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        for j, cb in enumerate(b, start=1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def is_initials(query: str, key: str) -> bool:
+    """query 의 글자가 key 에 순서대로 모두 나오고, 첫 글자가 같은지 ("클컴" / "클라우드컴퓨팅")"""
+    if len(query) < 2 or not key or query[0] != key[0]:
+        return False
+    pos = 1
+    for ch in query[1:]:
+        pos = key.find(ch, pos)
+        if pos < 0:
+            return False
+        pos += 1
+    return True
+
+
+def jamo_bigrams(text: str) -> List[str]:
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+# ============================== 인덱스 ==============================
+class FuzzyIndex:
+    def __init__(self, vocab: Dict[str, Dict[str, str]]):
+        # 항목: (field, key(공백제거), 원래값, 초성)
+        self.entries: List[Tuple[str, str, str, str]] = []
+        self.jamo: List[str] = []
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        for field in FIELDS:
+            for key, value in vocab.get(field, {}).items():
+                idx = len(self.entries)
+                self.entries.append((field, key.lower(), value, chosung(key)))
+                self.jamo.append(decompose(key))
+                for gram in set(jamo_bigrams(self.jamo[idx])):
+                    self.grams[gram].append(idx)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def max_distance(q: str) -> int:
+        return min(FUZZY_MAX_DISTANCE, max(1, len(decompose(q)) // 4))
+
+    def typo_candidates(self, q: str) -> List[Tuple[int, int]]:
+        """
+        자모 편집 거리가 허용치 이내인 항목 [(거리, idx)].
+        편집 1번은 query 의 bigram 을 최대 2개 없애므로, 거리 k 이내인 항목은
+        query 의 서로 다른 bigram 중 (개수 - 2k) 개 이상을 가지고 있다.
+        역색인으로 그 조건을 만족하는 항목만 거리를 계산한다.
+        """
+        q_jamo = decompose(q)
+        limit = self.max_distance(q)
+        q_grams = set(jamo_bigrams(q_jamo))
+        need = len(q_grams) - 2 * limit
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in q_grams:
+            for idx in self.grams.get(gram, ()):
+                shared[idx] += 1
+
+        candidates = shared if need > 0 else range(len(self.entries))
+        found = []
+        for idx in candidates:
+            if need > 0 and shared[idx] < need:
+                continue
+            d = levenshtein(q_jamo, self.jamo[idx], limit)
+            if d <= limit:
+                found.append((d, idx))
+        return found
+
+    def suggest(self, query: str, fields=FIELDS, limit: int = 10) -> List[Dict]:
+        """
+        query 와 비슷한 값을 점수 순으로 반환한다.
+        반환: [{"field", "value", "score", "match"}, ...]
+        """
+        q = compact(query).lower()
+        if not q:
+            return []
+        fields = set(fields)
+        best: Dict[int, Tuple[float, str]] = {}
+
+        def hit(idx: int, score: float, match: str):
+            if self.entries[idx][0] in fields and score > best.get(idx, (0.0, ""))[0]:
+                best[idx] = (score, match)
+
+        expanded = ABBREVIATIONS.get(q)
+        q_cho = is_chosung_query(q)
+        for idx, (field, key, value, cho) in enumerate(self.entries):
+            if field not in fields:
+                continue
+            if q in key:
+                hit(idx, 1.0 if q == key else 0.95, "substring")
+            elif expanded and expanded in key:
+                hit(idx, 0.9, "abbreviation")
+            elif q_cho and q in cho:
+                hit(idx, 0.85 if cho.startswith(q) else 0.8, "chosung")
+            elif is_initials(q, key):
+                hit(idx, 0.75, "initials")
+
+        for d, idx in self.typo_candidates(q):
+            hit(idx, 0.7 * (1 - d / (self.max_distance(q) + 1)), "typo")
+
+        ranked = sorted(
+            best.items(),
+            key=lambda kv: (-kv[1][0], len(self.entries[kv[0]][2]), self.entries[kv[0]][2]),
+        )
+        return [
+            {
+                "field": self.entries[idx][0],
+                "value": self.entries[idx][2],
+                "score": round(score, 3),
+                "match": match,
+            }
+            for idx, (score, match) in ranked[:limit]
+        ]
+
+
+_index: Optional[FuzzyIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> FuzzyIndex:
+    """
+    사전 로드가 실패했거나(DB 장애 중 worker 기동 등) 비어 있으면 빈 인덱스를 돌려주고 저장하지 않는다
+    → DB 가 살아난 뒤 요청에서 다시 만든다 (재시도 간격은 rule_parser.RULE_PARSER_VOCAB_RETRY)
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                vocab = get_vocabulary()
+                index = FuzzyIndex(vocab)
+                if not (vocabulary_loaded() and index.entries):
+                    return index
+                _index = index
+    return _index
+
+
+def reload_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def suggest(query: str, fields=FIELDS, limit: int = 10) -> List[Dict]:
+    return get_index().suggest(query, fields, limit)
+
+
+# ============================== 검색 보정 ==============================
+# 필터 → 비슷한 값을 찾을 사전 필드
+CORRECTABLE_FILTERS = {
+    "keyword": ("name", "track_major", "department"),
+    "professor": ("professor",),
+    "track_major": ("track_major",),
+    "department": ("department",),
+}
+
+
+def correct_filters(filters: Dict) -> Tuple[Dict, List[Tuple[str, str]]]:
+    """
+    검색 결과가 없을 때 호출.
+    오타/초성/줄임말로 보이는 필터 값을 사전의 가장 가까운 값으로 바꾼다.
+    반환: (새 filters, [(원래값, 바꾼값), ...]) — 바꾼 것이 없으면 빈 목록
+    """
+    corrected = dict(filters)
+    changes = []
+    for key, fields in CORRECTABLE_FILTERS.items():
+        value = (filters.get(key) or "").strip()
+        if not value:
+            continue
+        matches = suggest(value, fields, limit=1)
+        if not matches or matches[0]["match"] == "substring":
+            continue  # 이미 LIKE 로 찾을 수 있는 값
+        new_value = matches[0]["value"]
+        if key == "keyword" and matches[0]["field"] != "name":
+            # 키워드가 트랙/학과 이름에 가까우면 해당 필터로 옮긴다
+            corrected["keyword"] = ""
+            corrected[matches[0]["field"]] = new_value
+        else:
+            corrected[key] = new_value
+        changes.append((value, new_value))
+    return corrected, changes
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn.conf.py - 운영 서버 설정 (Flask 개발 서버 대신 사용)
+
+    gunicorn -c gunicorn.conf.py
+
+✔ worker(프로세스) N개 × thread M개 → Bedrock 호출이 느린 요청이 있어도 다른 학생 요청은 계속 처리
+✔ preload_app: 부모가 한 번 import 한 뒤 fork (기동이 빠르고 메모리 공유)
+   → post_fork 에서 DB 풀 / sqlite / Redis / Bedrock 클라이언트 / 스레드 풀을 worker 별로 새로 만든다
+✔ post_worker_init 에서 warm-up (Bedrock 클라이언트, 규칙 파서 / 오타 사전)
+✔ 무중단 재시작: kill -HUP <master pid> → 새 worker 를 띄우고 기존 worker 는 진행 중인 요청을 끝낸 뒤 종료
+   (preload_app 이면 코드는 다시 읽지 않으므로 코드 배포 시에는 USR2 → 새 master 확인 후 기존 master 에 TERM)
+
+환경 변수로 조정:
+    GUNICORN_BIND, WEB_CONCURRENCY(worker 수), GUNICORN_THREADS, GUNICORN_TIMEOUT,
+    GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE, GUNICORN_MAX_REQUESTS, GUNICORN_PRELOAD
+"""
+
+import os
+import multiprocessing
+
+wsgi_app = "app:create_app()"
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+
+# 기본: CPU 수만큼 worker. 대부분의 시간은 Bedrock / DB 대기라 worker 당 thread 를 여러 개 둔다
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+
+# KB_ANSWER_TIMEOUT(20초) 보다 길게. /stream 은 스트리밍 중에도 worker 가 살아 있으므로 timeout 대상 아님
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# 0 이 아니면 worker 가 이 수만큼 요청을 처리한 뒤 교체됨 (메모리 누수 대비)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None  # 빈 값이면 접근 로그 끔
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # preload_app 이면 app 은 부모에서 이미 import 되어 있다 (아니면 여기서 import → worker 에서 처음 생성)
+    import app
+    app.reset_worker_state()
+
+
+def post_worker_init(worker):
+    from ai import warm_up
+    warm_up()
@@ -9,15 +9,20 @@ ingest_data.py — 2025-2 수강신청 PDF 완전 통합 파서 최종본
 ✔ 구분(전필/전선/전기/MD전선/선택필수교양/교양필수/일반교양) 자동 보정
 """
 
-import boto3
 import pymysql
 import io
 import os
 import re
+import sys
+import time
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Optional
-from db import get_connection
-from course_parser import parse_course_time
+from db import get_connection, SCHEDULE_MINUTE_COLUMNS, COURSE_OCCUPANCY_COLUMN, COURSE_SEARCH_TEXT_COLUMN
+from course_parser import parse_course_time, parse_course_times
+from occupancy import schedule_mask, to_bytes
+from search_text import search_text_value
+from catalog_meta import bump_catalog_version, bump_catalog_version_now
 
 # ============================== 설정 ==============================
 S3_BUCKET_NAME = "hong-bucket-25"
@@ -54,6 +59,17 @@ PAGE_CTX = {
 COL_INDEX: Dict[str, int] = {}
 last_category_code = ""  # (안 써도 되지만 일단 유지)
 
+# 상상력 / Micro Degree 과목군 (공백 제거 버전으로 매칭)
+LIB_GROUPS = {
+    "예술과스포츠상상력": "예술과 스포츠 상상력",
+    "인문학적상상력": "인문학적 상상력",
+    "사회과학적상상력": "사회과학적 상상력",
+    "과학기술상상력": "과학기술 상상력",
+    "융합적상상력": "융합적 상상력",
+    "한국어집중": "한국어 집중",
+    "MicroDegree과정": "Micro Degree 과정",
+}
+
 
 # ============================== PDF 로드 ==============================
 def get_pdf_data(bucket_name: str, file_key: str) -> Optional[bytes]:
@@ -63,6 +79,7 @@ def get_pdf_data(bucket_name: str, file_key: str) -> Optional[bytes]:
             return f.read()
 
     try:
+        import boto3  # S3 에서 받을 때만 필요 (import 비용이 커서 여기서 import)
         s3 = boto3.client("s3")
         obj = s3.get_object(Bucket=bucket_name, Key=file_key)
         print("S3 다운로드 성공")
@@ -221,349 +238,717 @@ def normalize_time_str(raw: str) -> str:
     return s.strip("/")
 
 
+# ============================== PDF 페이지 추출 (병렬) ==============================
+# pdfplumber 의 extract_text / extract_tables 가 가장 느리므로
+# 1단계) 페이지별 원시 텍스트/테이블 추출을 프로세스 풀로 병렬 처리하고
+# 2단계) 페이지 순서대로 context(PAGE_CTX, COL_INDEX ...)를 이어가며 파싱한다.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+_worker_pdf = None
+
+
+def extract_page_raw(page) -> Dict:
+    """페이지 1장의 원시 데이터 (텍스트 + 테이블)"""
+    return {
+        "page_number": page.page_number,
+        "text": page.extract_text() or "",
+        "tables": page.extract_tables() or [],
+    }
+
+
+def _init_pdf_worker(pdf_bytes: bytes):
+    # 워커 프로세스마다 PDF 를 한 번만 연다
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
+
+
+def _extract_pages_worker(page_indices: List[int]) -> List[Dict]:
+    return [extract_page_raw(_worker_pdf.pages[i]) for i in page_indices]
+
+
+def extract_raw_pages(pdf_bytes: bytes, workers: Optional[int] = None,
+                      page_indices: Optional[List[int]] = None) -> List[Dict]:
+    """
+    페이지별 원시 데이터를 페이지 순서대로 반환한다.
+    workers <= 1 이면 직렬로 추출한다. page_indices 를 주면 그 페이지만 추출.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        if page_indices is None:
+            page_indices = list(range(len(pdf.pages)))
+        if workers <= 1 or len(page_indices) <= 1:
+            return [extract_page_raw(pdf.pages[i]) for i in page_indices]
+
+    # 연속된 페이지 묶음(chunk) 단위로 나눠서 워커에 분배 (map 은 순서 보존)
+    chunk_size = max(1, len(page_indices) // (workers * 4))
+    chunks = [page_indices[i:i + chunk_size] for i in range(0, len(page_indices), chunk_size)]
+
+    raw_pages: List[Dict] = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_pdf_worker,
+                             initargs=(pdf_bytes,)) as pool:
+        for part in pool.map(_extract_pages_worker, chunks):
+            raw_pages.extend(part)
+    return raw_pages
+
+
 # ============================== PDF Parsing ==============================
-def extract_course_info_from_pdf(pdf_bytes: bytes) -> List[Dict]:
+def extract_course_info_from_pdf(pdf_bytes: bytes, workers: Optional[int] = None) -> List[Dict]:
+    raw_pages = extract_raw_pages(pdf_bytes, workers)
+    return parse_raw_pages(raw_pages)
+
+
+def new_carry() -> Dict[str, str]:
+    """페이지를 넘어 이어지는 행 단위 상태 (병합 셀 복원용)"""
+    return {"last_main_category": "", "last_code": "", "last_name": ""}
+
+
+def initial_context() -> Dict:
+    """파싱 시작 시점의 context (모듈 초기값과 동일)"""
+    return {
+        "page_ctx": {"university": "미정", "department": "미정", "track_major": "미정", "grade": "미정"},
+        "col_index": {},
+        "is_liberal": False,
+        "lib_group": "",
+        "general_liberal": "",
+        "carry": new_carry(),
+    }
+
+
+def capture_context(carry: Dict[str, str]) -> Dict:
+    """현재 전역 context + carry 의 스냅샷 (JSON 저장 가능)"""
+    return {
+        "page_ctx": dict(PAGE_CTX),
+        "col_index": dict(COL_INDEX),
+        "is_liberal": IS_LIBERAL,
+        "lib_group": CURRENT_LIB_GROUP,
+        "general_liberal": CURRENT_GENERAL_LIBERAL,
+        "carry": dict(carry),
+    }
+
+
+def restore_context(ctx: Dict) -> Dict[str, str]:
+    """스냅샷으로 전역 context 를 되돌리고 carry 를 반환"""
     global PAGE_CTX, COL_INDEX, IS_LIBERAL, CURRENT_LIB_GROUP, CURRENT_GENERAL_LIBERAL
+    PAGE_CTX = dict(ctx["page_ctx"])
+    COL_INDEX = {k: int(v) for k, v in ctx["col_index"].items()}
+    IS_LIBERAL = ctx["is_liberal"]
+    CURRENT_LIB_GROUP = ctx["lib_group"]
+    CURRENT_GENERAL_LIBERAL = ctx["general_liberal"]
+    return dict(ctx["carry"])
 
-    last_main_category = ""
-    last_code = ""
-    last_name = ""
 
-    pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
-    pages = pdf.pages
+def parse_raw_pages(raw_pages: List[Dict]) -> List[Dict]:
+    """
+    extract_raw_pages 결과를 페이지 순서대로 파싱한다.
+    페이지를 넘어 이어지는 context 는 기존 직렬 파서와 똑같이 전역 상태로 유지한다.
+    이전 호출이 남긴 전역 context 를 이어받지 않도록 초기값으로 되돌린 뒤 시작한다.
+    """
+    carry = restore_context(initial_context())
     results: List[Dict] = []
 
-    # 상상력 / Micro Degree 과목군 (공백 제거 버전으로 매칭)
-    LIB_GROUPS = {
-        "예술과스포츠상상력": "예술과 스포츠 상상력",
-        "인문학적상상력": "인문학적 상상력",
-        "사회과학적상상력": "사회과학적 상상력",
-        "과학기술상상력": "과학기술 상상력",
-        "융합적상상력": "융합적 상상력",
-        "한국어집중": "한국어 집중",
-        "MicroDegree과정": "Micro Degree 과정",
-    }
+    for raw in raw_pages:
+        results.extend(parse_page(raw, carry))
 
-    for page in pages:
-        text = page.extract_text() or ""
-        text_clean = text.replace(" ", "").replace("\u3000", "")
+    print(f"총 {len(results)}개 강의 파싱 완료")
+    return results
 
-        # ------------ 1) 페이지 상단 카테고리(일반교양/일반선택/교양필수/선택필수교양) 감지 ------------
-        header_found = False
 
-        if re.search(r"일\s*반\s*교\s*양", text) or "일반교양" in text_clean:
-            CURRENT_GENERAL_LIBERAL = "일반교양"
-            IS_LIBERAL = False
-            CURRENT_LIB_GROUP = ""
-            PAGE_CTX["track_major"] = "미정"
-            PAGE_CTX["department"] = "미정"
-            header_found = True
+def parse_page(raw: Dict, carry: Dict[str, str]) -> List[Dict]:
+    """
+    페이지 1장을 파싱한다.
+    전역 context(PAGE_CTX, COL_INDEX ...)와 carry 를 읽고, 페이지 끝 상태로 갱신한다.
+    """
+    global PAGE_CTX, COL_INDEX, IS_LIBERAL, CURRENT_LIB_GROUP, CURRENT_GENERAL_LIBERAL
 
-        elif re.search(r"일\s*반\s*선\s*택", text) or "일반선택" in text_clean:
-            CURRENT_GENERAL_LIBERAL = "일반선택"
-            IS_LIBERAL = False
-            CURRENT_LIB_GROUP = ""
-            PAGE_CTX["track_major"] = "미정"
-            PAGE_CTX["department"] = "미정"
-            header_found = True
+    last_main_category = carry["last_main_category"]
+    last_code = carry["last_code"]
+    last_name = carry["last_name"]
 
-        elif re.search(r"교\s*양\s*필\s*수", text) or "교양필수" in text_clean:
-            CURRENT_GENERAL_LIBERAL = "교양필수"
-            IS_LIBERAL = False
-            CURRENT_LIB_GROUP = ""
-            PAGE_CTX["track_major"] = "미정"
-            PAGE_CTX["department"] = "미정"
-            header_found = True
+    results: List[Dict] = []
 
-        elif "선택필수교양" in text_clean:
-            CURRENT_GENERAL_LIBERAL = "선택필수교양"
+    text = raw["text"]
+    text_clean = text.replace(" ", "").replace("\u3000", "")
+
+    # ------------ 1) 페이지 상단 카테고리(일반교양/일반선택/교양필수/선택필수교양) 감지 ------------
+    header_found = False
+
+    if re.search(r"일\s*반\s*교\s*양", text) or "일반교양" in text_clean:
+        CURRENT_GENERAL_LIBERAL = "일반교양"
+        IS_LIBERAL = False
+        CURRENT_LIB_GROUP = ""
+        PAGE_CTX["track_major"] = "미정"
+        PAGE_CTX["department"] = "미정"
+        header_found = True
+
+    elif re.search(r"일\s*반\s*선\s*택", text) or "일반선택" in text_clean:
+        CURRENT_GENERAL_LIBERAL = "일반선택"
+        IS_LIBERAL = False
+        CURRENT_LIB_GROUP = ""
+        PAGE_CTX["track_major"] = "미정"
+        PAGE_CTX["department"] = "미정"
+        header_found = True
+
+    elif re.search(r"교\s*양\s*필\s*수", text) or "교양필수" in text_clean:
+        CURRENT_GENERAL_LIBERAL = "교양필수"
+        IS_LIBERAL = False
+        CURRENT_LIB_GROUP = ""
+        PAGE_CTX["track_major"] = "미정"
+        PAGE_CTX["department"] = "미정"
+        header_found = True
+
+    elif "선택필수교양" in text_clean:
+        CURRENT_GENERAL_LIBERAL = "선택필수교양"
+        IS_LIBERAL = False
+        CURRENT_LIB_GROUP = ""
+        PAGE_CTX["track_major"] = "미정"
+        PAGE_CTX["department"] = "미정"
+        header_found = True
+
+    # 헤더가 전혀 없으면 이전 페이지 값 유지 (reset 하지 않음)
+
+    # ------------ 2) 상상력 / Micro Degree 과목군 감지 ------------
+    detected_group = None
+    for key, val in LIB_GROUPS.items():
+        if key in text_clean:
+            detected_group = val
+            break
+
+    if detected_group:
+        if detected_group == "Micro Degree 과정":
+            # Micro Degree는 선택필수교양처럼 취급하지만 IS_LIBERAL=False (별도)
+            IS_LIBERAL = False
+            CURRENT_LIB_GROUP = detected_group
+            # 일반 교양 카테고리는 비움 (구분 컬럼 + 문맥으로 결정)
+            CURRENT_GENERAL_LIBERAL = ""
+        else:
+            # 상상력 과목군 (예술과 스포츠 상상력 등)
+            IS_LIBERAL = True
+            CURRENT_LIB_GROUP = detected_group
+            # 상상력 페이지에서는 별도 교양 카테고리 텍스트는 없을 수 있으므로
+            # CURRENT_GENERAL_LIBERAL 은 그대로 두거나 별도로 판정
+        PAGE_CTX["track_major"] = "미정"
+        PAGE_CTX["department"] = "미정"
+    else:
+        # 새로운 과목군 텍스트는 없지만 "OO대학" 등장 → 전공 페이지로 전환
+        if re.search(r"[가-힣A-Za-z]+대학", text):
             IS_LIBERAL = False
             CURRENT_LIB_GROUP = ""
-            PAGE_CTX["track_major"] = "미정"
-            PAGE_CTX["department"] = "미정"
-            header_found = True
-
-        # 헤더가 전혀 없으면 이전 페이지 값 유지 (reset 하지 않음)
-
-        # ------------ 2) 상상력 / Micro Degree 과목군 감지 ------------
-        detected_group = None
-        for key, val in LIB_GROUPS.items():
-            if key in text_clean:
-                detected_group = val
-                break
-
-        if detected_group:
-            if detected_group == "Micro Degree 과정":
-                # Micro Degree는 선택필수교양처럼 취급하지만 IS_LIBERAL=False (별도)
-                IS_LIBERAL = False
-                CURRENT_LIB_GROUP = detected_group
-                # 일반 교양 카테고리는 비움 (구분 컬럼 + 문맥으로 결정)
-                CURRENT_GENERAL_LIBERAL = ""
+            # 전공 페이지이므로 교양 카테고리도 없다고 보고 초기화
+            CURRENT_GENERAL_LIBERAL = ""
+
+    # ------------ 3) 학부/학과/트랙 감지 ------------
+    dept = re.search(r"([가-힣A-Za-z0-9]+학부|[가-힣A-Za-z0-9]+학과|[가-힣A-Za-z0-9]+트랙)", text)
+    if dept:
+        name = dept.group(1)
+        if "트랙" in name:
+            PAGE_CTX["track_major"] = name
+        elif "학부" in name or "학과" in name:
+            PAGE_CTX["department"] = name
+
+    # ------------ 4) 테이블 파싱 ------------
+    tables = raw["tables"]
+    for table in tables:
+        if not table or len(table) < 2:
+            continue
+
+        # 교양필수 특수 헤더(2줄 헤더) 처리
+        if CURRENT_GENERAL_LIBERAL == "교양필수":
+            # table[1]이 빈 줄이면 → table[0]만 헤더
+            if table[1] and all((c is None or str(c).strip() == "") for c in table[1]):
+                real_header = table[0]
+                start = 2
             else:
-                # 상상력 과목군 (예술과 스포츠 상상력 등)
-                IS_LIBERAL = True
-                CURRENT_LIB_GROUP = detected_group
-                # 상상력 페이지에서는 별도 교양 카테고리 텍스트는 없을 수 있으므로
-                # CURRENT_GENERAL_LIBERAL 은 그대로 두거나 별도로 판정
-            PAGE_CTX["track_major"] = "미정"
-            PAGE_CTX["department"] = "미정"
-        else:
-            # 새로운 과목군 텍스트는 없지만 "OO대학" 등장 → 전공 페이지로 전환
-            if re.search(r"[가-힣A-Za-z]+대학", text):
-                IS_LIBERAL = False
-                CURRENT_LIB_GROUP = ""
-                # 전공 페이지이므로 교양 카테고리도 없다고 보고 초기화
-                CURRENT_GENERAL_LIBERAL = ""
-
-        # ------------ 3) 학부/학과/트랙 감지 ------------
-        dept = re.search(r"([가-힣A-Za-z0-9]+학부|[가-힣A-Za-z0-9]+학과|[가-힣A-Za-z0-9]+트랙)", text)
-        if dept:
-            name = dept.group(1)
-            if "트랙" in name:
-                PAGE_CTX["track_major"] = name
-            elif "학부" in name or "학과" in name:
-                PAGE_CTX["department"] = name
-
-        # ------------ 4) 테이블 파싱 ------------
-        tables = page.extract_tables() or []
-        for table in tables:
-            if not table or len(table) < 2:
+                # table[0]과 table[1]을 합친 헤더
+                merged_header = [
+                    ((h1 or "") + " " + (h2 or "")).strip()
+                    for h1, h2 in zip(table[0], table[1])
+                ]
+                real_header = merged_header
+                start = 2
+
+            idx = find_column_indices(real_header)
+            if not idx:
                 continue
+            COL_INDEX = idx
+        else:
+            # 일반 전공/일반 교양 처리
+            header = table[0]
+            idx = find_column_indices(header)
 
-            # 교양필수 특수 헤더(2줄 헤더) 처리
-            if CURRENT_GENERAL_LIBERAL == "교양필수":
-                # table[1]이 빈 줄이면 → table[0]만 헤더
-                if table[1] and all((c is None or str(c).strip() == "") for c in table[1]):
-                    real_header = table[0]
-                    start = 2
-                else:
-                    # table[0]과 table[1]을 합친 헤더
-                    merged_header = [
-                        ((h1 or "") + " " + (h2 or "")).strip()
-                        for h1, h2 in zip(table[0], table[1])
-                    ]
-                    real_header = merged_header
-                    start = 2
-
-                idx = find_column_indices(real_header)
-                if not idx:
-                    continue
+            if idx:
                 COL_INDEX = idx
+                start = 1
             else:
-                # 일반 전공/일반 교양 처리
-                header = table[0]
-                idx = find_column_indices(header)
+                # 이 테이블은 헤더 생략된 연속 테이블 → 이전 COL_INDEX 사용
+                if not COL_INDEX:
+                    continue
+                start = 0
 
-                if idx:
-                    COL_INDEX = idx
-                    start = 1
-                else:
-                    # 이 테이블은 헤더 생략된 연속 테이블 → 이전 COL_INDEX 사용
-                    if not COL_INDEX:
-                        continue
-                    start = 0
-
-            last_grade_in_table = PAGE_CTX.get("grade", "미정")
-
-            # ------------ 행(row) 단위 파싱 ------------
-            for row in table[start:]:
-                grade_idx = COL_INDEX.get("grade", -1)
-                if 0 <= grade_idx < len(row):
-                    g_val = row[grade_idx]
-                    raw_grade = str(g_val).strip() if g_val is not None else ""
-                else:
-                    raw_grade = ""
+        last_grade_in_table = PAGE_CTX.get("grade", "미정")
 
-                if raw_grade not in ["", "-", None, ""]:
-                    PAGE_CTX["grade"] = raw_grade
-                    last_grade_in_table = raw_grade
+        # ------------ 행(row) 단위 파싱 ------------
+        for row in table[start:]:
+            grade_idx = COL_INDEX.get("grade", -1)
+            if 0 <= grade_idx < len(row):
+                g_val = row[grade_idx]
+                raw_grade = str(g_val).strip() if g_val is not None else ""
+            else:
+                raw_grade = ""
 
-                # 여러 줄 분할 처리
-                splitted_rows = split_multiline_row_by_time(row, COL_INDEX)
+            if raw_grade not in ["", "-", None, ""]:
+                PAGE_CTX["grade"] = raw_grade
+                last_grade_in_table = raw_grade
 
-                for srow in splitted_rows:
-                    # 값 꺼내기 함수
-                    def get(f):
-                        return (srow.get(f, "") or "").strip()
+            # 여러 줄 분할 처리
+            splitted_rows = split_multiline_row_by_time(row, COL_INDEX)
 
-                    grade_value = last_grade_in_table
+            for srow in splitted_rows:
+                # 값 꺼내기 함수
+                def get(f):
+                    return (srow.get(f, "") or "").strip()
 
-                    # 과목 코드 / 이름 병합 셀 처리
-                    code_raw = get("code")
-                    name_raw = get("name")
+                grade_value = last_grade_in_table
 
-                    if code_raw in ["", "-"]:
-                        code = last_code
-                    else:
-                        code = code_raw
-                        last_code = code
+                # 과목 코드 / 이름 병합 셀 처리
+                code_raw = get("code")
+                name_raw = get("name")
 
-                    if name_raw in ["", "-"]:
-                        name = last_name
-                    else:
-                        name = name_raw
-                        last_name = name
+                if code_raw in ["", "-"]:
+                    code = last_code
+                else:
+                    code = code_raw
+                    last_code = code
 
-                    if not code:
-                        continue  # 진짜 코드가 없으면 스킵
+                if name_raw in ["", "-"]:
+                    name = last_name
+                else:
+                    name = name_raw
+                    last_name = name
 
-                    # ================== main_category 최종 결정 ==================
-                    raw_category = get("category")
-                    raw_category_clean = raw_category.replace(" ", "").replace("\n", "")
+                if not code:
+                    continue  # 진짜 코드가 없으면 스킵
 
-                    if raw_category_clean == "" or raw_category_clean == "-":
-                        # ---- 구분 셀이 비어 있을 때 우선순위 ----
-                        # 1) 선택필수교양 페이지 또는 상상력 그룹이면 무조건 선택필수교양
-                        if CURRENT_GENERAL_LIBERAL == "선택필수교양" or (
-                            IS_LIBERAL and CURRENT_LIB_GROUP != "Micro Degree 과정"
-                        ):
-                            main_category = "선택필수교양"
+                # ================== main_category 최종 결정 ==================
+                raw_category = get("category")
+                raw_category_clean = raw_category.replace(" ", "").replace("\n", "")
 
-                        # 2) 일반교양 / 일반선택 / 교양필수 페이지이면 그 값 사용
-                        elif CURRENT_GENERAL_LIBERAL:
-                            main_category = CURRENT_GENERAL_LIBERAL
+                if raw_category_clean == "" or raw_category_clean == "-":
+                    # ---- 구분 셀이 비어 있을 때 우선순위 ----
+                    # 1) 선택필수교양 페이지 또는 상상력 그룹이면 무조건 선택필수교양
+                    if CURRENT_GENERAL_LIBERAL == "선택필수교양" or (
+                        IS_LIBERAL and CURRENT_LIB_GROUP != "Micro Degree 과정"
+                    ):
+                        main_category = "선택필수교양"
 
-                        # 3) 그래도 없으면 이전 main_category 이어받기
-                        elif last_main_category:
-                            main_category = last_main_category
+                    # 2) 일반교양 / 일반선택 / 교양필수 페이지이면 그 값 사용
+                    elif CURRENT_GENERAL_LIBERAL:
+                        main_category = CURRENT_GENERAL_LIBERAL
 
-                        # 4) 아무 정보도 없을 때
-                        else:
-                            main_category = "미정"
+                    # 3) 그래도 없으면 이전 main_category 이어받기
+                    elif last_main_category:
+                        main_category = last_main_category
 
+                    # 4) 아무 정보도 없을 때
                     else:
-                        # ---- 새 구분이 실제로 적혀 있는 경우 ----
-                        major_cat = normalize_major_category(raw_category_clean)
-
-                        if major_cat:
-                            main_category = major_cat
-                        elif CURRENT_GENERAL_LIBERAL:
-                            main_category = CURRENT_GENERAL_LIBERAL
-                        elif IS_LIBERAL and CURRENT_LIB_GROUP != "Micro Degree 과정":
-                            main_category = "선택필수교양"
-                        else:
-                            main_category = "미정"
-
-                        # 새로운 main_category는 다음 행들을 위해 기억
-                        last_main_category = main_category
-
-
-                    # ================== 요일/교시 복원 ==================
-                    raw_time = get("time_str") or ""
-                    time_str_clean = normalize_time_str(raw_time)
-
-                    # 요일 붙어있는 경우 자동 분리
-                    DAY_CHARS = "월화수목금토일"
-                    fixed = []
-                    s = time_str_clean
-                    i = 0
-                    while i < len(s):
-                        if i + 1 < len(s) and s[i] in DAY_CHARS and s[i + 1] in DAY_CHARS:
-                            fixed.append(s[i] + "/")
-                            i += 1
-                        else:
-                            fixed.append(s[i])
-                            i += 1
-                    time_str_clean = "".join(fixed)
-
-                    # ================== course_group 결정 ==================
-                    # 상상력 과목군(IS_LIBERAL=True) 또는 Micro Degree 과정(CURRENT_LIB_GROUP) 은 course_group 유지
-                    if IS_LIBERAL or CURRENT_LIB_GROUP == "Micro Degree 과정":
-                        course_group_value = CURRENT_LIB_GROUP
+                        main_category = "미정"
+
+                else:
+                    # ---- 새 구분이 실제로 적혀 있는 경우 ----
+                    major_cat = normalize_major_category(raw_category_clean)
+
+                    if major_cat:
+                        main_category = major_cat
+                    elif CURRENT_GENERAL_LIBERAL:
+                        main_category = CURRENT_GENERAL_LIBERAL
+                    elif IS_LIBERAL and CURRENT_LIB_GROUP != "Micro Degree 과정":
+                        main_category = "선택필수교양"
                     else:
-                        course_group_value = "미정"
-
-                    # ================== 결과 저장 ==================
-                    result = {
-                        "code": code,
-                        "name": name,
-                        "main_category": main_category,
-                        "course_group": course_group_value,
-                        "university": PAGE_CTX["university"],
-                        "department": PAGE_CTX["department"],
-                        "track_major": PAGE_CTX["track_major"],
-                        "grade": grade_value,
-                        "section": get("section") or "000",
-                        "credit": get("credit"),
-                        "lecture_hours": get("lecture_hours"),
-                        "time_str": time_str_clean,
-                        "room": get("room"),
-                        "professor": get("professor"),
-                        "online_hours": get("online_hours") or "-",
-                        "page": page.page_number,
-                        "cross_enrollment_type": "",
-                    }
-
-                    results.append(result)
+                        main_category = "미정"
 
-    print(f"총 {len(results)}개 강의 파싱 완료")
+                    # 새로운 main_category는 다음 행들을 위해 기억
+                    last_main_category = main_category
+
+
+                # ================== 요일/교시 복원 ==================
+                raw_time = get("time_str") or ""
+                time_str_clean = normalize_time_str(raw_time)
+
+                # 요일 붙어있는 경우 자동 분리
+                DAY_CHARS = "월화수목금토일"
+                fixed = []
+                s = time_str_clean
+                i = 0
+                while i < len(s):
+                    if i + 1 < len(s) and s[i] in DAY_CHARS and s[i + 1] in DAY_CHARS:
+                        fixed.append(s[i] + "/")
+                        i += 1
+                    else:
+                        fixed.append(s[i])
+                        i += 1
+                time_str_clean = "".join(fixed)
+
+                # ================== course_group 결정 ==================
+                # 상상력 과목군(IS_LIBERAL=True) 또는 Micro Degree 과정(CURRENT_LIB_GROUP) 은 course_group 유지
+                if IS_LIBERAL or CURRENT_LIB_GROUP == "Micro Degree 과정":
+                    course_group_value = CURRENT_LIB_GROUP
+                else:
+                    course_group_value = "미정"
+
+                # ================== 결과 저장 ==================
+                result = {
+                    "code": code,
+                    "name": name,
+                    "main_category": main_category,
+                    "course_group": course_group_value,
+                    "university": PAGE_CTX["university"],
+                    "department": PAGE_CTX["department"],
+                    "track_major": PAGE_CTX["track_major"],
+                    "grade": grade_value,
+                    "section": get("section") or "000",
+                    "credit": get("credit"),
+                    "lecture_hours": get("lecture_hours"),
+                    "time_str": time_str_clean,
+                    "room": get("room"),
+                    "professor": get("professor"),
+                    "online_hours": get("online_hours") or "-",
+                    "page": raw["page_number"],
+                    "cross_enrollment_type": "",
+                }
+
+                results.append(result)
+
+    carry["last_main_category"] = last_main_category
+    carry["last_code"] = last_code
+    carry["last_name"] = last_name
     return results
 
 
 # ============================== DB INSERT ==============================
-def insert_course_data(course_list: List[Dict]):
+# 적재 모드
+# - "bulk": course id 를 클라이언트에서 부여하고 executemany(다중 row INSERT)로 배치 적재
+# - "row" : 기존 방식 (course 1건마다 INSERT + lastrowid)
+# - "swap": shadow 테이블(*_new)에 bulk 적재 → 검증 → RENAME TABLE 로 한 번에 교체
+INGEST_MODE = os.getenv("INGEST_MODE", "bulk")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+# swap 검증: 새 catalog 의 과목 수가 현재 운영 테이블의 이 비율보다 적으면 교체하지 않음
+SWAP_MIN_RATIO = float(os.getenv("SWAP_MIN_RATIO", "0.5"))
+
+COURSE_COLUMNS = [
+    "code", "name", "main_category", "course_group", "university", "department",
+    "track_major", "grade", "section", "credit", "lecture_hours", "room",
+    "professor", "page", "cross_enrollment_type", "online_hours",
+]
+if COURSE_OCCUPANCY_COLUMN:
+    COURSE_COLUMNS += ["occupancy"]
+if COURSE_SEARCH_TEXT_COLUMN:
+    COURSE_COLUMNS += ["search_text"]
+SCHEDULE_COLUMNS = ["course_id", "day", "start_time", "end_time", "room"]
+if SCHEDULE_MINUTE_COLUMNS:
+    SCHEDULE_COLUMNS += ["start_minute", "end_minute"]
+
+
+def course_values(course: Dict, parsed: List[Dict]) -> tuple:
+    """courses INSERT 값 (occupancy / search_text 는 여기서 계산)"""
+    if COURSE_OCCUPANCY_COLUMN:
+        course = dict(course, occupancy=to_bytes(schedule_mask(parsed)))
+    if COURSE_SEARCH_TEXT_COLUMN:
+        course = dict(course, search_text=search_text_value(course))
+    return tuple(course[c] for c in COURSE_COLUMNS)
+
+
+def schedule_values(course_id: int, course: Dict, parsed: List[Dict]) -> List[tuple]:
+    """parse_course_time 결과 → schedules INSERT 값 (시간 미정이면 TBD 1건)"""
+    if not parsed:
+        parsed = [
+            {"day": "TBD", "start_time": "00:00", "end_time": "00:00",
+             "start_minute": None, "end_minute": None}
+        ]
+
+    room_value = (course.get("room") or "").strip()
+    if room_value in ["", "-", None]:
+        room_value = None
+
+    rows = []
+    for t in parsed:
+        values = (course_id, t["day"], t["start_time"], t["end_time"], room_value)
+        if SCHEDULE_MINUTE_COLUMNS:
+            values += (t["start_minute"], t["end_minute"])
+        rows.append(values)
+    return rows
+
+
+def insert_sql(table: str, columns: List[str]) -> str:
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({','.join(['%s'] * len(columns))})"
+    )
+
+
+def executemany_batched(cur, sql: str, rows: List[tuple], batch_size: int):
+    """
+    batch_size 건씩 executemany.
+    pymysql 은 INSERT ... VALUES 를 다중 row INSERT 한 문장으로 합쳐서 보낸다.
+    """
+    for i in range(0, len(rows), batch_size):
+        cur.executemany(sql, rows[i:i + batch_size])
+
+
+def insert_rows_one_by_one(conn, course_list: List[Dict]):
+    """기존 방식: course 마다 INSERT 후 lastrowid 로 schedules INSERT"""
+    t0 = time.perf_counter()
+    n_sched = 0
+    with conn.cursor() as cur:
+        sql_course = insert_sql("courses", COURSE_COLUMNS)
+        sql_sched = insert_sql("schedules", SCHEDULE_COLUMNS)
+
+        for course in course_list:
+            time_str = course.pop("time_str", "")
+            parsed = parse_course_time(time_str)
+
+            cur.execute(sql_course, course_values(course, parsed))
+            cid = cur.lastrowid
+
+            for values in schedule_values(cid, course, parsed):
+                cur.execute(sql_sched, values)
+                n_sched += 1
+
+        conn.commit()
+    print(f"[ingest] row 모드: courses {len(course_list)}건 / schedules {n_sched}건 "
+          f"{time.perf_counter() - t0:.2f}s")
+    print("DB 저장 완료")
+
+
+def insert_rows_bulk(conn, course_list: List[Dict], batch_size: int,
+                     courses_table: str = "courses", schedules_table: str = "schedules"):
+    """
+    배치 적재:
+    1) 빈 테이블이므로 course id 를 1부터 클라이언트에서 부여
+    2) courses / schedules 를 batch_size 단위 다중 row INSERT
+    각 단계의 건수와 소요 시간을 출력한다.
+    """
+    # ---- 1) 시간 파싱 + 값 준비 ----
+    t0 = time.perf_counter()
+    course_rows = []
+    sched_rows = []
+    parsed_all = parse_course_times([c.get("time_str", "") for c in course_list])
+    for cid, (course, parsed) in enumerate(zip(course_list, parsed_all), start=1):
+        course_rows.append((cid,) + course_values(course, parsed))
+        sched_rows.extend(schedule_values(cid, course, parsed))
+    t1 = time.perf_counter()
+    print(f"[ingest] 준비: courses {len(course_rows)}건 / schedules {len(sched_rows)}건 {t1 - t0:.2f}s")
+
+    with conn.cursor() as cur:
+        # ---- 2) courses ----
+        executemany_batched(cur, insert_sql(courses_table, ["id"] + COURSE_COLUMNS), course_rows, batch_size)
+        t2 = time.perf_counter()
+        print(f"[ingest] courses INSERT: {len(course_rows)}건 {t2 - t1:.2f}s (batch={batch_size})")
+
+        # ---- 3) schedules ----
+        executemany_batched(cur, insert_sql(schedules_table, SCHEDULE_COLUMNS), sched_rows, batch_size)
+        t3 = time.perf_counter()
+        print(f"[ingest] schedules INSERT: {len(sched_rows)}건 {t3 - t2:.2f}s (batch={batch_size})")
+
+    conn.commit()
+    print(f"[ingest] COMMIT: {time.perf_counter() - t3:.2f}s / 전체 {time.perf_counter() - t0:.2f}s")
+    print("DB 저장 완료")
+
+
+def insert_course_data(course_list: List[Dict], mode: Optional[str] = None,
+                       batch_size: Optional[int] = None):
+    mode = mode or INGEST_MODE
+    batch_size = batch_size or INGEST_BATCH_SIZE
+
+    if mode == "swap":
+        swap_load_course_data(course_list, batch_size)
+        return
+
+    # 적재 전후로 catalog 버전을 올린다
+    # → 적재 중에 만들어진 캐시 항목도 적재가 끝나면 다시 쓰이지 않음
+    bump_catalog_version_now()
     conn = get_connection()
     try:
+        t0 = time.perf_counter()
         with conn.cursor() as cur:
             cur.execute("SET FOREIGN_KEY_CHECKS = 0;")
             cur.execute("TRUNCATE TABLE schedules")
             cur.execute("TRUNCATE TABLE courses")
             cur.execute("SET FOREIGN_KEY_CHECKS = 1;")
             conn.commit()
+        print(f"[ingest] TRUNCATE: {time.perf_counter() - t0:.2f}s")
+
+        if mode == "row":
+            insert_rows_one_by_one(conn, course_list)
+        else:
+            insert_rows_bulk(conn, course_list, batch_size)
+
+    finally:
+        conn.close()
+        bump_catalog_version_now()
+
 
+# ============================== Blue/Green 교체 ==============================
+def require_catalog_meta(cur):
+    """
+    swap 은 다른 프로세스(웹 worker)의 메모리 카탈로그 / 규칙 파서 사전 / 오타 사전을
+    catalog 버전 변경으로만 다시 읽게 한다 (catalog_meta.on_version_change).
+    catalog_meta 테이블(migration 0004)이 없으면 worker 가 예전 catalog 를 계속 쓰므로 중단한다.
+    """
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'catalog_meta'"
+    )
+    if not cur.fetchone()[0]:
+        raise RuntimeError("catalog_meta 테이블이 없습니다. python migrations.py 를 먼저 실행해주세요.")
+
+
+def add_shadow_foreign_key(cur):
+    """
+    CREATE TABLE ... LIKE 는 FOREIGN KEY 를 복사하지 않으므로 schedules_new → courses_new 로 다시 건다.
+    ON DELETE / ON UPDATE 규칙은 운영 schedules 의 것을 따른다.
+    이름은 지정하지 않는다 → schedules_new_ibfk_N 으로 생성되고 RENAME 시 schedules_ibfk_N 으로 바뀜
+    """
+    cur.execute(
+        "SELECT UPDATE_RULE, DELETE_RULE FROM information_schema.REFERENTIAL_CONSTRAINTS "
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'schedules' "
+        "AND REFERENCED_TABLE_NAME = 'courses'"
+    )
+    row = cur.fetchone()
+    rules = f" ON UPDATE {row[0]} ON DELETE {row[1]}" if row else ""
+    cur.execute(
+        "ALTER TABLE schedules_new "
+        f"ADD FOREIGN KEY (course_id) REFERENCES courses_new (id){rules}"
+    )
+
+
+def validate_shadow_tables(cur, course_list: List[Dict]):
+    """
+    shadow 테이블 검증. 문제가 있으면 RuntimeError 로 중단 (운영 테이블은 그대로).
+    - schedules_new.course_id → courses_new.id FOREIGN KEY 가 있음
+    - 건수가 입력과 일치
+    - 모든 강의에 스케줄이 1건 이상, 고아 스케줄 없음
+    - 현재 운영 catalog 대비 과목 수가 SWAP_MIN_RATIO 이상
+    """
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'schedules_new' AND COLUMN_NAME = 'course_id' "
+        "AND REFERENCED_TABLE_NAME = 'courses_new' AND REFERENCED_COLUMN_NAME = 'id'"
+    )
+    if not cur.fetchone()[0]:
+        raise RuntimeError("schedules_new.course_id → courses_new.id FOREIGN KEY 가 없습니다.")
+
+    cur.execute("SELECT COUNT(*) FROM courses_new")
+    n_courses = cur.fetchone()[0]
+    if n_courses != len(course_list) or n_courses == 0:
+        raise RuntimeError(f"courses_new 건수 불일치: {n_courses} (기대값 {len(course_list)})")
+
+    cur.execute(
+        "SELECT COUNT(*) FROM courses_new c "
+        "LEFT JOIN schedules_new s ON c.id = s.course_id WHERE s.course_id IS NULL"
+    )
+    if cur.fetchone()[0]:
+        raise RuntimeError("스케줄이 없는 강의가 있습니다.")
+
+    cur.execute(
+        "SELECT COUNT(*) FROM schedules_new s "
+        "LEFT JOIN courses_new c ON c.id = s.course_id WHERE c.id IS NULL"
+    )
+    if cur.fetchone()[0]:
+        raise RuntimeError("courses_new 에 없는 course_id 를 가진 스케줄이 있습니다.")
+
+    cur.execute("SELECT COUNT(DISTINCT main_category), COUNT(DISTINCT code) FROM courses_new")
+    n_categories, n_codes = cur.fetchone()
+    if n_categories == 0 or n_codes == 0:
+        raise RuntimeError("main_category / code 값이 비어 있습니다.")
+
+    cur.execute("SELECT COUNT(*) FROM courses")
+    n_live = cur.fetchone()[0]
+    if n_live and n_courses < n_live * SWAP_MIN_RATIO:
+        raise RuntimeError(
+            f"새 catalog 과목 수({n_courses})가 운영 catalog({n_live})의 "
+            f"{SWAP_MIN_RATIO:.0%} 미만입니다."
+        )
+
+    print(f"[swap] 검증 통과: courses {n_courses}건 (운영 {n_live}건), 과목코드 {n_codes}개")
+
+
+def swap_load_course_data(course_list: List[Dict], batch_size: int):
+    """
+    운영 테이블을 비우지 않고 새 catalog 로 교체한다.
+    1) courses_new / schedules_new 에 bulk 적재 후 FOREIGN KEY 추가 (기존 행도 이때 검사됨)
+    2) FOREIGN KEY / 건수 / 정합성 검증
+    3) RENAME TABLE 한 문장으로 courses ↔ courses_new 교체 (원자적)
+       이전 버전은 courses_old / schedules_old 로 남겨 rollback_catalog() 로 즉시 복구
+    4) catalog 버전을 올림 → 웹 worker 는 버전 변경을 보면(CATALOG_VERSION_TTL 간격으로 확인)
+       메모리 카탈로그 / 규칙 파서 사전 / 오타 사전을 다시 읽는다 (catalog_meta 필수)
+       RENAME TABLE 은 DDL 이라 그 자리에서 자동 커밋되므로 버전 갱신은 별도 트랜잭션이다
+       → 잠깐 동안은 새 테이블이 예전 버전 번호로 보일 수 있다 (TTL 을 더하면 최대 몇 초)
+    """
+    conn = get_connection()
+    try:
+        t0 = time.perf_counter()
         with conn.cursor() as cur:
-            sql_course = """
-                INSERT INTO courses
-                (code, name, main_category, course_group, university, department,
-                 track_major, grade, section, credit, lecture_hours, room,
-                 professor, page, cross_enrollment_type, online_hours)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """
-
-            sql_sched = """
-                INSERT INTO schedules (course_id, day, start_time, end_time, room)
-                VALUES (%s,%s,%s,%s,%s)
-            """
-
-            for course in course_list:
-                time_str = course.pop("time_str", "")
-                parsed = parse_course_time(time_str)
-
-                values = (
-                    course["code"], course["name"], course["main_category"],
-                    course["course_group"], course["university"], course["department"],
-                    course["track_major"], course["grade"], course["section"],
-                    course["credit"], course["lecture_hours"], course["room"],
-                    course["professor"], course["page"], course["cross_enrollment_type"],
-                    course["online_hours"]
-                )
-
-                cur.execute(sql_course, values)
-                cid = cur.lastrowid
-
-                if not parsed:
-                    parsed = [
-                        {"day": "TBD", "start_time": "00:00", "end_time": "00:00"}
-                    ]
-
-                for t in parsed:
-                    room_value = (course.get("room") or "").strip()
-                    if room_value in ["", "-", None]:
-                        room_value = None
-                    cur.execute(
-                        sql_sched,
-                        (cid, t["day"], t["start_time"], t["end_time"], room_value),
-                    )
+            require_catalog_meta(cur)
+            cur.execute("DROP TABLE IF EXISTS schedules_new")
+            cur.execute("DROP TABLE IF EXISTS courses_new")
+            cur.execute("CREATE TABLE courses_new LIKE courses")
+            cur.execute("CREATE TABLE schedules_new LIKE schedules")
+        print(f"[swap] shadow 테이블 준비: {time.perf_counter() - t0:.2f}s")
 
-            conn.commit()
-            print("DB 저장 완료")
+        insert_rows_bulk(conn, course_list, batch_size,
+                         courses_table="courses_new", schedules_table="schedules_new")
 
+        with conn.cursor() as cur:
+            add_shadow_foreign_key(cur)
+            validate_shadow_tables(cur, course_list)
+
+            t1 = time.perf_counter()
+            cur.execute("DROP TABLE IF EXISTS schedules_old")
+            cur.execute("DROP TABLE IF EXISTS courses_old")
+            cur.execute(
+                "RENAME TABLE "
+                "courses TO courses_old, courses_new TO courses, "
+                "schedules TO schedules_old, schedules_new TO schedules"
+            )
+            bump_catalog_version(cur)
+        conn.commit()
+        print(f"[swap] RENAME TABLE 교체 완료: {time.perf_counter() - t1:.2f}s "
+              f"(이전 버전: courses_old / schedules_old)")
+    finally:
+        conn.close()
+
+
+def rollback_catalog():
+    """
+    직전 swap 을 되돌린다. 현재 catalog 는 *_new 로 이동해 확인용으로 남긴다.
+    swap 과 마찬가지로 catalog 버전을 올려 웹 worker 가 되돌린 catalog 를 다시 읽게 한다.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            require_catalog_meta(cur)
+            cur.execute("DROP TABLE IF EXISTS schedules_new")
+            cur.execute("DROP TABLE IF EXISTS courses_new")
+            cur.execute(
+                "RENAME TABLE "
+                "courses TO courses_new, courses_old TO courses, "
+                "schedules TO schedules_new, schedules_old TO schedules"
+            )
+            bump_catalog_version(cur)
+        conn.commit()
+        print("[swap] 이전 catalog 로 복구 완료")
     finally:
         conn.close()
 
 
 # ============================== main ==============================
 if __name__ == "__main__":
+    if "--rollback" in sys.argv:
+        rollback_catalog()
+        exit()
+
     data = get_pdf_data(S3_BUCKET_NAME, S3_FILE_KEY)
     if not data:
         print("PDF 불러오기 실패")
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+ingest_incremental.py — 정정된 수강신청 PDF 증분 재적재
+
+✔ 페이지별 fingerprint(content stream 해시)로 바뀐 페이지만 다시 추출
+✔ 페이지 내용과 페이지 진입 context 가 이전 실행과 같으면 이전 파싱 결과 재사용
+   → 바뀐 페이지 + 그 때문에 context 가 달라진 뒤쪽 페이지만 다시 파싱
+✔ 현재 DB 와 (code, section) 기준으로 row diff 후
+   INSERT / UPDATE / DELETE 만 한 트랜잭션으로 적용 (TRUNCATE 없음)
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import pdfplumber
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
+from pdfminer.pdftypes import resolve1
+
+import ingest_data
+from db import get_connection
+from catalog_engine import to_minutes
+from catalog_meta import bump_catalog_version
+from course_parser import parse_course_times
+
+# 이전 실행의 페이지별 원시 데이터 / context / 파싱 결과
+PAGE_MANIFEST_PATH = os.getenv("PAGE_MANIFEST_PATH", ".ingest_cache/page_manifest.json")
+
+TIME_COLUMNS = {"start_time", "end_time"}
+
+
+# ============================== 페이지 fingerprint ==============================
+def page_fingerprints(pdf_bytes: bytes) -> List[str]:
+    """
+    페이지마다 content stream + mediabox 해시.
+    extract_text/extract_tables 없이 계산하므로 전체 책자도 1초 미만.
+    """
+    fps = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            h = hashlib.sha256()
+            for stream in page.page_obj.contents:
+                h.update(resolve1(stream).get_data())
+            h.update(repr(page.page_obj.mediabox).encode())
+            fps.append(h.hexdigest())
+    return fps
+
+
+def load_manifest(path: str = PAGE_MANIFEST_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {"pages": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict, path: str = PAGE_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ============================== 증분 파싱 ==============================
+def parse_incremental(pdf_bytes: bytes, manifest: Dict,
+                      workers: Optional[int] = None) -> Tuple[List[Dict], Dict, Dict]:
+    """
+    반환: (전체 강의 리스트, 새 manifest, 통계)
+    결과는 extract_course_info_from_pdf 와 동일하다.
+    """
+    fps = page_fingerprints(pdf_bytes)
+    old_pages = manifest.get("pages", [])
+    raw_by_fp = {p["fingerprint"]: p["raw"] for p in old_pages}
+
+    # ---- 1) 처음 보는 페이지만 원시 추출 (병렬) ----
+    missing = [i for i, fp in enumerate(fps) if fp not in raw_by_fp]
+    if missing:
+        for raw in ingest_data.extract_raw_pages(pdf_bytes, workers, missing):
+            raw_by_fp[fps[raw["page_number"] - 1]] = raw
+
+    # ---- 2) context 를 이어가며 필요한 페이지만 다시 파싱 ----
+    ctx = ingest_data.initial_context()
+    pages = []
+    courses: List[Dict] = []
+    reparsed = 0
+
+    for i, fp in enumerate(fps):
+        old = old_pages[i] if i < len(old_pages) else None
+
+        if old and old["fingerprint"] == fp and old["ctx_in"] == ctx:
+            rows = old["rows"]
+            ctx_out = old["ctx_out"]
+        else:
+            raw = dict(raw_by_fp[fp], page_number=i + 1)
+            carry = ingest_data.restore_context(ctx)
+            rows = ingest_data.parse_page(raw, carry)
+            ctx_out = ingest_data.capture_context(carry)
+            reparsed += 1
+
+        pages.append({
+            "fingerprint": fp,
+            "raw": raw_by_fp[fp],
+            "ctx_in": ctx,
+            "ctx_out": ctx_out,
+            "rows": rows,
+        })
+        courses.extend(dict(r) for r in rows)
+        ctx = ctx_out
+
+    stats = {"pages": len(fps), "extracted": len(missing), "reparsed": reparsed}
+    return courses, {"pages": pages}, stats
+
+
+# ============================== DB diff ==============================
+def _norm(column: str, value):
+    if value is None:
+        return None
+    if column in TIME_COLUMNS:
+        return to_minutes(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    return str(value)
+
+
+def _norm_row(columns: List[str], values) -> tuple:
+    return tuple(_norm(c, v) for c, v in zip(columns, values))
+
+
+def load_db_groups(cur) -> Dict[tuple, List[Dict]]:
+    """현재 DB 의 courses + schedules 를 (code, section) 별로 묶는다 (id 순서)"""
+    course_cols = ingest_data.COURSE_COLUMNS
+    sched_cols = ingest_data.SCHEDULE_COLUMNS[1:]
+
+    cur.execute(f"SELECT {', '.join(sched_cols)}, course_id FROM schedules ORDER BY id")
+    scheds = defaultdict(list)
+    for row in cur.fetchall():
+        scheds[row[-1]].append(_norm_row(sched_cols, row[:-1]))
+
+    cur.execute(f"SELECT id, {', '.join(course_cols)} FROM courses ORDER BY id")
+    groups = defaultdict(list)
+    for row in cur.fetchall():
+        values = _norm_row(course_cols, row[1:])
+        course = dict(zip(course_cols, row[1:]))
+        groups[(course["code"], course["section"])].append({
+            "id": row[0],
+            "values": values,
+            "scheds": scheds.get(row[0], []),
+        })
+    return groups
+
+
+def build_new_groups(course_list: List[Dict]) -> Dict[tuple, List[Dict]]:
+    """새로 파싱한 강의를 DB 와 같은 형태로 (code, section) 별로 묶는다"""
+    course_cols = ingest_data.COURSE_COLUMNS
+    sched_cols = ingest_data.SCHEDULE_COLUMNS[1:]
+
+    groups = defaultdict(list)
+    parsed_all = parse_course_times([c.get("time_str", "") for c in course_list])
+    for course, parsed in zip(course_list, parsed_all):
+        raw_values = ingest_data.course_values(course, parsed)
+        raw_scheds = [v[1:] for v in ingest_data.schedule_values(0, course, parsed)]
+        groups[(course["code"], course["section"])].append({
+            "raw_values": raw_values,
+            "raw_scheds": raw_scheds,
+            "values": _norm_row(course_cols, raw_values),
+            "scheds": [_norm_row(sched_cols, s) for s in raw_scheds],
+        })
+    return groups
+
+
+def apply_diff(conn, old_groups: Dict, new_groups: Dict) -> Dict[str, int]:
+    """
+    (code, section) 그룹 단위로 비교해서
+    - 같은 위치의 row 는 UPDATE (스케줄이 바뀌었으면 교체)
+    - 새로 생긴 row 는 INSERT, 사라진 row 는 DELETE
+    를 한 트랜잭션으로 적용한다.
+    """
+    course_cols = ingest_data.COURSE_COLUMNS
+    sql_insert = ingest_data.insert_sql("courses", course_cols)
+    sql_update = (
+        "UPDATE courses SET "
+        + ", ".join(f"{c} = %s" for c in course_cols)
+        + " WHERE id = %s"
+    )
+    sql_sched = ingest_data.insert_sql("schedules", ingest_data.SCHEDULE_COLUMNS)
+
+    stats = {"inserted": 0, "updated": 0, "deleted": 0, "schedules_replaced": 0, "unchanged": 0}
+    deleted_ids = []
+
+    try:
+        with conn.cursor() as cur:
+            for key in sorted(set(old_groups) | set(new_groups)):
+                olds = old_groups.get(key, [])
+                news = new_groups.get(key, [])
+
+                for j in range(max(len(olds), len(news))):
+                    old = olds[j] if j < len(olds) else None
+                    new = news[j] if j < len(news) else None
+
+                    if new is None:
+                        deleted_ids.append(old["id"])
+                        continue
+
+                    if old is None:
+                        cur.execute(sql_insert, new["raw_values"])
+                        cid = cur.lastrowid
+                        cur.executemany(sql_sched, [(cid,) + s for s in new["raw_scheds"]])
+                        stats["inserted"] += 1
+                        continue
+
+                    changed = False
+                    if old["values"] != new["values"]:
+                        cur.execute(sql_update, new["raw_values"] + (old["id"],))
+                        stats["updated"] += 1
+                        changed = True
+                    if old["scheds"] != new["scheds"]:
+                        cur.execute("DELETE FROM schedules WHERE course_id = %s", (old["id"],))
+                        cur.executemany(sql_sched, [(old["id"],) + s for s in new["raw_scheds"]])
+                        stats["schedules_replaced"] += 1
+                        changed = True
+                    if not changed:
+                        stats["unchanged"] += 1
+
+            for i in range(0, len(deleted_ids), 500):
+                chunk = deleted_ids[i:i + 500]
+                marks = ",".join(["%s"] * len(chunk))
+                cur.execute(f"DELETE FROM schedules WHERE course_id IN ({marks})", chunk)
+                cur.execute(f"DELETE FROM courses WHERE id IN ({marks})", chunk)
+            stats["deleted"] = len(deleted_ids)
+
+            if stats["inserted"] or stats["updated"] or stats["deleted"] or stats["schedules_replaced"]:
+                bump_catalog_version(cur)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return stats
+
+
+# ============================== 실행 ==============================
+def incremental_ingest(pdf_bytes: bytes, workers: Optional[int] = None,
+                       manifest_path: str = PAGE_MANIFEST_PATH) -> Dict[str, int]:
+    t0 = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    courses, new_manifest, parse_stats = parse_incremental(pdf_bytes, manifest, workers)
+    t1 = time.perf_counter()
+    print(f"[incremental] 페이지 {parse_stats['pages']}개 중 추출 {parse_stats['extracted']}개 / "
+          f"재파싱 {parse_stats['reparsed']}개, 강의 {len(courses)}건 {t1 - t0:.2f}s")
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            old_groups = load_db_groups(cur)
+        new_groups = build_new_groups(courses)
+        stats = apply_diff(conn, old_groups, new_groups)
+    finally:
+        conn.close()
+
+    # DB 반영이 끝난 뒤에만 manifest 갱신
+    save_manifest(new_manifest, manifest_path)
+
+    print(f"[incremental] INSERT {stats['inserted']} / UPDATE {stats['updated']} / "
+          f"DELETE {stats['deleted']} / 스케줄 교체 {stats['schedules_replaced']} / "
+          f"변경 없음 {stats['unchanged']} ({time.perf_counter() - t1:.2f}s)")
+    return dict(stats, **parse_stats)
+
+
+if __name__ == "__main__":
+    data = ingest_data.get_pdf_data(ingest_data.S3_BUCKET_NAME, ingest_data.S3_FILE_KEY)
+    if not data:
+        print("PDF 불러오기 실패")
+        exit()
+
+    incremental_ingest(data)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+intent_cache.py - LLM intent 분석 결과 캐시
+
+✔ 질문을 정규화한 문자열을 key 로 사용 (공백 / 문장부호 / 조사 차이 무시)
+✔ 메모리 LRU + TTL
+✔ (선택) sqlite 파일 기반 영구 캐시 → 프로세스 재시작 후에도 유지
+✔ hit / miss 카운터
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# ============================== 설정 ==============================
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "1024"))
+INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "86400"))
+INTENT_CACHE_PATH = os.getenv("INTENT_CACHE_PATH", "")  # 비어 있으면 디스크 캐시 사용 안 함
+
+# 프롬프트/필터 구조 또는 정규화 규칙이 바뀌면 올려서 예전 결과를 무효화
+INTENT_CACHE_VERSION = "2"
+
+# 단어 끝에 붙는 조사 (긴 것부터 검사)
+JOSA = sorted([
+    "은", "는", "이", "가", "을", "를", "에", "의", "도", "만", "와", "과", "로",
+    "으로", "에서", "에게", "한테", "까지", "부터", "이랑", "랑", "하고", "이요", "요",
+], key=len, reverse=True)
+
+# 의미가 있는 기호 (C++, C#) → 항상 남긴다
+KEEP_SYMBOLS = {"+", "#"}
+
+
+# ============================== 질문 정규화 ==============================
+def strip_josa(token: str) -> str:
+    """단어 끝의 조사를 하나 떼어낸다. 떼고 나서 2글자 미만이면 그대로 둔다."""
+    for josa in JOSA:
+        if token.endswith(josa) and len(token) - len(josa) >= 2:
+            return token[:-len(josa)]
+    return token
+
+
+def strip_sentence_punctuation(text: str) -> str:
+    """
+    문장부호(? ! , ~ 괄호 따옴표 등)만 공백으로 바꾼다.
+    - + # 은 남긴다 (C++ ≠ C)
+    - 글자/숫자 사이의 기호는 남긴다 (1.5H ≠ 15H, 10:00, 1-3)
+    """
+    out = []
+    for i, ch in enumerate(text):
+        if unicodedata.category(ch)[0] not in ("P", "S") or ch in KEEP_SYMBOLS:
+            out.append(ch)
+            continue
+        prev_ch = text[i - 1] if i > 0 else ""
+        next_ch = text[i + 1] if i + 1 < len(text) else ""
+        if prev_ch.isalnum() and next_ch.isalnum() and (prev_ch.isdigit() or next_ch.isdigit()):
+            out.append(ch)
+        else:
+            out.append(" ")
+    return "".join(out)
+
+
+def normalize_question(question: str) -> str:
+    """
+    캐시 key 용 질문 정규화
+    - 유니코드 NFC + 소문자
+    - 문장부호 제거 (의미 있는 기호 / 숫자 사이 기호는 유지)
+    - 단어별 조사 제거 후 공백 없이 연결 (숫자끼리 맞닿는 경우만 공백 유지: "3 4학년" ≠ "34학년")
+    예) "웹공학트랙 4학년 전공필수는?" / "웹공학 트랙, 4학년 전공필수" → 같은 key
+    """
+    text = unicodedata.normalize("NFC", question or "").casefold()
+    tokens = [strip_josa(t) for t in strip_sentence_punctuation(text).split()]
+    key = ""
+    for token in tokens:
+        if key and key[-1].isdigit() and token[0].isdigit():
+            key += " "
+        key += token
+    return key
+
+
+# ============================== 캐시 ==============================
+class IntentCache:
+    """
+    normalize_question(question) → analysis dict 캐시.
+    값은 JSON 문자열로 보관하므로 꺼낸 dict 를 수정해도 캐시에는 영향이 없다.
+    """
+
+    def __init__(self, max_size: int, ttl: float, path: str = ""):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    @staticmethod
+    def make_key(question: str) -> str:
+        return f"v{INTENT_CACHE_VERSION}:{normalize_question(question)}"
+
+    # ---------- 디스크 계층 ----------
+    def _disk(self):
+        # fork 이후에 열리도록 처음 사용할 때 연결한다 (self._lock 보유 상태에서 호출)
+        if not self.path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS intent_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        db = self._disk()
+        if db is None:
+            return None
+        row = db.execute("SELECT value, created FROM intent_cache WHERE key = ?", (key,)).fetchone()
+        if row and time.time() - row[1] > self.ttl:
+            db.execute("DELETE FROM intent_cache WHERE key = ?", (key,))
+            db.commit()
+            return None
+        return row
+
+    def _disk_put(self, key: str, value: str, created: float):
+        db = self._disk()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO intent_cache (key, value, created) VALUES (?, ?, ?)",
+            (key, value, created),
+        )
+        db.commit()
+
+    # ---------- 조회 / 저장 ----------
+    def get(self, question: str) -> Optional[Dict]:
+        key = self.make_key(question)
+        now = time.time()
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, created = item
+                if now - created <= self.ttl:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return json.loads(value)
+                del self._data[key]
+                self._stats["expired"] += 1
+
+            try:
+                row = self._disk_get(key)
+            except sqlite3.Error as e:
+                print("intent 디스크 캐시 오류:", e)
+                row = None
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["disk_hits"] += 1
+            self._store(key, row[0], row[1])
+            return json.loads(row[0])
+
+    def put(self, question: str, analysis: Dict):
+        key = self.make_key(question)
+        value = json.dumps(analysis, ensure_ascii=False)
+        created = time.time()
+
+        with self._lock:
+            self._store(key, value, created)
+            try:
+                self._disk_put(key, value, created)
+            except sqlite3.Error as e:
+                print("intent 디스크 캐시 오류:", e)
+
+    def _store(self, key: str, value: str, created: float):
+        self._data[key] = (value, created)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def reset_after_fork(self):
+        """fork 직후 worker 에서 호출: 부모의 sqlite 연결 대신 새로 연다 (메모리 항목은 유지)"""
+        self._lock = threading.Lock()
+        self._db = None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            db = self._disk()
+            if db is not None:
+                db.execute("DELETE FROM intent_cache")
+                db.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._data)
+        return data
+
+
+# 프로세스 공용 캐시
+cache = IntentCache(INTENT_CACHE_SIZE, INTENT_CACHE_TTL, INTENT_CACHE_PATH)
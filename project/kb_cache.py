@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+kb_cache.py - Knowledge Base(retrieve_and_generate) 답변 캐시
+
+✔ 정확히 같은 질문(normalize_question 기준) → 바로 반환
+✔ 비슷한 질문 → 글자 n-gram(2~3) TF-IDF 코사인 유사도가 KB_CACHE_THRESHOLD 이상이면 재사용
+   - "알려줘 / 언제야" 같은 표현, 어느 질문에나 붙는 "수강신청 / 이번 학기" 는 빼고 비교
+   - 양쪽 질문의 단어가 서로 상대 질문에 모두 들어 있어야 함
+     ("장학금 신청 방법" ≠ "장학금 신청 기간", 더 넓은 질문 "장학금 신청" 도 "장학금 신청 기간" 답변을 쓰지 않음)
+   예) "수강신청 정정 기간 언제야" ↔ "정정기간 알려줘" (양방향)
+✔ python kb_cache.py → NEAR_MATCH_CASES 확인
+✔ TTL + 개수 제한(LRU), sqlite 파일에 저장 → 재시작 후에도 유지
+✔ 원본 PDF 가 바뀌면(sha256) 전체 무효화
+"""
+
+import os
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from intent_cache import normalize_question, strip_josa
+
+# ============================== 설정 ==============================
+KB_CACHE_ENABLED = os.getenv("KB_CACHE_ENABLED", "1") == "1"
+KB_CACHE_SIZE = int(os.getenv("KB_CACHE_SIZE", "1000"))
+KB_CACHE_TTL = float(os.getenv("KB_CACHE_TTL", str(7 * 86400)))
+KB_CACHE_THRESHOLD = float(os.getenv("KB_CACHE_THRESHOLD", "0.65"))
+KB_CACHE_PATH = os.getenv("KB_CACHE_PATH", ".kb_cache/kb_cache.sqlite")  # 비어 있으면 메모리만 사용
+
+# KB 원본 PDF (ingest_data.LOCAL_PDF_PATH 와 같은 파일). KB_SOURCE_VERSION 을 주면 그 값을 사용 (예: S3 ETag)
+# 상대 경로는 실행 위치(cwd)가 아니라 이 파일이 있는 폴더 기준 (gunicorn / benchmark 를 다른 곳에서 실행해도 같은 파일)
+KB_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              os.getenv("KB_SOURCE_PATH", "course.pdf"))
+KB_SOURCE_VERSION = os.getenv("KB_SOURCE_VERSION", "")
+KB_SOURCE_CHECK_INTERVAL = float(os.getenv("KB_SOURCE_CHECK_INTERVAL", "60"))
+
+NGRAM_SIZES = (2, 3)
+
+# 질문 의미와 상관없는 표현 (비교에서 제외)
+FILLERS = {
+    "알려줘", "알려주세요", "알려줄래", "알고싶어", "알고싶어요", "궁금해", "궁금해요", "궁금합니다",
+    "언제야", "언제예요", "언제인가요", "언제", "뭐야", "뭔가요", "뭐지", "무엇인가요", "무엇",
+    "어디야", "어디", "어떻게", "되나요", "하나요", "인가요", "있나요", "있어", "해줘", "좀",
+    "말해줘", "가르쳐줘", "설명해줘", "방법은",
+}
+
+# 이 서비스의 거의 모든 질문에 붙는 문맥 단어 (비교에서 제외, "수강신청기간" 처럼 붙여 쓴 앞부분도 제거)
+CONTEXT_WORDS = ("수강신청", "이번학기", "이번", "학기")
+
+
+# ============================== 질문 → 특징 ==============================
+def content_tokens(question: str) -> List[str]:
+    """소문자 + 문장부호 제거 + 조사 제거 + 표현(FILLERS) / 문맥 단어(CONTEXT_WORDS) 제거"""
+    text = unicodedata.normalize("NFC", question or "").casefold()
+    text = "".join(" " if unicodedata.category(ch)[0] in ("P", "S") else ch for ch in text)
+    tokens = []
+    for token in text.split():
+        if token in FILLERS:
+            continue
+        token = strip_josa(token)
+        for word in CONTEXT_WORDS:
+            if token.startswith(word) and len(token) - len(word) >= 2:
+                token = token[len(word):]
+                break
+        if token and token not in FILLERS and token not in CONTEXT_WORDS:
+            tokens.append(token)
+    return tokens
+
+
+def char_ngrams(tokens: List[str]) -> Counter:
+    """단어를 붙여 쓴 문자열의 2~3글자 n-gram ("정정 기간" 과 "정정기간" 이 같은 n-gram)"""
+    text = "".join(tokens)
+    grams = Counter()
+    for n in NGRAM_SIZES:
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    if len(text) == 1:
+        grams[text] += 1
+    return grams
+
+
+# ============================== 원본 PDF fingerprint ==============================
+_source = {"stat": None, "hash": "", "checked": 0.0, "missing_logged": False}
+
+
+def source_fingerprint() -> str:
+    """KB 원본이 바뀌었는지 판단하는 값. 파일은 (mtime, size) 가 바뀔 때만 다시 해시한다."""
+    if KB_SOURCE_VERSION:
+        return KB_SOURCE_VERSION
+
+    now = time.monotonic()
+    if _source["checked"] and now - _source["checked"] < KB_SOURCE_CHECK_INTERVAL:
+        return _source["hash"]
+    _source["checked"] = now
+
+    try:
+        st = os.stat(KB_SOURCE_PATH)
+    except OSError as e:
+        if not _source["missing_logged"]:
+            _source["missing_logged"] = True
+            print("KB 원본 파일을 찾을 수 없음 (원본 변경 시 캐시 무효화 안 됨):", e)
+        _source["stat"], _source["hash"] = None, ""
+        return ""
+    _source["missing_logged"] = False
+
+    stat = (st.st_mtime_ns, st.st_size)
+    if stat != _source["stat"]:
+        h = hashlib.sha256()
+        with open(KB_SOURCE_PATH, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _source["stat"], _source["hash"] = stat, h.hexdigest()
+    return _source["hash"]
+
+
+# ============================== 캐시 ==============================
+class KBCache:
+    def __init__(self, max_size: int, ttl: float, threshold: float, path: str = ""):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.path = path
+
+        # key → {"question", "tokens", "grams", "answer", "created"}
+        self._data: "OrderedDict[str, Dict]" = OrderedDict()
+        self._df: Counter = Counter()                        # n-gram → 포함한 질문 수
+        self._postings: Dict[str, set] = defaultdict(set)    # n-gram → key
+        self._lock = threading.Lock()
+        self._db = None
+        self._loaded = False
+        self._source = None
+        self._stats = {
+            "hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+
+    # ---------- 디스크 계층 ----------
+    def _disk(self):
+        # fork 이후에 열리도록 처음 사용할 때 연결한다 (self._lock 보유 상태에서 호출)
+        if not self.path:
+            return None
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS kb_cache ("
+                " key TEXT PRIMARY KEY, question TEXT NOT NULL, answer TEXT NOT NULL,"
+                " created REAL NOT NULL, source TEXT NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_execute(self, sql: str, params=()):
+        try:
+            db = self._disk()
+            if db is not None:
+                db.execute(sql, params)
+                db.commit()
+        except sqlite3.Error as e:
+            print("KB 디스크 캐시 오류:", e)
+
+    def _load(self):
+        """처음 사용할 때 디스크의 항목을 읽는다. 원본이 다르거나 만료된 항목은 버린다."""
+        self._loaded = True
+        self._source = source_fingerprint()
+        try:
+            db = self._disk()
+            rows = db.execute(
+                "SELECT key, question, answer, created, source FROM kb_cache ORDER BY created"
+            ).fetchall() if db is not None else []
+        except sqlite3.Error as e:
+            print("KB 디스크 캐시 오류:", e)
+            rows = []
+
+        now = time.time()
+        for key, question, answer, created, source in rows:
+            if source != self._source or now - created > self.ttl:
+                continue
+            self._add(key, question, answer, created)
+        self._disk_execute(
+            "DELETE FROM kb_cache WHERE source != ? OR created < ?", (self._source, now - self.ttl)
+        )
+
+    # ---------- 메모리 인덱스 ----------
+    def _add(self, key: str, question: str, answer: str, created: float):
+        if key in self._data:
+            self._remove(key)
+        tokens = content_tokens(question)
+        grams = char_ngrams(tokens)
+        self._data[key] = {
+            "question": question, "tokens": tokens, "grams": grams,
+            "answer": answer, "created": created,
+        }
+        for gram in grams:
+            self._df[gram] += 1
+            self._postings[gram].add(key)
+
+    def _remove(self, key: str):
+        item = self._data.pop(key)
+        for gram in item["grams"]:
+            self._df[gram] -= 1
+            if self._df[gram] <= 0:
+                del self._df[gram]
+            self._postings[gram].discard(key)
+            if not self._postings[gram]:
+                del self._postings[gram]
+
+    def _vector(self, grams: Counter) -> Dict[str, float]:
+        n = len(self._data)
+        vec = {g: c * (math.log((n + 1) / (self._df.get(g, 0) + 1)) + 1) for g, c in grams.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {g: v / norm for g, v in vec.items()}
+
+    def _check_source(self):
+        source = source_fingerprint()
+        if source != self._source:
+            print("KB 원본 변경 → KB 답변 캐시 비움")
+            self._stats["invalidations"] += 1
+            self._data.clear()
+            self._df.clear()
+            self._postings.clear()
+            self._disk_execute("DELETE FROM kb_cache")
+            self._source = source
+
+    def _nearest(self, question: str) -> Tuple[Optional[str], float]:
+        tokens = content_tokens(question)
+        grams = char_ngrams(tokens)
+        if not grams:
+            return None, 0.0
+
+        candidates = set()
+        for gram in grams:
+            candidates |= self._postings.get(gram, set())
+
+        q_vec = self._vector(grams)
+        q_joined = "".join(tokens)
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            item = self._data[key]
+            # 한쪽에만 있는 단어가 있으면 다른 질문 (더 좁은 / 더 넓은 질문 모두)
+            joined = "".join(item["tokens"])
+            if not all(t in joined for t in tokens) or not all(t in q_joined for t in item["tokens"]):
+                continue
+            c_vec = self._vector(item["grams"])
+            score = sum(v * c_vec.get(g, 0.0) for g, v in q_vec.items())
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+    # ---------- 조회 / 저장 ----------
+    def get(self, question: str) -> Optional[str]:
+        key = normalize_question(question)
+        now = time.time()
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._check_source()
+
+            match = key if key in self._data else None
+            near = False
+            if match is None and self.threshold < 1.0:
+                match, score = self._nearest(question)
+                if match is not None and score < self.threshold:
+                    match = None
+                near = match is not None
+
+            if match is not None and now - self._data[match]["created"] > self.ttl:
+                self._remove(match)
+                self._disk_execute("DELETE FROM kb_cache WHERE key = ?", (match,))
+                self._stats["expired"] += 1
+                match = None
+
+            if match is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._data.move_to_end(match)
+            self._stats["near_hits" if near else "hits"] += 1
+            return self._data[match]["answer"]
+
+    def put(self, question: str, answer: str):
+        key = normalize_question(question)
+        created = time.time()
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._add(key, question, answer, created)
+            self._disk_execute(
+                "INSERT OR REPLACE INTO kb_cache (key, question, answer, created, source) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, question, answer, created, self._source or ""),
+            )
+            while len(self._data) > self.max_size:
+                old_key = next(iter(self._data))
+                self._remove(old_key)
+                self._disk_execute("DELETE FROM kb_cache WHERE key = ?", (old_key,))
+                self._stats["evictions"] += 1
+
+    def reset_after_fork(self):
+        """fork 직후 worker 에서 호출: 부모의 sqlite 연결 대신 새로 연다 (메모리 항목은 유지)"""
+        self._lock = threading.Lock()
+        self._db = None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._df.clear()
+            self._postings.clear()
+            self._disk_execute("DELETE FROM kb_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._data)
+        return data
+
+
+# 프로세스 공용 캐시
+cache = KBCache(KB_CACHE_SIZE, KB_CACHE_TTL, KB_CACHE_THRESHOLD, KB_CACHE_PATH)
+
+
+# ============================== 확인용 예시 ==============================
+# (캐시된 질문, 새 질문, 캐시 답변을 재사용해야 하는지)
+NEAR_MATCH_CASES = [
+    ("수강신청 정정 기간 언제야", "정정기간 알려줘", True),
+    ("정정기간 알려줘", "수강신청 정정 기간 언제야", True),
+    ("졸업 요건 알려줘", "졸업요건이 뭐야", True),
+    ("수강신청 기간 알려줘", "이번 학기 수강신청기간 언제야", True),
+    ("장학금 신청 기간", "장학금 신청 방법", False),
+    ("장학금 신청 기간", "장학금 신청", False),
+    ("장학금 신청", "장학금 신청 기간", False),
+    ("수강신청 기간 알려줘", "다음 학기 수강신청 기간", False),
+]
+NEAR_MATCH_BACKGROUND = [
+    "수강 취소 기간은?", "복수전공 신청 방법", "재수강 규정 알려줘", "휴학 신청 방법", "계절학기 수강신청 기간",
+]
+
+
+def check_examples(threshold: float = KB_CACHE_THRESHOLD) -> List[str]:
+    failures = []
+    for cached, question, expected in NEAR_MATCH_CASES:
+        c = KBCache(100, 3600, threshold)
+        for q in NEAR_MATCH_BACKGROUND + [cached]:
+            c.put(q, q)
+        hit = c.get(question) == cached
+        if hit != expected:
+            _, score = c._nearest(question)
+            failures.append(f"{cached!r} ↔ {question!r}: 재사용={hit} (기대 {expected}, score={score:.2f})")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_examples()
+    for line in failures:
+        print("실패:", line)
+    print(f"KB 캐시 유사 질문 확인: {len(NEAR_MATCH_CASES) - len(failures)}/{len(NEAR_MATCH_CASES)} 통과")
+    raise SystemExit(1 if failures else 0)
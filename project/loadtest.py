@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+loadtest.py - 부하 테스트 (처리량 / 지연 시간, worker 수에 따른 확장성)
+
+✔ --url 을 주면 이미 떠 있는 서버에 부하
+✔ --workers 1,2,4 처럼 주면 worker 수마다 gunicorn(gunicorn.conf.py) 을 직접 띄워서 측정 → 코어 수에 따른 처리량 비교
+✔ 클라이언트 thread 마다 keep-alive 연결 하나, warm-up 구간은 집계에서 제외
+✔ 결과: 요청 수 / 초당 요청 / p50 / p95 / p99 / 오류 수 (--output 으로 JSON 저장)
+
+사용 예)
+    python loadtest.py --url http://127.0.0.1:8000 --concurrency 32 --duration 20
+    python loadtest.py --workers 1,2,4 --concurrency 64
+    python loadtest.py --workers 2 --method POST --path / --form "question=4학년 웹공학 전공선택"
+
+⚠️ 기본 경로(/api/courses)는 LLM 을 호출하지 않는다. 질문(/) 경로는 Bedrock 비용이 발생하므로
+   benchmark.py 의 재생 클라이언트나 캐시가 채워진 환경에서 사용할 것
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import statistics
+import http.client
+from urllib.parse import urlsplit, urlencode, parse_qsl
+from typing import Dict, List, Optional
+
+DEFAULT_PATH = "/api/courses?keyword=프로그래밍&limit=20"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Client(threading.Thread):
+    """keep-alive 연결 하나로 stop 까지 요청을 반복"""
+
+    def __init__(self, host: str, port: int, method: str, path: str, body: Optional[bytes],
+                 headers: Dict[str, str], record_after: float, stop_at: float):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.method, self.path, self.body, self.headers = method, path, body, headers
+        self.record_after, self.stop_at = record_after, stop_at
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def run(self):
+        conn = self._connect()
+        while True:
+            start = time.monotonic()
+            if start >= self.stop_at:
+                break
+            try:
+                conn.request(self.method, self.path, body=self.body, headers=self.headers)
+                res = conn.getresponse()
+                res.read()
+                ok = res.status < 500
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = self._connect()
+            elapsed = time.monotonic() - start
+
+            if start >= self.record_after:
+                if ok:
+                    self.latencies.append(elapsed)
+                else:
+                    self.errors += 1
+        conn.close()
+
+
+def run_load(base_url: str, method: str, path: str, form: str, concurrency: int,
+             duration: float, warmup: float) -> Dict:
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+
+    # 경로의 한글 쿼리를 인코딩
+    if "?" in path:
+        route, query = path.split("?", 1)
+        path = route + "?" + urlencode(parse_qsl(query))
+
+    body, headers = None, {"Connection": "keep-alive"}
+    if form:
+        body = urlencode(parse_qsl(form)).encode("utf-8")
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+    now = time.monotonic()
+    record_after = now + warmup
+    stop_at = record_after + duration
+    clients = [Client(host, port, method, path, body, headers, record_after, stop_at)
+               for _ in range(concurrency)]
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+
+    latencies = sorted(l for c in clients for l in c.latencies)
+    errors = sum(c.errors for c in clients)
+    return {
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+# ============================== gunicorn 실행 ==============================
+def wait_ready(base_url: str, timeout: float = 60.0) -> bool:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", "/metrics")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def start_gunicorn(workers: int, threads: int, port: int, app: str) -> subprocess.Popen:
+    env = dict(os.environ,
+               WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads),
+               GUNICORN_BIND=f"127.0.0.1:{port}",
+               GUNICORN_ACCESSLOG="")  # 접근 로그는 측정에 영향을 주므로 끈다
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    if app:
+        cmd.append(app)
+    return subprocess.Popen(cmd, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_gunicorn(proc: subprocess.Popen):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def print_row(label: str, r: Dict):
+    print(f"{label:>8} {r['concurrency']:>6} {r['requests']:>9} {r['rps']:>9.1f} "
+          f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}")
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="수강신청 도우미 부하 테스트")
+    p.add_argument("--url", default="", help="이미 떠 있는 서버 (예: http://127.0.0.1:8000)")
+    p.add_argument("--workers", default="", help="gunicorn 을 직접 띄울 worker 수 목록 (예: 1,2,4)")
+    p.add_argument("--threads", type=int, default=8, help="--workers 사용 시 worker 당 thread 수")
+    p.add_argument("--port", type=int, default=8765, help="--workers 사용 시 포트")
+    p.add_argument("--app", default="", help="--workers 사용 시 WSGI 앱 (기본: gunicorn.conf.py 의 wsgi_app)")
+    p.add_argument("--method", default="GET")
+    p.add_argument("--path", default=DEFAULT_PATH)
+    p.add_argument("--form", default="", help="POST 폼 데이터 (예: question=...)")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--duration", type=float, default=10.0)
+    p.add_argument("--warmup", type=float, default=2.0)
+    p.add_argument("--output", default="", help="결과 JSON 경로")
+    args = p.parse_args(argv)
+
+    if not args.url and not args.workers:
+        p.error("--url 또는 --workers 중 하나를 지정해주세요.")
+
+    print(f"{'workers':>8} {'conc':>6} {'requests':>9} {'req/s':>9} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'errors':>7}")
+    results = []
+    if args.url:
+        r = run_load(args.url, args.method, args.path, args.form, args.concurrency, args.duration, args.warmup)
+        print_row("-", r)
+        results.append(r)
+    else:
+        for n in [int(w) for w in args.workers.split(",") if w.strip()]:
+            base_url = f"http://127.0.0.1:{args.port}"
+            proc = start_gunicorn(n, args.threads, args.port, args.app)
+            try:
+                if not wait_ready(base_url):
+                    print(f"gunicorn (workers={n}) 이 시작되지 않았습니다.")
+                    return 1
+                r = run_load(base_url, args.method, args.path, args.form,
+                             args.concurrency, args.duration, args.warmup)
+            finally:
+                stop_gunicorn(proc)
+            r["workers"] = n
+            r["threads"] = args.threads
+            print_row(str(n), r)
+            results.append(r)
+
+        base = results[0]["rps"] if results else 0
+        if base:
+            print("\n확장성 (workers=%d 대비): " % results[0]["workers"]
+                  + ", ".join(f"{r['workers']}→x{r['rps'] / base:.2f}" for r in results))
+        print(f"(CPU {os.cpu_count()}개)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "path": args.path, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
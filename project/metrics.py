@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+metrics.py - 단계별 지연 시간 측정 / 요청 추적 (외부 collector 불필요)
+
+✔ with span("sql_execute"): ... → 단계별 히스토그램 + 현재 요청의 trace 에 기록
+✔ 요청 ID 는 contextvars 로 전달 (스레드 풀로 넘길 때는 bind() 로 감싸서 제출)
+✔ 단계별 누적 히스토그램(Prometheus bucket) + 최근 N건 기준 p50 / p95 / p99
+✔ render_prometheus() → /metrics 응답 (Prometheus text format)
+✔ 캐시 / 커넥션 풀 등의 stats() 를 gauge 로 함께 노출 (register_collector)
+✔ 측정 비용은 perf_counter 2번 + lock 1번 수준이라 운영에서도 켜 둘 수 있음
+"""
+
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# ============================== 설정 ==============================
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_LOG_TRACES = os.getenv("METRICS_LOG_TRACES", "0") == "1"  # 요청마다 단계별 시간 한 줄 출력
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1024"))           # 분위수 계산에 쓰는 최근 샘플 수
+METRICS_PREFIX = "courseassistant"
+
+# 초 단위 bucket (Bedrock 호출까지 포함하도록 30초까지)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_trace: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("trace", default=None)
+
+
+# ============================== 히스토그램 ==============================
+class Histogram:
+    """누적 bucket (Prometheus histogram) + 최근 샘플 (분위수용)"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=METRICS_WINDOW)
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.recent.append(seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            counts = list(self.counts)
+            count, total = self.count, self.total
+            recent = sorted(self.recent)
+
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+
+        quantiles = {}
+        for q in QUANTILES:
+            quantiles[q] = recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+        return {"buckets": cumulative, "count": count, "sum": total, "quantiles": quantiles}
+
+
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_collectors: List[Tuple[str, Callable[[], Dict]]] = []
+_lock = threading.Lock()
+
+
+def _histogram(name: str) -> Histogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _lock:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+def observe(stage: str, seconds: float):
+    """단계 소요 시간 기록 (현재 요청이 있으면 trace 에도 추가)"""
+    if not METRICS_ENABLED:
+        return
+    _histogram(stage).observe(seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace.append((stage, seconds))
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def stage_snapshot() -> Dict[str, Dict]:
+    """단계별 {"count", "sum", "quantiles"} (benchmark.py 에서 단계별 시간 비교용)"""
+    with _lock:
+        items = list(_histograms.items())
+    return {stage: hist.snapshot() for stage, hist in sorted(items)}
+
+
+def reset():
+    """기록한 히스토그램 / 카운터를 모두 지운다 (collector 등록은 유지)"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def register_collector(prefix: str, collect: Callable[[], Dict]):
+    """render_prometheus() 때 collect() 의 숫자 값을 {prefix}_{key} gauge 로 노출"""
+    _collectors.append((prefix, collect))
+
+
+# ============================== span ==============================
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """함수 전체를 span 으로 감싸는 decorator"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============================== 요청 ==============================
+def start_request(request_id: Optional[str] = None) -> str:
+    request_id = request_id or uuid.uuid4().hex[:16]
+    _request_id.set(request_id)
+    _trace.set([])
+    return request_id
+
+
+def end_request(label: str, seconds: float):
+    """요청 전체 시간 기록. METRICS_LOG_TRACES 면 단계별 시간을 한 줄로 출력"""
+    observe(f"http:{label}", seconds)
+    trace = _trace.get()
+    if METRICS_LOG_TRACES and trace is not None:
+        stages = " ".join(f"{name}={sec * 1000:.1f}ms" for name, sec in trace)
+        print(f"[trace {_request_id.get()}] {label} {seconds * 1000:.1f}ms | {stages}")
+    _trace.set(None)
+    _request_id.set(None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    현재 context(요청 ID / trace)를 그대로 가지고 다른 스레드에서 실행되게 감싼다.
+    executor.submit(bind(fn), ...) 처럼 사용
+    """
+    ctx = contextvars.copy_context()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+    return wrapper
+
+
+# ============================== Prometheus 출력 ==============================
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_prometheus() -> str:
+    lines = []
+    name = f"{METRICS_PREFIX}_stage_duration_seconds"
+    recent = f"{METRICS_PREFIX}_stage_duration_recent_seconds"
+
+    snapshots = stage_snapshot()
+
+    lines.append(f"# HELP {name} 단계별 소요 시간")
+    lines.append(f"# TYPE {name} histogram")
+    for stage, snap in snapshots.items():
+        for bound, count in zip(BUCKETS, snap["buckets"]):
+            lines.append(f"{name}_bucket{_labels(stage=stage, le=bound)} {count}")
+        lines.append(f"{name}_bucket{_labels(stage=stage, le='+Inf')} {snap['count']}")
+        lines.append(f"{name}_sum{_labels(stage=stage)} {snap['sum']:.6f}")
+        lines.append(f"{name}_count{_labels(stage=stage)} {snap['count']}")
+
+    lines.append(f"# HELP {recent} 최근 {METRICS_WINDOW}건 기준 단계별 소요 시간 분위수")
+    lines.append(f"# TYPE {recent} summary")
+    for stage, snap in snapshots.items():
+        for q, value in snap["quantiles"].items():
+            lines.append(f"{recent}{_labels(stage=stage, quantile=q)} {value:.6f}")
+        lines.append(f"{recent}_sum{_labels(stage=stage)} {snap['sum']:.6f}")
+        lines.append(f"{recent}_count{_labels(stage=stage)} {snap['count']}")
+
+    with _lock:
+        counters = sorted(_counters.items())
+    seen = set()
+    for (cname, labels), value in counters:
+        full = f"{METRICS_PREFIX}_{cname}_total"
+        if full not in seen:
+            lines.append(f"# TYPE {full} counter")
+            seen.add(full)
+        lines.append(f"{full}{_labels(**dict(labels))} {value:g}")
+
+    for prefix, collect in _collectors:
+        try:
+            stats = collect() or {}
+        except Exception as e:
+            print(f"metrics collector 오류 ({prefix}):", e)
+            continue
+        for key, value in sorted(stats.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            gauge = f"{METRICS_PREFIX}_{prefix}_{key}"
+            lines.append(f"# TYPE {gauge} gauge")
+            lines.append(f"{gauge} {value:g}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+migrations.py - courses / schedules 스키마 변경
+
+✔ 적용한 migration 이름을 schema_migrations 테이블에 기록 → 여러 번 실행해도 안전
+✔ python migrations.py 로 아직 적용되지 않은 것만 순서대로 실행
+✔ MySQL 의 DDL 은 트랜잭션으로 묶이지 않으므로(문장마다 자동 커밋) 각 단계를 다시 실행해도 안전하게 작성
+   → 중간에 실패한 migration 은 그대로 다시 실행하면 이미 끝난 단계는 건너뛴다
+   - 컬럼 / 인덱스 / 테이블 추가는 information_schema 를 확인한 뒤 없을 때만
+   - UPDATE / backfill 은 같은 값을 다시 계산할 뿐이라 반복해도 결과가 같음
+"""
+
+from typing import Callable, List, Tuple, Union
+from db import get_connection
+from occupancy import backfill_occupancy, MASK_BYTES
+from search_text import SEARCH_TEXT_COLUMNS
+
+# minute-of-week = (요일 순서 * 1440) + 자정 기준 분, TBD(시간 미정)는 NULL
+_DAY_ORDER = "FIELD(day, 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN') - 1"
+
+# search_text = 검색 대상 컬럼의 공백을 지운 값을 ' ' 로 이어 붙인 것 (ingest_data.search_text_value 와 같은 규칙)
+_SEARCH_TEXT = "CONCAT_WS(' ', " + ", ".join(
+    f"REPLACE(IFNULL({col}, ''), ' ', '')" for col in SEARCH_TEXT_COLUMNS
+) + ")"
+
+
+# ============================== 재실행 가능한 DDL 단계 ==============================
+def _column_exists(cur, table: str, column: str) -> bool:
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column),
+    )
+    return cur.fetchone()[0] > 0
+
+
+def _index_exists(cur, table: str, index: str) -> bool:
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, index),
+    )
+    return cur.fetchone()[0] > 0
+
+
+def add_columns(table: str, columns: List[Tuple[str, str]]) -> Callable:
+    """없는 컬럼만 한 ALTER 로 추가하는 단계"""
+    def step(cur):
+        missing = [(name, ddl) for name, ddl in columns if not _column_exists(cur, table, name)]
+        if missing:
+            cur.execute(f"ALTER TABLE {table} " + ", ".join(f"ADD COLUMN {name} {ddl}" for name, ddl in missing))
+    return step
+
+
+def create_index(table: str, index: str, ddl: str) -> Callable:
+    """index 가 없을 때만 ddl(CREATE ... INDEX) 을 실행하는 단계"""
+    def step(cur):
+        if not _index_exists(cur, table, index):
+            cur.execute(ddl)
+    return step
+
+
+# (이름, 단계 목록) — 순서대로 적용. 단계는 SQL 문자열 또는 cursor 를 받는 함수 (모두 재실행 가능해야 함)
+Step = Union[str, Callable]
+MIGRATIONS: List[Tuple[str, List[Step]]] = [
+    ("0001_schedule_minute_of_week", [
+        add_columns("schedules", [("start_minute", "SMALLINT NULL"), ("end_minute", "SMALLINT NULL")]),
+        f"UPDATE schedules SET "
+        f"start_minute = ({_DAY_ORDER}) * 1440 + TIME_TO_SEC(start_time) DIV 60, "
+        f"end_minute = ({_DAY_ORDER}) * 1440 + TIME_TO_SEC(end_time) DIV 60 "
+        f"WHERE day IN ('MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN')",
+        # 요일 + 시간 조건 / 요일 없는 시간 범위 / 겹침 질의용 구간 인덱스
+        create_index("schedules", "idx_schedules_day_minute",
+                     "CREATE INDEX idx_schedules_day_minute ON schedules (day, start_minute, end_minute)"),
+        create_index("schedules", "idx_schedules_minute",
+                     "CREATE INDEX idx_schedules_minute ON schedules (start_minute, end_minute)"),
+    ]),
+    # 분반별 주간 점유 비트마스크 (occupancy.py), schedules 의 minute-of-week 로 채움
+    ("0002_course_occupancy", [
+        add_columns("courses", [("occupancy", f"VARBINARY({MASK_BYTES}) NULL")]),
+        backfill_occupancy,
+    ]),
+    # 키워드 검색용 정규화 컬럼 + ngram FULLTEXT 인덱스 (ngram_token_size=2 기본값 기준)
+    # 기본 stopword 목록은 영문 코드의 bigram 을 빠뜨리므로 인덱스를 만들 때 끈다
+    ("0003_course_search_text", [
+        add_columns("courses", [("search_text", "TEXT NULL")]),
+        f"UPDATE courses SET search_text = {_SEARCH_TEXT}",
+        "SET SESSION innodb_ft_enable_stopword = OFF",
+        create_index("courses", "ft_courses_search_text",
+                     "CREATE FULLTEXT INDEX ft_courses_search_text ON courses (search_text) WITH PARSER ngram"),
+    ]),
+    # 적재할 때마다 올리는 catalog 버전 (catalog_meta.py, 결과 캐시 무효화용)
+    ("0004_catalog_meta", [
+        "CREATE TABLE IF NOT EXISTS catalog_meta ("
+        " name VARCHAR(50) PRIMARY KEY,"
+        " value BIGINT NOT NULL)",
+        "INSERT IGNORE INTO catalog_meta (name, value) VALUES ('catalog_version', 1)",
+    ]),
+]
+
+
+def apply_migrations():
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                " name VARCHAR(100) PRIMARY KEY,"
+                " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+            cur.execute("SELECT name FROM schema_migrations")
+            applied = {row[0] for row in cur.fetchall()}
+
+            for name, statements in MIGRATIONS:
+                if name in applied:
+                    continue
+                print(f"migration 적용: {name}")
+                for step in statements:
+                    if callable(step):
+                        step(cur)
+                    else:
+                        cur.execute(step)
+                cur.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+                conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    apply_migrations()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+occupancy.py - 분반의 주간 점유 비트마스크
+
+✔ 월~일을 5분 단위 slot 으로 나눈 2016 bit 정수 (bit i = 월요일 00:00 + 5*i 분)
+✔ 두 분반이 겹치는지 = (a & b) != 0, 특정 시간대가 비었는지 = (mask & window) == 0
+✔ DB 에는 courses.occupancy VARBINARY(252) 로 저장 (big-endian 바이트)
+✔ 시간 미정(TBD) 분반은 0 (어떤 분반과도 겹치지 않음)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from course_parser import DAY_INDEX, MINUTES_PER_DAY
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+TOTAL_SLOTS = SLOTS_PER_DAY * 7
+MASK_BYTES = TOTAL_SLOTS // 8
+
+
+# ============================== 만들기 ==============================
+def interval_mask(intervals: Iterable[Tuple[int, int]]) -> int:
+    """minute-of-week 구간 목록 → 점유 비트마스크 (끝 시각은 slot 단위로 올림)"""
+    mask = 0
+    for start, end in intervals:
+        if start is None or end is None or end <= start:
+            continue
+        first = start // SLOT_MINUTES
+        last = -(-end // SLOT_MINUTES)
+        mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def schedule_mask(parsed: List[Dict]) -> int:
+    """parse_course_time 결과 (start_minute / end_minute 포함) → 점유 비트마스크"""
+    return interval_mask((t.get("start_minute"), t.get("end_minute")) for t in parsed)
+
+
+def window_mask(days: Optional[Iterable[str]] = None,
+                start_minute: int = 0, end_minute: int = MINUTES_PER_DAY) -> int:
+    """
+    요일 목록(기본: 전체)의 [start_minute, end_minute) 시간대 마스크 (자정 기준 분).
+    예) window_mask(["MON"], 540, 720) = 월요일 09:00~12:00
+    """
+    day_ids = DAY_INDEX.values() if days is None else [DAY_INDEX[d] for d in days if d in DAY_INDEX]
+    return interval_mask(
+        (d * MINUTES_PER_DAY + start_minute, d * MINUTES_PER_DAY + end_minute) for d in day_ids
+    )
+
+
+# ============================== 검사 ==============================
+def overlaps(a: int, b: int) -> bool:
+    return (a & b) != 0
+
+
+def is_free(mask: int, window: int) -> bool:
+    """window 시간대에 수업이 없는지"""
+    return (mask & window) == 0
+
+
+def fits_within(mask: int, allowed: int) -> bool:
+    """모든 수업이 allowed 시간대 안에 있는지"""
+    return (mask & ~allowed) == 0
+
+
+# ============================== DB 저장 형식 ==============================
+def to_bytes(mask: int) -> bytes:
+    return mask.to_bytes(MASK_BYTES, "big")
+
+
+def from_bytes(value) -> Optional[int]:
+    """DB 값 → 마스크. NULL(아직 계산 안 됨)이면 None"""
+    if value is None:
+        return None
+    return int.from_bytes(bytes(value), "big")
+
+
+# ============================== backfill ==============================
+def backfill_occupancy(cur):
+    """
+    기존 courses 행의 occupancy 를 schedules 의 start_minute / end_minute 로 채운다.
+    (migrations.py 에서 호출, 0001_schedule_minute_of_week 적용 이후)
+    """
+    cur.execute(
+        "SELECT course_id, start_minute, end_minute FROM schedules "
+        "WHERE start_minute IS NOT NULL AND end_minute IS NOT NULL"
+    )
+    masks: Dict[int, int] = {}
+    for course_id, start, end in cur.fetchall():
+        masks[course_id] = masks.get(course_id, 0) | interval_mask([(start, end)])
+
+    cur.execute("SELECT id FROM courses")
+    rows = [(to_bytes(masks.get(cid, 0)), cid) for (cid,) in cur.fetchall()]
+    cur.executemany("UPDATE courses SET occupancy = %s WHERE id = %s", rows)
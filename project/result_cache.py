@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+result_cache.py - 최종 DB 답변 캐시
+
+✔ key = (intent, 정리한 filters) + catalog 버전 (catalog_meta.py)
+   → 표현이 다른 질문도 같은 filters 로 정리되면 같은 답변을 재사용
+   → 재적재(ingest) 로 버전이 오르면 예전 key 는 다시 조회되지 않음
+✔ 메모리 LRU + TTL
+✔ (선택) REDIS_URL 을 설정하면 Redis 호환 서버를 공유 계층으로 사용 (redis 패키지 필요)
+✔ catalog 버전을 알 수 없으면 캐시를 쓰지 않는다
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import catalog_meta
+
+try:
+    import redis
+except ImportError:  # 공유 계층을 쓰지 않으면 필요 없음
+    redis = None
+
+# ============================== 설정 ==============================
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "2048"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+REDIS_URL = os.getenv("REDIS_URL", "")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "courseassistant:answer:")
+
+
+def canonical_filters(filters: Dict) -> Dict[str, str]:
+    """값 앞뒤 공백 제거, 빈 값 제거 → 같은 검색 조건이면 같은 dict"""
+    out = {}
+    for k, v in (filters or {}).items():
+        v = "" if v is None else str(v).strip()
+        if v:
+            out[k] = v
+    return out
+
+
+def make_key(intent: str, filters: Dict, version: int) -> str:
+    body = json.dumps([intent, canonical_filters(filters)], ensure_ascii=False, sort_keys=True)
+    return f"{version}:{hashlib.sha1(body.encode('utf-8')).hexdigest()}"
+
+
+class ResultCache:
+    def __init__(self, max_size: int, ttl: float, redis_url: str = ""):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_url = redis_url
+
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "bypass": 0,
+        }
+
+    # ---------- 공유 계층 ----------
+    def _shared(self):
+        # fork 이후에 연결되도록 처음 사용할 때 만든다
+        if not self.redis_url or redis is None:
+            return None
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.2)
+        return self._redis
+
+    def _shared_get(self, key: str) -> Optional[str]:
+        try:
+            client = self._shared()
+            value = client.get(REDIS_KEY_PREFIX + key) if client else None
+        except Exception as e:
+            print("결과 공유 캐시 오류:", e)
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def _shared_put(self, key: str, value: str):
+        try:
+            client = self._shared()
+            if client:
+                client.set(REDIS_KEY_PREFIX + key, value.encode("utf-8"), ex=int(self.ttl))
+        except Exception as e:
+            print("결과 공유 캐시 오류:", e)
+
+    # ---------- 조회 / 저장 ----------
+    def get(self, intent: str, filters: Dict, version: Optional[int]) -> Optional[str]:
+        if version is None:
+            with self._lock:
+                self._stats["bypass"] += 1
+            return None
+
+        key = make_key(intent, filters, version)
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if now - item[1] <= self.ttl:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return item[0]
+                del self._data[key]
+
+        value = self._shared_get(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["shared_hits"] += 1
+            self._store(key, value, now)
+        return value
+
+    def put(self, intent: str, filters: Dict, version: Optional[int], answer: str):
+        if version is None:
+            return
+        key = make_key(intent, filters, version)
+        with self._lock:
+            self._store(key, answer, time.time())
+        self._shared_put(key, answer)
+
+    def _store(self, key: str, value: str, created: float):
+        self._data[key] = (value, created)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def reset_after_fork(self):
+        """fork 직후 worker 에서 호출: 부모의 Redis 연결 대신 새로 연결 (메모리 항목은 유지)"""
+        self._lock = threading.Lock()
+        self._redis = None
+
+    def clear(self):
+        """메모리 계층만 비운다 (공유 계층은 버전이 다른 key 라 자연히 만료)"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._data)
+        return data
+
+
+if REDIS_URL and redis is None:
+    print("REDIS_URL 이 설정되었지만 redis 패키지가 없어 공유 캐시를 사용하지 않습니다.")
+
+# 프로세스 공용 캐시
+cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, REDIS_URL)
+
+# 버전이 바뀌면 예전 버전 항목은 쓸 일이 없으므로 메모리를 비운다
+catalog_meta.on_version_change(cache.clear)
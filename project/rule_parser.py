@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+rule_parser.py - 규칙 기반 intent 분석기 (LLM 앞단 fast path)
+
+✔ analyze_question_with_ai 와 같은 {intent, filters} 구조를 만든다
+✔ 트랙/학과/단과대/교수/과목명 사전은 courses 테이블의 DISTINCT 값으로 구성
+✔ 학년("4학년"), main_category 4종, 요일, 시간("10시 이후", "12시 전"), "온라인 3H" 인식
+✔ 질문 중 규칙으로 설명된 비율을 confidence(0~1)로 반환
+   → confidence 가 낮은 질문만 Nova Lite 로 보낸다
+✔ 설명되지 않은 단어(한글/영문/숫자 2글자 이상)가 남으면 비율과 상관없이 confidence 0
+   예) "4학년 웹공학 전공선택" 에서 "웹공학" 이 사전에 없으면 버리지 않고 LLM 으로
+✔ python rule_parser.py → REGRESSION_CASES 확인
+"""
+
+import os
+import re
+import time
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from db import get_connection
+
+# ============================== 설정 ==============================
+RULE_PARSER_ENABLED = os.getenv("RULE_PARSER_ENABLED", "1") == "1"
+RULE_PARSER_MIN_CONFIDENCE = float(os.getenv("RULE_PARSER_MIN_CONFIDENCE", "0.8"))
+# 사전 로드(DB) 실패 후 다시 시도하기까지 기다리는 시간(초) → DB 장애 중 요청마다 DB 를 두드리지 않게
+RULE_PARSER_VOCAB_RETRY = float(os.getenv("RULE_PARSER_VOCAB_RETRY", "30"))
+
+FILTER_KEYS = [
+    "keyword", "track_major", "department", "university", "main_category",
+    "grade", "professor", "day", "time_start", "time_end", "room", "section",
+    "code", "credit", "lecture_hours", "online_hours",
+]
+
+# main_category 는 프롬프트와 같은 4가지만 사용 (약칭 포함)
+MAIN_CATEGORY_ALIASES = {
+    "선택필수교양": "선택필수교양",
+    "선필교양": "선택필수교양",
+    "전공필수": "전공필수",
+    "전공선택": "전공선택",
+    "전공기초": "전공기초",
+    "전필": "전공필수",
+    "전선": "전공선택",
+}
+
+DAY_CHARS = "월화수목금토일"
+
+# 의미 없는 표현 (규칙으로 설명된 것으로 간주)
+STOPWORDS = sorted([
+    "과목", "수업", "강의", "강좌", "목록", "리스트", "시간표",
+    "알려줘", "알려주세요", "알려줄래", "알려", "추천해줘", "추천해주세요", "추천",
+    "찾아줘", "찾아주세요", "보여줘", "보여주세요", "있어", "있나요", "있니", "있는",
+    "뭐야", "뭐가", "뭐있어", "무엇", "어떤", "어떤게", "전부", "모두", "전체",
+    "들을수있는", "들을수", "듣는", "들을", "하는", "중에서", "중에", "중",
+    "교수님", "교수", "담당", "누구", "누구야", "누가", "가르치는", "가르쳐",
+    "시작해서", "시작하는", "시작", "끝나는", "끝나고", "끝", "종료되는", "열리는",
+    "요일", "에서", "그리고", "및", "인", "수강", "가능한", "이면서", "면서",
+], key=len, reverse=True)
+
+MARK = "\x00"
+UNEXPLAINED_WORD_RE = re.compile(r"[가-힣ㄱ-ㅎA-Za-z0-9]{2,}")
+JOSA_AFTER_MARK = re.compile(MARK + r"(?:으로|에서|이랑|하고|[은는이가을를에의도만와과로요랑])")
+
+GRADE_RE = re.compile(r"([1-4])학년")
+CREDIT_RE = re.compile(r"([1-9])학점")
+SECTION_RE = re.compile(r"(\d{1,3})분반")
+ONLINE_WORD_RE = re.compile(r"온라인|비대면|사이버|동영상")
+HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)(?:H|h|시간)")
+DAY_RE = re.compile(r"([월화수목금토일])요일")
+TIME_RE = re.compile(
+    r"(오전|오후)?(\d{1,2})(?::(\d{2})|시(?!간)(?:(\d{1,2})분|(반))?)"
+)
+# 시간 뒤에 오는 수식어 (앞에서부터 검사하므로 긴 표현을 먼저)
+START_WORDS = ("시작해서", "시작하는", "이후", "부터", "넘어서", "지나서", "시작", "이상", "후")
+END_WORDS = ("전까지", "이전", "전에", "전", "까지", "안에", "끝나는", "종료", "이내")
+
+
+# ============================== 사전(vocabulary) ==============================
+def compact(text: str) -> str:
+    """NFC + 공백 제거 (시간 표기에 쓰이는 : ~ - 외 문장부호도 제거)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return "".join(
+        ch for ch in text
+        if not ch.isspace()
+        and (ch in ":~-." or unicodedata.category(ch)[0] not in ("P", "S"))
+    )
+
+
+def load_vocabulary() -> Dict[str, Dict[str, str]]:
+    """
+    courses 테이블의 DISTINCT 값으로 사전을 만든다.
+    반환: { 필드명: { 공백제거값: 원래값 } }
+    """
+    vocab: Dict[str, Dict[str, str]] = {
+        "track_major": {}, "department": {}, "university": {},
+        "professor": {}, "name": {}, "code": {},
+    }
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for field in vocab:
+                cur.execute(f"SELECT DISTINCT {field} FROM courses")
+                for (value,) in cur.fetchall():
+                    if value is None:
+                        continue
+                    values = [value]
+                    if field == "professor":
+                        # 공동 강의는 "김OO,이OO" 형태일 수 있음
+                        values = re.split(r"[,/\s]+", str(value))
+                    for v in values:
+                        v = str(v).strip()
+                        key = compact(v)
+                        if len(key) < 2 or v in ("미정", "-"):
+                            continue
+                        vocab[field][key] = v
+    finally:
+        conn.close()
+
+    return vocab
+
+
+_vocab: Optional[Dict[str, Dict[str, str]]] = None
+_vocab_lock = threading.Lock()
+_vocab_failed_at: Optional[float] = None
+
+
+def get_vocabulary() -> Dict[str, Dict[str, str]]:
+    """실패하면 {} 를 반환하고 RULE_PARSER_VOCAB_RETRY 초 동안은 다시 로드하지 않는다"""
+    global _vocab, _vocab_failed_at
+    if _vocab is None:
+        with _vocab_lock:
+            if _vocab is None:
+                if _vocab_failed_at is not None and time.monotonic() - _vocab_failed_at < RULE_PARSER_VOCAB_RETRY:
+                    return {}
+                try:
+                    _vocab = load_vocabulary()
+                    _vocab_failed_at = None
+                except Exception as e:
+                    print("규칙 파서 사전 로드 실패:", e)
+                    _vocab_failed_at = time.monotonic()
+                    return {}
+    return _vocab
+
+
+def vocabulary_loaded() -> bool:
+    return _vocab is not None
+
+
+def reload_vocabulary():
+    global _vocab, _vocab_failed_at
+    with _vocab_lock:
+        _vocab = None
+        _vocab_failed_at = None
+
+
+# ============================== 파싱 ==============================
+class _Text:
+    """인식된 부분을 MARK 로 지워가며 남은(설명되지 않은) 글자를 추적"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.total = len(text)
+
+    def consume(self, start: int, end: int):
+        self.text = self.text[:start] + MARK * (end - start) + self.text[end:]
+
+    def consume_word(self, word: str) -> bool:
+        idx = self.text.find(word)
+        if idx < 0:
+            return False
+        self.consume(idx, idx + len(word))
+        return True
+
+    def _residual_marked(self) -> str:
+        text = self.text
+        for word in STOPWORDS:
+            text = text.replace(word, MARK * len(word))
+        prev = None
+        while prev != text:
+            prev = text
+            text = JOSA_AFTER_MARK.sub(lambda m: MARK * len(m.group(0)), text)
+        return text
+
+    def residual(self) -> str:
+        return self._residual_marked().replace(MARK, "")
+
+    def unexplained_words(self) -> List[str]:
+        """인식되지 않고 남은 조각 중 단어로 볼 수 있는 것 (한 글자 조사/어미는 제외)"""
+        return [piece for piece in self._residual_marked().split(MARK)
+                if UNEXPLAINED_WORD_RE.search(piece)]
+
+
+def _match_vocab(t: _Text, words: Dict[str, str]) -> List[str]:
+    """사전 단어 중 질문에 등장하는 것 (긴 것 우선, 겹치지 않게)"""
+    found = []
+    for key in sorted(words, key=len, reverse=True):
+        if key in t.text:
+            t.consume_word(key)
+            found.append(words[key])
+    return found
+
+
+def _to_hhmm(ampm: Optional[str], hour: int, minute: int) -> str:
+    if ampm == "오후" and hour < 12:
+        hour += 12
+    elif ampm is None and 1 <= hour <= 8:
+        # 수업은 09:00~22:30 사이 → "3시" 는 15시로 해석
+        hour += 12
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _parse_times(t: _Text, filters: Dict[str, str]) -> bool:
+    """시간 표현을 time_start / time_end 로. 해석이 애매하면 False."""
+    matches = list(TIME_RE.finditer(t.text))
+    for i, m in enumerate(matches):
+        ampm, hour, mm, minute, half = m.groups()
+        hour = int(hour)
+        if hour > 23:
+            return False
+        value = _to_hhmm(ampm, hour, int(mm or minute or (30 if half else 0)))
+
+        # 시간 바로 뒤의 수식어 ("에" 생략 가능)
+        pos = m.end()
+        if t.text.startswith("에", pos):
+            pos += 1
+        after = t.text[pos:]
+        between = t.text[matches[i - 1].end():m.start()] if i > 0 else ""
+
+        qualifier = next((w for w in START_WORDS + END_WORDS if after.startswith(w)), "")
+        if after.startswith(("~", "-")) and i + 1 < len(matches):
+            role, qualifier = "start", after[0]
+        elif qualifier in START_WORDS:
+            role = "start"
+        elif qualifier in END_WORDS:
+            role = "end"
+        elif i > 0 and between.strip(MARK) in ("", "에"):
+            # "10시~12시" 처럼 앞 시간이 구간 시작인 경우
+            role = "end"
+        else:
+            return False
+
+        key = "time_start" if role == "start" else "time_end"
+        if filters[key]:
+            return False
+        filters[key] = value
+        t.consume(m.start(), pos + len(qualifier))
+    return True
+
+
+def parse_question(question: str, vocab: Optional[Dict] = None) -> Tuple[Dict, float]:
+    """
+    규칙으로 질문을 분석한다.
+    반환: ({intent, filters}, confidence)
+    """
+    filters = {k: "" for k in FILTER_KEYS}
+    result = {"intent": "search_by_filters", "filters": filters}
+
+    text = compact(question)
+    if not text:
+        return result, 0.0
+
+    if vocab is None:
+        vocab = get_vocabulary()
+    t = _Text(text)
+
+    # ---- 온라인 시간 ----
+    online = ONLINE_WORD_RE.search(t.text)
+    hours = list(HOURS_RE.finditer(t.text))
+    if len(hours) > 1:
+        return result, 0.0
+    if hours:
+        h = hours[0]
+        if online:
+            filters["online_hours"] = f"{h.group(1)}H"
+            t.consume(online.start(), online.end())
+        else:
+            filters["lecture_hours"] = h.group(1)
+        t.consume(h.start(), h.end())
+
+    # ---- 학년 / 학점 / 분반 ----
+    for regex, key in ((GRADE_RE, "grade"), (CREDIT_RE, "credit"), (SECTION_RE, "section")):
+        found = list(regex.finditer(t.text))
+        if len(found) > 1:
+            return result, 0.0
+        if found:
+            filters[key] = found[0].group(1)
+            t.consume(found[0].start(), found[0].end())
+
+    # ---- main_category ----
+    categories = set()
+    for alias in sorted(MAIN_CATEGORY_ALIASES, key=len, reverse=True):
+        while t.consume_word(alias):
+            categories.add(MAIN_CATEGORY_ALIASES[alias])
+    if len(categories) > 1:
+        return result, 0.0
+    if categories:
+        filters["main_category"] = categories.pop()
+
+    # ---- 사전 기반: 트랙 / 학과 / 단과대 / 교수 / 과목명 / 코드 ----
+    for field in ("track_major", "department", "university", "code", "professor"):
+        found = _match_vocab(t, vocab.get(field, {}))
+        if len(found) > 1:
+            return result, 0.0
+        if found:
+            filters[field] = found[0]
+
+    names = _match_vocab(t, vocab.get("name", {}))
+    if len(names) > 1:
+        return result, 0.0
+    if names:
+        filters["keyword"] = names[0]
+
+    # ---- 요일 / 시간 ----
+    days = list(DAY_RE.finditer(t.text))
+    if len(days) > 1:
+        return result, 0.0
+    if days:
+        filters["day"] = days[0].group(1)
+        t.consume(days[0].start(), days[0].end())
+
+    if not _parse_times(t, filters):
+        return result, 0.0
+
+    # ---- intent ----
+    asks_professor = any(w in text for w in ("교수", "담당", "누구", "누가"))
+    if filters["professor"]:
+        result["intent"] = "professor_to_course"
+    elif filters["keyword"] and asks_professor:
+        result["intent"] = "course_to_professor"
+
+    if not any(filters.values()):
+        return result, 0.0
+
+    # 모르는 단어를 버리고 검색하면 엉뚱한 결과가 나오므로 LLM 으로 보낸다
+    if t.unexplained_words():
+        return result, 0.0
+
+    residual = t.residual()
+    confidence = 1.0 - len(residual) / t.total
+    return result, round(confidence, 3)
+
+
+# ============================== 회귀 확인 ==============================
+# (질문, 기대값) — 기대값이 None 이면 LLM 으로 보내야 하는 질문, dict 면 채워져야 하는 filters
+REGRESSION_VOCAB = {
+    "track_major": {"웹공학트랙": "웹공학트랙"},
+    "department": {"컴퓨터공학부": "컴퓨터공학부"},
+    "university": {},
+    "professor": {"김철수": "김철수"},
+    "name": {"마케팅원론": "마케팅원론", "데이터베이스": "데이터베이스"},
+    "code": {},
+}
+REGRESSION_CASES = [
+    # "웹공학" 은 사전의 "웹공학트랙" 과 다름 → 0.8 비율로 통과시키면 "웹공학" 을 버리고 4학년 전공선택 전체를 검색했다
+    ("4학년 웹공학 전공선택 과목 알려줘", None),
+    ("4학년 웹공학트랙 전공선택 과목 알려줘",
+     {"grade": "4", "track_major": "웹공학트랙", "main_category": "전공선택"}),
+    ("마케팅원론 담당 교수님이 누구야?", {"keyword": "마케팅원론"}),
+    ("김철수 교수 월요일 수업", {"professor": "김철수", "day": "월"}),
+    ("2학년 전필 블록체인 수업", None),
+]
+
+
+def check_regressions(vocab: Optional[Dict] = None) -> List[str]:
+    failures = []
+    for question, expected in REGRESSION_CASES:
+        parsed, confidence = parse_question(question, vocab or REGRESSION_VOCAB)
+        accepted = confidence >= RULE_PARSER_MIN_CONFIDENCE
+        if expected is None:
+            if accepted:
+                failures.append(f"{question}: LLM 으로 보내야 하는데 confidence={confidence}")
+        elif not accepted:
+            failures.append(f"{question}: 규칙으로 처리해야 하는데 confidence={confidence}")
+        else:
+            wrong = {k: parsed["filters"][k] for k, v in expected.items() if parsed["filters"][k] != v}
+            if wrong:
+                failures.append(f"{question}: filters 불일치 {wrong}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_regressions()
+    for line in failures:
+        print("실패:", line)
+    print(f"규칙 파서 회귀 확인: {len(REGRESSION_CASES) - len(failures)}/{len(REGRESSION_CASES)} 통과")
+    raise SystemExit(1 if failures else 0)
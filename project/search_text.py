@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+search_text.py - 키워드 검색용 정규화 텍스트 (courses.search_text)
+
+✔ 키워드 검색 대상 컬럼의 공백을 지운 값을 ' ' 로 이어 붙여 적재 시점에 저장
+✔ MySQL ngram FULLTEXT 인덱스로 후보를 먼저 좁히고,
+   기존 LIKE 조건은 그대로 걸어서 결과는 바뀌지 않게 한다
+   (공백을 지워도 '부분 문자열' 관계는 유지되므로 FULLTEXT 후보는 LIKE 결과를 항상 포함)
+✔ 한 글자 키워드 / 특수문자가 섞인 키워드는 FULLTEXT 로 찾을 수 없어 LIKE 만 사용
+"""
+
+import re
+from typing import Dict, Optional
+
+# ai.search_courses 키워드 조건이 보는 컬럼 + 교수명
+SEARCH_TEXT_COLUMNS = [
+    "name", "code", "professor", "track_major", "department",
+    "room", "section", "online_hours", "lecture_hours",
+]
+
+# ngram_token_size (MySQL 기본값 2) 보다 짧은 키워드는 인덱스로 찾을 수 없음
+NGRAM_TOKEN_SIZE = 2
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize(value) -> str:
+    """SQL 의 REPLACE(col, ' ', '') 와 같은 규칙"""
+    return "" if value is None else str(value).replace(" ", "")
+
+
+def search_text_value(course: Dict) -> str:
+    return " ".join(normalize(course.get(col)) for col in SEARCH_TEXT_COLUMNS)
+
+
+def fulltext_query(keyword: str) -> Optional[str]:
+    """
+    키워드 → MATCH ... AGAINST (... IN BOOLEAN MODE) 용 구문 검색어.
+    인덱스로 찾을 수 없는 키워드면 None (LIKE 만 사용)
+    """
+    kw = normalize(keyword)
+    if len(kw) < NGRAM_TOKEN_SIZE or not _WORD_RE.fullmatch(kw):
+        return None
+    return f'"{kw}"'
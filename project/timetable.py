@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+timetable.py - 조건 기반 시간표 추천
+
+✔ 필수 과목 / 선택 과목 / 목표 학점 / 제외 요일 / 수업 가능 시간대 입력
+✔ 과목 코드별 모든 분반(section) 중 충돌 없는 조합을 백트래킹으로 탐색
+   - 분반 시간은 주간 점유 비트마스크(occupancy.py) → 충돌 검사는 AND 한 번
+   - 같은 시간대의 분반은 하나의 선택지로 묶어서 탐색 (대체 분반으로 표시)
+   - 선택지가 적은 과목부터 배치, 학점 상·하한으로 가지치기
+   - 결과가 없었던 부분 상태 (과목 위치, 점유 마스크, 학점) 를 기억해 재탐색 생략
+✔ 결과 개수 상한 + 시간 예산 (기본 150ms)
+"""
+
+import time
+from collections import defaultdict
+from typing import List, Dict, Optional
+
+from conflict import load_sections, parse_course_key, format_minute, DAY_NAMES
+from course_parser import DAY_INDEX, DAY_MAP, MINUTES_PER_DAY
+from catalog_engine import to_minutes
+from occupancy import window_mask, fits_within
+
+DEFAULT_MAX_RESULTS = 20
+DEFAULT_TIME_BUDGET_MS = 150
+
+
+# ============================== 분반 준비 ==============================
+def parse_credit(value) -> float:
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return 0.0
+
+
+def normalize_day(day: str) -> Optional[str]:
+    day = (day or "").strip()
+    if day in DAY_MAP:
+        return DAY_MAP[day]
+    day = day.upper()
+    return day if day in DAY_INDEX else None
+
+
+def allowed_mask(blocked_days, earliest: Optional[int], latest: Optional[int]) -> int:
+    """수업을 들을 수 있는 시간대 (제외 요일을 뺀 요일의 earliest~latest)"""
+    days = [d for d in DAY_INDEX if d not in blocked_days]
+    return window_mask(days,
+                       earliest if earliest is not None else 0,
+                       latest if latest is not None else MINUTES_PER_DAY)
+
+
+def build_options(sections: List[Dict]) -> List[Dict]:
+    """같은 점유 마스크를 가진 분반을 하나의 선택지로 묶는다"""
+    groups = defaultdict(list)
+    for sec in sections:
+        groups[sec["mask"]].append(sec)
+    return [
+        {"mask": mask, "sections": secs, "credit": parse_credit(secs[0]["credit"])}
+        for mask, secs in groups.items()
+    ]
+
+
+# ============================== 점수 ==============================
+def score_schedule(picked: List[Dict]) -> Dict:
+    """등교 일수가 적고, 공강(수업 사이 빈 시간)이 짧을수록 좋은 시간표"""
+    by_day = defaultdict(list)
+    for opt in picked:
+        for start, end in opt["sections"][0]["intervals"]:
+            by_day[start // MINUTES_PER_DAY].append((start, end))
+
+    gap = 0
+    for intervals in by_day.values():
+        intervals.sort()
+        for (_, prev_end), (start, _) in zip(intervals, intervals[1:]):
+            gap += max(0, start - prev_end)
+    return {"days": len(by_day), "gap_minutes": gap}
+
+
+def describe(picked: List[Dict]) -> Dict:
+    courses = []
+    for opt in picked:
+        sec = opt["sections"][0]
+        courses.append({
+            "code": sec["code"],
+            "section": sec["section"],
+            "name": sec["name"],
+            "professor": sec["professor"],
+            "credit": sec["credit"],
+            "times": [
+                f"{DAY_NAMES[s // MINUTES_PER_DAY]} {format_minute(s)}~{format_minute(e)}"
+                for s, e in sec["intervals"]
+            ],
+            "alternative_sections": [s["section"] for s in opt["sections"][1:]],
+        })
+    result = {"courses": courses, "total_credits": sum(o["credit"] for o in picked)}
+    result.update(score_schedule(picked))
+    return result
+
+
+# ============================== 탐색 ==============================
+def generate_timetables(required: List, optional: Optional[List] = None,
+                        target_credits: Optional[float] = None,
+                        blocked_days: Optional[List[str]] = None,
+                        earliest: str = "", latest: str = "",
+                        max_results: int = DEFAULT_MAX_RESULTS,
+                        time_budget_ms: float = DEFAULT_TIME_BUDGET_MS) -> Dict:
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    optional = optional or []
+
+    req_keys = [parse_course_key(x) for x in required]
+    opt_keys = [parse_course_key(x) for x in optional]
+    all_sections = load_sections(code for code, _ in req_keys + opt_keys)
+
+    blocked = {d for d in (normalize_day(x) for x in (blocked_days or [])) if d}
+    earliest_min = to_minutes(earliest) if earliest else None
+    latest_min = to_minutes(latest) if latest else None
+    allowed = allowed_mask(blocked, earliest_min, latest_min)
+
+    # ---- 과목별 선택지 ----
+    courses = []
+    unavailable = []
+    seen_codes = set()
+    for (code, section), is_required in [(k, True) for k in req_keys] + [(k, False) for k in opt_keys]:
+        if code in seen_codes:
+            continue
+        seen_codes.add(code)
+        secs = [
+            s for (c, sec_id), s in sorted(all_sections.items())
+            if c == code and (section is None or sec_id == section)
+            and fits_within(s["mask"], allowed)
+        ]
+        if not secs:
+            if is_required:
+                unavailable.append(code if section is None else f"{code}-{section}")
+            continue
+        courses.append({"code": code, "required": is_required, "options": build_options(secs)})
+
+    if unavailable:
+        return {"results": [], "complete": True, "unavailable": unavailable,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    # 필수 과목 먼저, 그 안에서는 선택지가 적은 과목부터 (MRV)
+    courses.sort(key=lambda c: (not c["required"], len(c["options"])))
+
+    # 남은 과목으로 더할 수 있는 최대 학점 (가지치기용)
+    remaining_max = [0.0] * (len(courses) + 1)
+    remaining_min = [0.0] * (len(courses) + 1)
+    for i in range(len(courses) - 1, -1, -1):
+        credits = [o["credit"] for o in courses[i]["options"]]
+        remaining_max[i] = remaining_max[i + 1] + max(credits)
+        remaining_min[i] = remaining_min[i + 1] + (min(credits) if courses[i]["required"] else 0.0)
+
+    pool_size = max_results * 5
+    found: List[List[Dict]] = []
+    dead_states = set()
+    stats = {"nodes": 0, "memo_hits": 0, "pruned": 0}
+    state = {"timed_out": False}
+    picked: List[Dict] = []
+
+    def search(i: int, occupied: int, credits: float) -> bool:
+        """조합을 하나라도 찾았으면 True"""
+        if len(found) >= pool_size:
+            return True
+        if time.perf_counter() > deadline:
+            state["timed_out"] = True
+            return True
+
+        stats["nodes"] += 1
+        if target_credits is not None:
+            if credits + remaining_min[i] > target_credits or credits + remaining_max[i] < target_credits:
+                stats["pruned"] += 1
+                return False
+
+        if i == len(courses):
+            if target_credits is None or credits == target_credits:
+                found.append(list(picked))
+                return True
+            return False
+
+        key = (i, occupied, credits)
+        if key in dead_states:
+            stats["memo_hits"] += 1
+            return False
+
+        course = courses[i]
+        any_found = False
+        for opt in course["options"]:
+            if opt["mask"] & occupied:
+                continue
+            picked.append(opt)
+            if search(i + 1, occupied | opt["mask"], credits + opt["credit"]):
+                any_found = True
+            picked.pop()
+            if len(found) >= pool_size or state["timed_out"]:
+                return True
+
+        if not course["required"]:
+            if search(i + 1, occupied, credits):
+                any_found = True
+
+        if not any_found and not state["timed_out"]:
+            dead_states.add(key)
+        return any_found
+
+    search(0, 0, 0.0)
+
+    results = [describe(p) for p in found]
+    results.sort(key=lambda r: (-len(r["courses"]), r["days"], r["gap_minutes"]))
+    return {
+        "results": results[:max_results],
+        "complete": not state["timed_out"] and len(found) < pool_size,
+        "unavailable": [],
+        "stats": stats,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }